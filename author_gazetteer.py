@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Author gazetteer: writers named in etymologies, found in one linear scan.
+
+`fill_usage_examples.create_example_from_etymology` attributes a quote to
+the writer mentioned near it. AUTHORS is the table of writers: canonical
+name as used in the corpus ("Крылов И.А."), surname and initials. Each
+entry expands to the case forms of the surname, alone and with the
+initials before or after it, spaced or not ("Крылов", "Крылова",
+"И. А. Крылова", "И.А.Крылов", "Крылов И.А."), and all forms of all
+writers are compiled into one Aho-Corasick automaton. `scan` walks a text
+once, whatever the number of forms, and returns every mention with its
+position. A mention must stand as a whole word, and overlapping mentions
+resolve to the longest, so "А. К. Толстого" names Толстой А.К. and plain
+"Толстого" names Толстой Л.Н.
+
+Entries with `bare=False` are only recognised with initials: surnames
+shared by several writers, and surnames that are also common words
+("Блок", "Даль"). The table can be replaced by a JSON list of the same
+fields (`load_authors`).
+
+    python3 author_gazetteer.py table_phrases_cleaned.json            # mentions per writer
+    python3 author_gazetteer.py table_phrases_cleaned.json --benchmark
+"""
+
+import argparse
+import json
+import random
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from phrase_store import PhraseStore
+
+
+class Author(NamedTuple):
+    name: str  # canonical, as in the examples: "Крылов И.А."
+    surname: str
+    initials: str = ''  # "И.А."
+    bare: bool = True  # recognise the surname without initials
+    forms: Tuple[str, ...] = ()  # extra literal forms: pen names, irregular declension
+
+
+class AuthorMatch(NamedTuple):
+    start: int
+    end: int
+    name: str
+    text: str
+
+
+AUTHORS: Tuple[Author, ...] = (
+    Author("Крылов И.А.", "Крылов", "И.А."),
+    Author("Пушкин А.С.", "Пушкин", "А.С."),
+    Author("Лермонтов М.Ю.", "Лермонтов", "М.Ю."),
+    Author("Гоголь Н.В.", "Гоголь", "Н.В."),
+    Author("Грибоедов А.С.", "Грибоедов", "А.С."),
+    Author("Фонвизин Д.И.", "Фонвизин", "Д.И."),
+    Author("Толстой Л.Н.", "Толстой", "Л.Н.", forms=("Лев Толстой", "Льва Толстого", "Львом Толстым")),
+    Author("Толстой А.К.", "Толстой", "А.К.", bare=False),
+    Author("Толстой А.Н.", "Толстой", "А.Н.", bare=False),
+    Author("Достоевский Ф.М.", "Достоевский", "Ф.М."),
+    Author("Чехов А.П.", "Чехов", "А.П."),
+    Author("Горький М.", "Горький", "М.", forms=("Максим Горький", "Максима Горького")),
+    Author("Тургенев И.С.", "Тургенев", "И.С."),
+    Author("Салтыков-Щедрин М.Е.", "Салтыков-Щедрин", "М.Е."),
+    Author("Некрасов Н.А.", "Некрасов", "Н.А."),
+    Author("Островский А.Н.", "Островский", "А.Н."),
+    Author("Гончаров И.А.", "Гончаров", "И.А."),
+    Author("Лесков Н.С.", "Лесков", "Н.С."),
+    Author("Писемский А.Ф.", "Писемский", "А.Ф."),
+    Author("Мамин-Сибиряк Д.Н.", "Мамин-Сибиряк", "Д.Н."),
+    Author("Карамзин Н.М.", "Карамзин", "Н.М."),
+    Author("Ломоносов М.В.", "Ломоносов", "М.В."),
+    Author("Державин Г.Р.", "Державин", "Г.Р."),
+    Author("Жуковский В.А.", "Жуковский", "В.А."),
+    Author("Радищев А.Н.", "Радищев", "А.Н."),
+    Author("Тютчев Ф.И.", "Тютчев", "Ф.И."),
+    Author("Аксаков С.Т.", "Аксаков", "С.Т."),
+    Author("Белинский В.Г.", "Белинский", "В.Г."),
+    Author("Герцен А.И.", "Герцен", "А.И."),
+    Author("Чернышевский Н.Г.", "Чернышевский", "Н.Г."),
+    Author("Даль В.И.", "Даль", "В.И.", bare=False, forms=("Владимир Даль", "Владимира Даля")),
+    Author("Бунин И.А.", "Бунин", "И.А."),
+    Author("Куприн А.И.", "Куприн", "А.И."),
+    Author("Короленко В.Г.", "Короленко", "В.Г."),
+    Author("Блок А.А.", "Блок", "А.А.", bare=False, forms=("Александр Блок", "Александра Блока")),
+    Author("Есенин С.А.", "Есенин", "С.А."),
+    Author("Маяковский В.В.", "Маяковский", "В.В."),
+    Author("Ахматова А.А.", "Ахматова", "А.А."),
+    Author("Цветаева М.И.", "Цветаева", "М.И."),
+    Author("Пастернак Б.Л.", "Пастернак", "Б.Л."),
+    Author("Булгаков М.А.", "Булгаков", "М.А."),
+    Author("Ильф И.А.", "Ильф", "И.А."),
+    Author("Петров Е.П.", "Петров", "Е.П.", bare=False, forms=("Евгений Петров", "Евгения Петрова")),
+    Author("Зощенко М.М.", "Зощенко", "М.М."),
+    Author("Шолохов М.А.", "Шолохов", "М.А."),
+    Author("Твардовский А.Т.", "Твардовский", "А.Т."),
+    Author("Паустовский К.Г.", "Паустовский", "К.Г."),
+    Author("Маршак С.Я.", "Маршак", "С.Я."),
+    Author("Чуковский К.И.", "Чуковский", "К.И."),
+    Author("Михалков С.В.", "Михалков", "С.В."),
+    Author("Козьма Прутков", "Прутков", "К."),
+    Author("Шекспир У.", "Шекспир", "У."),
+    Author("Сервантес М.", "Сервантес", "М."),
+    Author("Свифт Дж.", "Свифт", "Дж."),
+    Author("Дефо Д.", "Дефо", "Д."),
+    Author("Бальзак О.", "Бальзак", "О."),
+    Author("Гюго В.", "Гюго", "В."),
+    Author("Мольер Ж.-Б.", "Мольер", "Ж.-Б."),
+    Author("Рабле Ф.", "Рабле", "Ф."),
+    Author("Вольтер", "Вольтер"),
+    Author("Гёте И.В.", "Гёте", "И.В."),
+    Author("Лафонтен Ж.", "Лафонтен", "Ж."),
+    Author("Эзоп", "Эзоп"),
+    Author("Гомер", "Гомер"),
+    Author("Вергилий", "Вергилий"),
+    Author("Овидий", "Овидий"),
+    Author("Гораций", "Гораций"),
+    Author("Данте А.", "Данте", "А."),
+)
+
+_ADJECTIVAL = ('ский', 'цкий', 'кий', 'гий', 'хий', 'ой', 'ый')
+_INDECLINABLE = tuple('оеиуюэ')
+_HUSHING = tuple('жшчщкгх')
+# ё/е are spelled either way and non-breaking spaces stand between initials;
+# the mapping is one to one, so positions in the folded text are those of the original
+_FOLD = str.maketrans({'ё': 'е', 'Ё': 'Е', '\xa0': ' ', '\u2009': ' ', '\u202f': ' '})
+
+
+def surname_cases(surname: str) -> List[str]:
+    """Nominative, genitive, dative, accusative, instrumental and prepositional of a male
+    (or -ова/-ева/-ина female) surname; hyphenated surnames decline in every part."""
+    if '-' in surname:
+        parts = [surname_cases(part) for part in surname.split('-')]
+        return ['-'.join(forms) for forms in zip(*parts)]
+    if surname.endswith(('ова', 'ева', 'ёва', 'ина', 'ына')):
+        stem = surname[:-1]
+        return [surname, stem + 'ой', stem + 'ой', stem + 'у', stem + 'ой', stem + 'ой']
+    if surname.endswith(('ов', 'ев', 'ёв', 'ин', 'ын')):
+        return [surname, surname + 'а', surname + 'у', surname + 'а', surname + 'ым', surname + 'е']
+    if surname.endswith(_ADJECTIVAL):
+        stem = surname[:-2]
+        instrumental = 'им' if surname.endswith('ий') else 'ым'
+        return [surname, stem + 'ого', stem + 'ому', stem + 'ого', stem + instrumental, stem + 'ом']
+    if surname.endswith('ий'):
+        stem = surname[:-2]
+        return [surname, stem + 'ия', stem + 'ию', stem + 'ия', stem + 'ием', stem + 'ии']
+    if surname.endswith(('ь', 'й')):
+        stem = surname[:-1]
+        return [surname, stem + 'я', stem + 'ю', stem + 'я', stem + 'ем', stem + 'е']
+    if surname.endswith('а'):
+        stem = surname[:-1]
+        genitive = stem + ('и' if stem.endswith(_HUSHING) else 'ы')
+        return [surname, genitive, stem + 'е', stem + 'у', stem + 'ой', stem + 'е']
+    if surname.endswith(_INDECLINABLE):
+        return [surname] * 6
+    return [surname, surname + 'а', surname + 'у', surname + 'а', surname + 'ом', surname + 'е']
+
+
+def author_forms(author: Author) -> List[str]:
+    """Every spelling of the author the gazetteer recognises."""
+    cases = list(dict.fromkeys(surname_cases(author.surname)))
+    forms = list(cases) if author.bare else []
+    if author.initials:
+        letters = [letter + '.' for letter in author.initials.split('.') if letter]
+        prefixes = {''.join(letters), ' '.join(letters), letters[0]}
+        for case in cases:
+            for prefix in prefixes:
+                forms += [f"{prefix} {case}", f"{prefix}{case}"]
+            forms += [f"{case} {''.join(letters)}", f"{case} {' '.join(letters)}"]
+    return forms + list(author.forms)
+
+
+def load_authors(path: Union[str, Path]) -> List[Author]:
+    """Author table from a JSON list of {"name", "surname", "initials", "bare", "forms"} objects."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [Author(item['name'], item['surname'], item.get('initials', ''), item.get('bare', True),
+                       tuple(item.get('forms', ()))) for item in json.load(f)]
+
+
+class AuthorGazetteer:
+    """All forms of all authors in one Aho-Corasick automaton."""
+
+    def __init__(self, authors: Iterable[Author] = AUTHORS):
+        self.names: List[str] = []
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Tuple[Tuple[int, int], ...]] = [()]  # (form length, name index)
+        forms: Dict[str, int] = {}
+        for author in authors:
+            self.names.append(author.name)
+            for form in author_forms(author):
+                forms.setdefault(form.translate(_FOLD), len(self.names) - 1)  # the first author listed wins
+        for form, name in forms.items():
+            self._add(form, name)
+        self._link()
+        self.forms = len(forms)
+
+    def _add(self, form: str, name: int) -> None:
+        node = 0
+        for char in form:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = self.goto[node][char] = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            node = child
+        self.output[node] = ((len(form), name),)
+
+    def _link(self) -> None:
+        """Failure links breadth first; each node also reports the forms ending at its suffixes."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                fallback = self.goto[state].get(char, 0)
+                self.fail[child] = fallback if fallback != child else 0
+                self.output[child] += self.output[self.fail[child]]
+                queue.append(child)
+
+    def __len__(self) -> int:
+        return len(self.goto)
+
+    def scan(self, text: str) -> List[AuthorMatch]:
+        """Whole-word mentions in text order; of overlapping ones the longest is kept."""
+        folded = text.translate(_FOLD)
+        goto, fail, output = self.goto, self.fail, self.output
+        root = goto[0]
+        found: List[Tuple[int, int, int]] = []
+        node = 0
+        for end, char in enumerate(folded, 1):
+            if not node and char not in root:
+                continue
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, name in output[node]:
+                start = end - length
+                if (not start or not folded[start - 1].isalpha()) and (end == len(folded) or not folded[end].isalpha()):
+                    found.append((start, end, name))
+
+        matches: List[AuthorMatch] = []
+        for start, end, name in sorted(found, key=lambda match: (match[0], -match[1])):
+            if matches and start < matches[-1].end:
+                continue
+            matches.append(AuthorMatch(start, end, self.names[name], text[start:end]))
+        return matches
+
+    def author_near(self, text: str, start: int, end: int, window: int,
+                    matches: Optional[Sequence[AuthorMatch]] = None) -> Optional[str]:
+        """The author mentioned closest to text[start:end], within `window` characters of it."""
+        best: Optional[Tuple[int, str]] = None
+        for match in self.scan(text) if matches is None else matches:
+            if match.start < start - window or match.end > end + window:
+                continue
+            distance = max(start - match.end, match.start - end, 0)
+            if best is None or distance < best[0]:
+                best = (distance, match.name)
+        return best[1] if best else None
+
+
+@lru_cache(maxsize=None)
+def default_gazetteer() -> AuthorGazetteer:
+    return AuthorGazetteer(AUTHORS)
+
+
+_CHAINED_AUTHORS = (("Крылов", "Крылов И.А."), ("Горький", "Горький М."), ("Пушкин", "Пушкин А.С."),
+                    ("Толстой", "Толстой Л.Н."), ("Гоголь", "Гоголь Н.В."), ("Чехов", "Чехов А.П."))
+
+
+def _chained_author(text: str) -> Optional[str]:
+    """The original if/elif substring chain over six surnames, for comparison."""
+    return next((name for surname, name in _CHAINED_AUTHORS if surname in text), None)
+
+
+def synthetic_authors(count: int, seed: int = 0) -> List[Author]:
+    """`count` made-up authors with -ов/-ин/-ский surnames, for timing."""
+    rng = random.Random(seed)
+    syllables = ['ба', 'ве', 'го', 'да', 'жу', 'зи', 'ко', 'ла', 'ми', 'но', 'пе', 'ру', 'со', 'ту', 'фе', 'ха']
+    letters = 'АБВГДЕЗИКЛМНОПРСТФ'
+    authors = []
+    while len(authors) < count:
+        surname = ''.join(rng.choices(syllables, k=3)).capitalize() + rng.choice(['ов', 'ин', 'ский'])
+        initials = f"{rng.choice(letters)}.{rng.choice(letters)}."
+        authors.append(Author(f"{surname} {initials}", surname, initials))
+    return authors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find writers named in the etymologies.")
+    parser.add_argument("json_file", nargs='?', default='table_phrases_cleaned.json')
+    parser.add_argument("--authors", metavar="PATH", help="JSON author table instead of the built-in one")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="time the scan with hundreds of extra (synthetic) authors")
+    args = parser.parse_args()
+
+    authors = load_authors(args.authors) if args.authors else list(AUTHORS)
+    etymologies = [entry['etymology'] for entry in PhraseStore.load(args.json_file) if entry.get('etymology')]
+    gazetteer = AuthorGazetteer(authors)
+    mentions = [gazetteer.scan(text) for text in etymologies]
+    named = Counter(name for found in mentions for name in {match.name for match in found})
+    print(f"Authors: {len(authors)}, forms: {gazetteer.forms}, automaton states: {len(gazetteer)}")
+    print(f"Etymologies naming an author: {sum(map(bool, mentions))}/{len(etymologies)} "
+          f"(six-surname chain: {sum(_chained_author(text) is not None for text in etymologies)})")
+    for name, count in named.most_common():
+        print(f"  {count:4d}  {name}")
+
+    if args.benchmark:
+        for extra in (0, 100, 1000):
+            table = authors + synthetic_authors(extra)
+            scanner = AuthorGazetteer(table)
+            forms = [(form, author.name) for author in table for form in author_forms(author)]
+            started = time.perf_counter()
+            for text in etymologies:
+                scanner.scan(text)
+            scanned = time.perf_counter() - started
+            started = time.perf_counter()
+            for text in etymologies:
+                [name for form, name in forms if form in text]
+            chained = time.perf_counter() - started
+            per_text = 1e6 / len(etymologies)
+            print(f"{len(table):5d} authors, {len(forms):6d} forms: automaton {scanned * per_text:7.1f} µs, "
+                  f"substring checks {chained * per_text:8.1f} µs per etymology")
@@ -4,117 +4,136 @@
 Script to generate MySQL database from table_phrases_cleaned.json
 """
 
-import json
+import argparse
 import os
 import sys
 
-def escape_sql_string(text):
-    """Escape string for SQL"""
-    if text is None:
-        return 'NULL'
-    # Replace single quotes and backslashes
-    escaped = text.replace("\\", "\\\\").replace("'", "\\'")
-    return f"'{escaped}'"
+from db_loader import DEFAULT_CHUNK_SIZE, create_mysql_database, format_stats, load_phrases, mysql_pool, sqlite_pool
+from phrase_store import PhraseStore
+from sql_dump import add_dump_arguments, export_phrases
 
-def generate_sql_dump():
-    """Generate SQL dump file from JSON data"""
+def generate_sql_dump(batch_bytes=None, compression=None, fmt='sql', dialect='mysql', delta=False,
+                      shards=None, shard_by='id', layout='flat'):
+    """Generate SQL dump file from JSON data
+
+    Serialization is delegated to the shared engine in sql_dump.py: `fmt`
+    picks an INSERT/COPY dump ('sql'), a LOAD DATA data file ('tsv'/'csv')
+    or a ready SQLite database ('sqlite'); `dialect` picks the SQL flavour.
+    """
     
     # Read JSON data
-    with open('table_phrases_cleaned.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    phrases = data['phrases']
-    
-    # Generate SQL content
-    sql_content = []
-    
-    # Add header
-    sql_content.append("-- MySQL dump for phraseological dictionary")
-    sql_content.append("-- Generated from table_phrases_cleaned.json (deduplicated)")
-    sql_content.append(f"-- Total phrases: {len(phrases)}")
-    sql_content.append("")
-    sql_content.append("SET NAMES utf8mb4;")
-    sql_content.append("SET FOREIGN_KEY_CHECKS = 0;")
-    sql_content.append("")
-    
-    # Drop table if exists
-    sql_content.append("-- Drop table if exists")
-    sql_content.append("DROP TABLE IF EXISTS `phraseological_dict`;")
-    sql_content.append("")
-    
-    # Create table
-    sql_content.append("-- Table structure for phraseological_dict")
-    sql_content.append("CREATE TABLE `phraseological_dict` (")
-    sql_content.append("  `id` int(11) NOT NULL AUTO_INCREMENT,")
-    sql_content.append("  `phrase` varchar(500) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Фразеологизм',")
-    sql_content.append("  `meaning` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Значение фразеологизма',")
-    sql_content.append("  `etymology` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Происхождение фразеологизма',")
-    sql_content.append("  `usage_example` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Пример использования фразеологизма в тексте',")
-    sql_content.append("  `categories` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Категория фразеологизма',")
-    sql_content.append("  `source_url` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Источник',")
-    sql_content.append("  PRIMARY KEY (`id`),")
-    sql_content.append("  UNIQUE KEY `phrase` (`phrase`),")
-    sql_content.append("  KEY `categories` (`categories`)")
-    sql_content.append(") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Словарь фразеологизмов русского языка';")
-    sql_content.append("")
-    sql_content.append("-- Data for table phraseological_dict")
-    sql_content.append("LOCK TABLES `phraseological_dict` WRITE;")
-    sql_content.append("")
-    
-    # Insert data
-    for i, phrase_data in enumerate(phrases, 1):
-        phrase = phrase_data['phrase']
-        meaning = phrase_data['meanings'][0] if phrase_data['meanings'] else ''
-        etymology = phrase_data.get('etymology', None)
-        categories = phrase_data.get('category', '')
-        source_url = phrase_data.get('source_url', None)
-        
-        # Handle empty category
-        if categories == '':
-            categories = None
-            
-        sql_line = f"INSERT INTO `phraseological_dict` (`id`, `phrase`, `meaning`, `etymology`, `usage_example`, `categories`, `source_url`) VALUES ({i}, {escape_sql_string(phrase)}, {escape_sql_string(meaning)}, {escape_sql_string(etymology)}, NULL, {escape_sql_string(categories)}, {escape_sql_string(source_url)});"
-        sql_content.append(sql_line)
-    
-    sql_content.append("")
-    sql_content.append("UNLOCK TABLES;")
-    sql_content.append("SET FOREIGN_KEY_CHECKS = 1;")
+    phrases = PhraseStore.load('table_phrases_cleaned.json')
     
-    # Write SQL dump
-    with open('phraseological_dict.sql', 'w', encoding='utf-8') as f:
-        f.write('\n'.join(sql_content))
+    comment_lines = [
+        "-- Generated from table_phrases_cleaned.json (deduplicated)",
+        f"-- Total phrases: {len(phrases)}",
+    ]
     
-    print(f"SQL dump created successfully: phraseological_dict.sql")
+    # Write SQL dump
+    output_path = export_phrases(
+        phrases,
+        'phraseological_dict.sql',
+        comment_lines,
+        fmt=fmt,
+        dialect=dialect,
+        batch_bytes=batch_bytes,
+        compression=compression,
+        delta=delta,
+        shards=shards,
+        shard_by=shard_by,
+        layout=layout,
+    )
+    
+    print(f"SQL dump created successfully: {output_path}")
     print(f"Total phrases processed: {len(phrases)}")
     
     return len(phrases)
 
-def main():
-    """Main function to generate SQL dump"""
+def create_database_and_import(config, chunk_size=DEFAULT_CHUNK_SIZE, sqlite_path=None):
+    """Load table_phrases_cleaned.json straight into a database
+
+    Uses a pooled connection and parameterised executemany batches of
+    `chunk_size` rows in one transaction; indexes are built after the load.
+    With `sqlite_path` the rows go to an SQLite file instead of MySQL.
+    """
+    
+    phrases = PhraseStore.load('table_phrases_cleaned.json')
+    
+    if sqlite_path:
+        pool = sqlite_pool(sqlite_path)
+        dialect = 'sqlite'
+        target = sqlite_path
+    else:
+        create_mysql_database(config)
+        pool = mysql_pool(config)
+        dialect = 'mysql'
+        target = f"{config['user']}@{config['host']}/{config['database']}"
+    
+    try:
+        stats = load_phrases(pool, phrases, dialect=dialect, chunk_size=chunk_size)
+    finally:
+        pool.close()
+    
+    print(format_stats(stats, target))
+    
+    return stats['rows']
+
+def main(args):
+    """Load the phrases directly into the configured database"""
     
     # Database configuration - modify these settings as needed
     config = {
-        'host': 'localhost',
-        'user': 'root',
-        'password': '',
+        'host': args.host,
+        'user': args.user,
+        'password': args.password,
+        'database': args.database,
         'charset': 'utf8mb4'
     }
     
-    print("Note: For direct database import, install mysql-connector-python:")
-    print("pip install mysql-connector-python")
-    print("Then uncomment the create_database_and_import() call below.")
-    print()
+    try:
+        create_database_and_import(config, chunk_size=args.chunk_size, sqlite_path=args.sqlite)
+    except RuntimeError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
 
 if __name__ == "__main__":
-    print("Generating MySQL database from table_phrases_cleaned.json (deduplicated)...")
+    parser = argparse.ArgumentParser(description="Generate MySQL dump from table_phrases_cleaned.json")
+    add_dump_arguments(parser)
+    subparsers = parser.add_subparsers(dest="command")
+    load_parser = subparsers.add_parser("load", help="load the phrases directly into MySQL (or SQLite) instead of writing a dump")
+    load_parser.add_argument("--host", default="localhost")
+    load_parser.add_argument("--user", default="root")
+    load_parser.add_argument("--password", default=os.environ.get("MYSQL_PWD", ""),
+                             help="defaults to the MYSQL_PWD environment variable")
+    load_parser.add_argument("--database", default="phraseological_db")
+    load_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                             help=f"rows per executemany batch (default: {DEFAULT_CHUNK_SIZE})")
+    load_parser.add_argument("--sqlite", metavar="PATH", default=None,
+                             help="load into this SQLite file instead of MySQL (local stand-in)")
+    args = parser.parse_args()
     
     # Check if JSON file exists
     if not os.path.exists('table_phrases_cleaned.json'):
         print("Error: table_phrases_cleaned.json not found!")
         sys.exit(1)
     
+    if args.command == "load":
+        main(args)
+        sys.exit(0)
+    
+    print("Generating MySQL database from table_phrases_cleaned.json (deduplicated)...")
+    
     # Generate SQL dump
-    phrase_count = generate_sql_dump()
+    phrase_count = generate_sql_dump(
+        batch_bytes=args.batch_bytes,
+        compression=args.compress,
+        fmt=args.format,
+        dialect=args.dialect,
+        delta=args.delta,
+        shards=args.shards,
+        shard_by=args.shard_by,
+        layout=args.layout,
+    )
     
     print(f"\nGenerated files:")
     print("1. phraseological_dict.sql - SQL dump ready for import")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Load phrases straight into a database, without an intermediate SQL dump.
+
+Rows come from the same mapping as the dumps (sql_dump.phrase_rows) and are
+written with parameterised `executemany` batches through a pooled
+connection: the table is created without secondary indexes, all chunks are
+inserted in one transaction, and the indexes are built after the load.
+
+MySQL/MariaDB needs the optional mysql-connector-python package; SQLite
+(stdlib) works as a local stand-in for testing.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+from sql_dump import COLUMNS, TABLE_NAME, get_dialect, phrase_rows
+
+try:
+    import mysql.connector
+except ImportError:  # optional, only needed for direct MySQL loading
+    mysql = None
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_POOL_SIZE = 2
+
+
+class ConnectionPool:
+    """Minimal thread-safe pool around any DB-API connection factory."""
+
+    def __init__(self, factory: Callable[[], object], size: int = DEFAULT_POOL_SIZE):
+        self._factory = factory
+        self._idle: "queue.LifoQueue" = queue.LifoQueue(maxsize=size)
+        self._all = []
+        self._size = size
+        self._lock = threading.Lock()  # guards the lazy creation below
+
+    @contextmanager
+    def connection(self) -> Iterator:
+        """Borrow a connection, creating one lazily until the pool is full."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = len(self._all) < self._size
+                if create:
+                    conn = self._factory()
+                    self._all.append(conn)
+            if not create:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        for conn in self._all:
+            conn.close()
+        self._all.clear()
+
+
+def mysql_pool(config: Dict, size: int = DEFAULT_POOL_SIZE) -> ConnectionPool:
+    """Pool of mysql-connector connections for `config` (host, user, password, database...)."""
+    if mysql is None:
+        raise RuntimeError("Direct MySQL loading requires mysql-connector-python: pip install mysql-connector-python")
+    return ConnectionPool(lambda: mysql.connector.connect(autocommit=False, **config), size)
+
+
+def sqlite_pool(path: str, size: int = 1) -> ConnectionPool:
+    """Pool of SQLite connections, used as a local stand-in for MySQL."""
+    # isolation_level=None: transactions are managed explicitly by load_rows
+    return ConnectionPool(lambda: sqlite3.connect(path, isolation_level=None, check_same_thread=False), size)
+
+
+def create_mysql_database(config: Dict) -> None:
+    """Create `config['database']` with utf8mb4 if it does not exist yet."""
+    if mysql is None:
+        raise RuntimeError("Direct MySQL loading requires mysql-connector-python: pip install mysql-connector-python")
+    server_config = {key: value for key, value in config.items() if key != 'database'}
+    conn = mysql.connector.connect(**server_config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"CREATE DATABASE IF NOT EXISTS `{config['database']}` "
+            "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
+        )
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def _chunks(rows: Iterable[Sequence], size: int) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_rows(
+    pool: ConnectionPool,
+    rows: Iterable[Sequence],
+    dialect: str = 'mysql',
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict:
+    """
+    Recreate the table and load `rows` through one pooled connection.
+
+    Returns load statistics: rows, chunks, seconds and rows_per_sec.
+    """
+    dialect = get_dialect(dialect)
+    placeholders = ', '.join(dialect.placeholder for _ in COLUMNS)
+    insert_sql = f"{dialect.insert_prefix()} ({placeholders})"
+    begin_sql = dialect.begin().rstrip(';')
+
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        for statement in dialect.drop_relation(TABLE_NAME):
+            cursor.execute(statement.rstrip(';'))
+        cursor.execute('\n'.join(dialect.create_table(with_indexes=False)[1:]).rstrip(';'))
+
+        started = time.perf_counter()
+        count = 0
+        chunks = 0
+        cursor.execute(begin_sql)
+        try:
+            for chunk in _chunks(rows, chunk_size):
+                cursor.executemany(insert_sql, chunk)
+                count += len(chunk)
+                chunks += 1
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        elapsed = time.perf_counter() - started
+
+        for statement in dialect.create_indexes() + dialect.sync_sequence():
+            cursor.execute(statement.rstrip(';'))
+        cursor.close()
+
+    return {
+        'rows': count,
+        'chunks': chunks,
+        'seconds': elapsed,
+        'rows_per_sec': count / elapsed if elapsed else float('inf'),
+    }
+
+
+def load_phrases(
+    pool: ConnectionPool,
+    phrases: Iterable[Dict],
+    dialect: str = 'mysql',
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict:
+    """Load JSON phrase entries with the same column mapping as the SQL dumps."""
+    return load_rows(pool, phrase_rows(phrases), dialect, chunk_size)
+
+
+def format_stats(stats: Dict, target: Optional[str] = None) -> str:
+    where = f" into {target}" if target else ""
+    return (
+        f"Loaded {stats['rows']} rows{where} in {stats['chunks']} chunks, "
+        f"{stats['seconds']:.3f}s ({stats['rows_per_sec']:.0f} rows/sec)"
+    )
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Incremental deduplication with a persistent normalized-phrase index.
+
+`deduplicate_phrases.main` re-reads and re-merges the whole corpus, writes
+a new timestamped backup and regenerates the full report on every run.
+For daily ingestion this module keeps the deduplicated corpus in a SQLite
+index instead:
+
+    phrases(key, position, base, fields, entries)
+
+`key` is `normalize_phrase(phrase)`, `position` the order of first
+appearance, `base` the first entry seen for the key and `fields` the
+accumulated merge fields of `deduplicate_phrases.merge_fields` (meanings,
+etymology, categories and source URLs as lists). Adding an entry is one
+primary-key lookup plus `merge_fields`, and the stored entry is
+`merged_entry(base, fields)` -- the same result as merging all entries of
+the key at once, so an index built batch by batch exports exactly what
+`find_and_remove_duplicates` writes for the concatenated input.
+
+Each batch is logged in `batches`, and its report (DEDUPLICATION_DELTA_REPORT.md)
+covers only what the batch added or changed.
+
+    python3 dedup_index.py init table_phrases.json
+    python3 dedup_index.py add new_scrape.json --export table_phrases_cleaned.json
+    python3 dedup_index.py export table_phrases_cleaned.json
+"""
+
+import argparse
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from deduplicate_phrases import merge_fields, merged_entry
+from phrase_store import dump_json, iter_json_phrases, normalize_phrase
+
+DEFAULT_INDEX = Path('dedup_index.sqlite')
+DEFAULT_REPORT = Path('DEDUPLICATION_DELTA_REPORT.md')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS phrases (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL UNIQUE,
+    base TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    entries INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    added_at TEXT NOT NULL,
+    entries INTEGER NOT NULL,
+    new_phrases INTEGER NOT NULL,
+    merged_phrases INTEGER NOT NULL
+);
+"""
+
+
+def _json(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class DedupIndex:
+    """Deduplicated corpus in SQLite, updated one batch of entries at a time."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_INDEX):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'DedupIndex':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM phrases").fetchone()[0]
+
+    def add_batch(self, entries: Iterable[Dict], source: str = '') -> Dict:
+        """
+        Merge a batch into the index in one transaction and describe the delta.
+
+        Returns the batch statistics with `new` (merged entries of phrases
+        first seen in this batch) and `merged` (key, entry before, entry
+        after, entries added) for existing phrases the batch changed.
+        Entries that add nothing to an existing phrase only count as
+        `unchanged`.
+        """
+        connection = self.connection
+        next_position = connection.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM phrases").fetchone()[0]
+        touched: Dict[str, List] = {}  # key -> [position, base, fields, entries, before or None, added]
+        count = 0
+        for entry in entries:
+            count += 1
+            key = normalize_phrase(entry.get("phrase", ""))
+            state = touched.get(key)
+            if state is None:
+                row = connection.execute(
+                    "SELECT position, base, fields, entries FROM phrases WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    state = [next_position, entry, None, 0, None, 0]
+                    next_position += 1
+                else:
+                    base, fields = json.loads(row[1]), json.loads(row[2])
+                    state = [row[0], base, fields, row[3], merged_entry(base, fields), 0]
+                touched[key] = state
+            state[2] = merge_fields(state[2], entry)
+            state[3] += 1
+            state[5] += 1
+
+        new: List[Dict] = []
+        merged: List[Tuple[str, Dict, Dict, int]] = []
+        unchanged = 0
+        rows = []
+        for key, (position, base, fields, total, before, added) in touched.items():
+            after = merged_entry(base, fields)
+            if before is None:
+                new.append(after)
+            elif after != before:
+                merged.append((key, before, after, added))
+            else:
+                unchanged += added
+            rows.append((key, position, _json(base), _json(fields), total))
+
+        added_at = datetime.now().isoformat(timespec='seconds')
+        with connection:
+            connection.executemany(
+                "INSERT INTO phrases (key, position, base, fields, entries) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET fields = excluded.fields, entries = excluded.entries",
+                rows,
+            )
+            batch_id = connection.execute(
+                "INSERT INTO batches (source, added_at, entries, new_phrases, merged_phrases) VALUES (?, ?, ?, ?, ?)",
+                (source, added_at, count, len(new), len(merged)),
+            ).lastrowid
+        return {
+            "batch": batch_id,
+            "source": source,
+            "added_at": added_at,
+            "entries": count,
+            "new": new,
+            "merged": merged,
+            "unchanged": unchanged,
+            "total_after": len(self),
+        }
+
+    def entries(self) -> Iterator[Dict]:
+        """Deduplicated entries in order of first appearance."""
+        for base, fields in self.connection.execute("SELECT base, fields FROM phrases ORDER BY position"):
+            yield merged_entry(json.loads(base), json.loads(fields))
+
+    def export(self, path: Union[str, Path]) -> int:
+        """Write the deduplicated corpus as `find_and_remove_duplicates` would; returns the entry count."""
+        return dump_json(path, self.entries(), {})
+
+
+def _changes(before: Dict, after: Dict) -> List[str]:
+    changes = []
+    added_meanings = [m for m in after["meanings"] if m not in before["meanings"]]
+    if added_meanings:
+        changes.append(f"значений: +{len(added_meanings)}")
+    if after["etymology"] != before["etymology"]:
+        changes.append("этимология добавлена")
+    if after["category"] != before["category"]:
+        changes.append(f"категории: {after['category']}")
+    if after["source_url"] != before["source_url"]:
+        changes.append("новый источник")
+    return changes
+
+
+def generate_delta_report(delta: Dict, report_path: Path) -> None:
+    """Отчёт в формате Markdown только по изменениям одной партии."""
+    lines: List[str] = [
+        f"# Отчёт о партии {delta['batch']}: добавление в дедуплицированный словарь",
+        "",
+        f"**Дата выполнения:** {datetime.fromisoformat(delta['added_at']).strftime('%d.%m.%Y %H:%M:%S')}",
+        f"**Источник:** `{delta['source']}`",
+        "**Скрипт:** `dedup_index.py`",
+        "",
+        "---",
+        "",
+        "## 📊 Статистика партии",
+        "",
+        "| Параметр | Значение |",
+        "|----------|----------|",
+        f"| **Записей в партии** | {delta['entries']} |",
+        f"| **Новых фразеологизмов** | {len(delta['new'])} |",
+        f"| **Дополнены существующие** | {len(delta['merged'])} |",
+        f"| **Повторы без новых данных** | {delta['unchanged']} |",
+        f"| **Фразеологизмов в словаре** | {delta['total_after']} |",
+        "",
+        "---",
+        "",
+        "## 🆕 Новые фразеологизмы",
+        "",
+    ]
+    if delta["new"]:
+        lines.extend(["| Фраза | Категория |", "|-------|-----------|"])
+        for entry in delta["new"]:
+            lines.append(f"| {entry['phrase']} | {entry['category'] or '_нет данных_'} |")
+    else:
+        lines.append("Новых фразеологизмов нет.")
+    lines.extend(["", "---", "", "## 🔄 Дополненные записи", ""])
+    if delta["merged"]:
+        for idx, (_, before, after, added) in enumerate(delta["merged"], 1):
+            lines.append(f"### {idx}. Фраза: \"{after['phrase']}\"")
+            lines.append("")
+            lines.append(f"**Записей в партии:** {added}")
+            lines.append(f"**Изменения:** {', '.join(_changes(before, after))}")
+            lines.append("")
+            for meaning in after["meanings"]:
+                lines.append(f"- {meaning}{' _(новое)_' if meaning not in before['meanings'] else ''}")
+            lines.append("")
+    else:
+        lines.append("Существующие записи не изменились.")
+        lines.append("")
+    report_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def add_file(index: DedupIndex, path: Union[str, Path]) -> Dict:
+    """Add the entries of a `{"phrases": [...]}` file as one batch (streamed, not loaded whole)."""
+    return index.add_batch(iter_json_phrases(path), str(path))
+
+
+def print_delta(delta: Dict) -> None:
+    print(f"📥 Партия {delta['batch']} ({delta['source']}): записей {delta['entries']}, "
+          f"новых фраз {len(delta['new'])}, дополнено {len(delta['merged'])}, "
+          f"повторов без изменений {delta['unchanged']}")
+    print(f"📊 Фразеологизмов в индексе: {delta['total_after']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental deduplication with a persistent SQLite index.")
+    parser.add_argument("--index", default=str(DEFAULT_INDEX), help="index database (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    init = commands.add_parser("init", help="(re)build the index from a full corpus")
+    init.add_argument("corpus", nargs='?', default='table_phrases.json')
+    add = commands.add_parser("add", help="merge a batch of new entries")
+    add.add_argument("batch", help="JSON file with a 'phrases' list")
+    add.add_argument("--report", default=str(DEFAULT_REPORT), help="delta report path (default: %(default)s)")
+    for command in (init, add):
+        command.add_argument("--export", metavar="PATH", help="also write the deduplicated corpus as JSON")
+    export = commands.add_parser("export", help="write the deduplicated corpus as JSON")
+    export.add_argument("output", nargs='?', default='table_phrases_cleaned.json')
+    args = parser.parse_args()
+
+    if args.command == "init":
+        Path(args.index).unlink(missing_ok=True)
+    with DedupIndex(args.index) as dedup:
+        if args.command == "export":
+            print(f"💾 {dedup.export(args.output)} entries written to {args.output}")
+        else:
+            result = add_file(dedup, args.corpus if args.command == "init" else args.batch)
+            print_delta(result)
+            if args.command == "add":
+                generate_delta_report(result, Path(args.report))
+                print(f"📝 Отчёт о партии сохранен в: {args.report}")
+            if args.export:
+                print(f"💾 {dedup.export(args.export)} entries written to {args.export}")
@@ -4,76 +4,70 @@
 
 from __future__ import annotations
 
+import argparse
 import json
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from near_duplicates import MERGE_THRESHOLD, REVIEW_THRESHOLD, find_near_duplicates
+from phrase_store import PhraseStore, normalize_phrase
 
-def normalize_phrase(phrase: str) -> str:
-    """Нормализуем фразу: удаляем лишние пробелы и приводим к нижнему регистру."""
-    return " ".join(phrase.lower().strip().split())
 
+def merge_fields(fields: Optional[Dict], entry: Dict) -> Dict:
+    """
+    Добавляет данные записи к накопленным полям объединения.
 
-def merge_duplicate_entries(entries: List[Dict]) -> Dict:
-    """Объединяет несколько записей в одну, собирая все уникальные данные."""
-    base = entries[0]
-    merged = {k: v for k, v in base.items() if k not in {"phrase", "meanings", "etymology", "source_url", "category"}}
-    merged["phrase"] = " ".join(base.get("phrase", "").strip().split())
+    Поля хранятся списками (значения, категории, источники), поэтому записи
+    можно добавлять по одной, в том числе к сохранённому ранее результату:
+    итог тот же, что при объединении всех записей сразу.
+    """
+    if fields is None:
+        fields = {"meanings": [], "etymology": "", "categories": [], "source_urls": []}
 
     # Meanings
-    merged_meanings: List[str] = []
-    seen_meanings = set()
-    for entry in entries:
-        for meaning in entry.get("meanings", []) or []:
-            normalized = meaning.strip()
-            if normalized and normalized not in seen_meanings:
-                seen_meanings.add(normalized)
-                merged_meanings.append(normalized)
-    merged["meanings"] = merged_meanings
+    for meaning in entry.get("meanings", []) or []:
+        normalized = meaning.strip()
+        if normalized and normalized not in fields["meanings"]:
+            fields["meanings"].append(normalized)
 
     # Etymology
-    merged["etymology"] = ""
-    for entry in entries:
-        etym = (entry.get("etymology") or "").strip()
-        if etym:
-            merged["etymology"] = etym
-            break
+    if not fields["etymology"]:
+        fields["etymology"] = (entry.get("etymology") or "").strip()
 
     # Categories
-    categories: List[str] = []
-    seen_categories = set()
-    for entry in entries:
-        category = (entry.get("category") or "").strip()
-        if category and category not in seen_categories:
-            seen_categories.add(category)
-            categories.append(category)
-    if len(categories) > 1:
-        merged["category"] = ", ".join(categories)
-    elif categories:
-        merged["category"] = categories[0]
-    else:
-        merged["category"] = ""
+    category = (entry.get("category") or "").strip()
+    if category and category not in fields["categories"]:
+        fields["categories"].append(category)
 
     # Source URLs
-    source_urls: List[str] = []
-    seen_urls = set()
-    for entry in entries:
-        url = (entry.get("source_url") or "").strip()
-        if url and url not in seen_urls:
-            seen_urls.add(url)
-            source_urls.append(url)
-    if len(source_urls) > 1:
-        merged["source_url"] = " | ".join(source_urls)
-    elif source_urls:
-        merged["source_url"] = source_urls[0]
-    else:
-        merged["source_url"] = ""
+    url = (entry.get("source_url") or "").strip()
+    if url and url not in fields["source_urls"]:
+        fields["source_urls"].append(url)
+
+    return fields
+
 
+def merged_entry(base: Dict, fields: Dict) -> Dict:
+    """Собирает объединённую запись из первой записи группы и накопленных полей."""
+    merged = {k: v for k, v in base.items() if k not in {"phrase", "meanings", "etymology", "source_url", "category"}}
+    merged["phrase"] = " ".join(base.get("phrase", "").strip().split())
+    merged["meanings"] = list(fields["meanings"])
+    merged["etymology"] = fields["etymology"]
+    merged["category"] = ", ".join(fields["categories"])
+    merged["source_url"] = " | ".join(fields["source_urls"])
     return merged
 
 
+def merge_duplicate_entries(entries: List[Dict]) -> Dict:
+    """Объединяет несколько записей в одну, собирая все уникальные данные."""
+    fields = None
+    for entry in entries:
+        fields = merge_fields(fields, entry)
+    return merged_entry(entries[0], fields)
+
+
 def group_phrases(phrases: List[Dict]) -> Tuple[Dict[str, List[Dict]], List[str]]:
     """Группируем фразы по нормализованному ключу и сохраняем порядок появления."""
     groups: Dict[str, List[Dict]] = {}
@@ -89,17 +83,49 @@ def group_phrases(phrases: List[Dict]) -> Tuple[Dict[str, List[Dict]], List[str]
     return groups, order
 
 
-def find_and_remove_duplicates(input_path: Path, output_path: Path) -> Dict:
-    """Анализирует файл, выводит статистику и записывает очищенную версию."""
+def merge_near_duplicates(
+    phrases: Sequence[Dict], near_threshold: float, merge_threshold: Optional[float]
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Ищет похожие записи (MinHash/LSH) среди уже очищенных от точных дубликатов.
+
+    Кластеры с оценкой не ниже merge_threshold объединяются через
+    merge_duplicate_entries на месте первой записи, остальные только
+    попадают в отчёт для ручной проверки.
+    """
+    clusters: List[Dict] = []
+    replaced: Dict[int, Dict] = {}
+    removed = set()
+    for cluster in find_near_duplicates(phrases, near_threshold):
+        entries = [phrases[i] for i in cluster.indexes]
+        merged = merge_threshold is not None and cluster.score >= merge_threshold
+        if merged:
+            replaced[cluster.indexes[0]] = merge_duplicate_entries(entries)
+            removed.update(cluster.indexes[1:])
+        clusters.append({"score": cluster.score, "entries": entries, "merged": merged})
+
+    result = [replaced.get(i, entry) for i, entry in enumerate(phrases) if i not in removed]
+    return result, clusters
+
+
+def find_and_remove_duplicates(
+    input_path: Path,
+    output_path: Path,
+    near_threshold: Optional[float] = None,
+    merge_threshold: Optional[float] = None,
+) -> Dict:
+    """
+    Анализирует файл, выводит статистику и записывает очищенную версию.
+
+    С near_threshold дополнительно ищет похожие записи (ё/е, пунктуация,
+    порядок слов), с merge_threshold объединяет самые похожие из них.
+    """
     print("=" * 80)
     print("АНАЛИЗ И ОЧИСТКА ДУБЛИКАТОВ В table_phrases.json")
     print("=" * 80)
     print()
 
-    with input_path.open("r", encoding="utf-8") as source_file:
-        data = json.load(source_file)
-
-    phrases = data.get("phrases", [])
+    phrases = PhraseStore.load(input_path)
     total_before = len(phrases)
     print(f"📊 Всего фразеологизмов до очистки: {total_before}")
     print()
@@ -148,6 +174,22 @@ def find_and_remove_duplicates(input_path: Path, output_path: Path) -> Dict:
     for normalized in order:
         cleaned_phrases.append(merge_duplicate_entries(phrase_groups[normalized]))
 
+    near_duplicates: List[Dict] = []
+    near_removed = 0
+    if near_threshold is not None:
+        exact_count = len(cleaned_phrases)
+        cleaned_phrases, near_duplicates = merge_near_duplicates(cleaned_phrases, near_threshold, merge_threshold)
+        near_removed = exact_count - len(cleaned_phrases)
+        print("=" * 80)
+        print(f"ПОХОЖИЕ ЗАПИСИ (оценка ≥ {near_threshold})")
+        print("=" * 80)
+        print()
+        for idx, cluster in enumerate(near_duplicates, 1):
+            status = "объединено" if cluster["merged"] else "на проверку"
+            print(f"{idx}. [{cluster['score']:.2f}, {status}] " + " | ".join(e.get("phrase", "") for e in cluster["entries"]))
+        print(f"\n🔍 Найдено групп похожих записей: {len(near_duplicates)}, объединено записей: {near_removed}")
+        print()
+
     total_after = len(cleaned_phrases)
     with output_path.open("w", encoding="utf-8") as cleaned_file:
         json.dump({"phrases": cleaned_phrases}, cleaned_file, ensure_ascii=False, indent=2)
@@ -158,6 +200,8 @@ def find_and_remove_duplicates(input_path: Path, output_path: Path) -> Dict:
     print(f"📊 Всего фразеологизмов до очистки: {total_before}")
     print(f"🔍 Найдено уникальных фраз с дубликатами: {num_duplicates}")
     print(f"🗑️  Удалено дублирующихся записей: {total_duplicate_entries}")
+    if near_threshold is not None:
+        print(f"🧩 Объединено похожих записей: {near_removed}")
     print(f"✅ Фразеологизмов после очистки: {total_after}")
     print(f"📝 Результат сохранен в: {output_path}")
     print()
@@ -169,6 +213,10 @@ def find_and_remove_duplicates(input_path: Path, output_path: Path) -> Dict:
         "total_after": total_after,
         "duplicates_detail": duplicates,
         "duplicates_order": duplicates_order,
+        "near_threshold": near_threshold,
+        "merge_threshold": merge_threshold,
+        "near_duplicates": near_duplicates,
+        "near_duplicates_removed": near_removed,
     }
 
 
@@ -198,12 +246,24 @@ def generate_markdown_report(
         f"| **Найдено уникальных фраз с дубликатами** | {results['duplicates_found']} |",
         f"| **Всего дублирующихся записей удалено** | {results['duplicate_entries_removed']} |",
         f"| **Фразеологизмов после очистки** | {results['total_after']} |",
-        "",
-        "---",
-        "",
-        "## 🔍 Найденные дубликаты",
-        "",
     ]
+    near_duplicates: List[Dict] = results.get("near_duplicates") or []
+    if results.get("near_threshold") is not None:
+        lines.extend(
+            [
+                f"| **Групп похожих записей** | {len(near_duplicates)} |",
+                f"| **Похожих записей объединено** | {results['near_duplicates_removed']} |",
+            ]
+        )
+    lines.extend(
+        [
+            "",
+            "---",
+            "",
+            "## 🔍 Найденные дубликаты",
+            "",
+        ]
+    )
 
     duplicates_detail: Dict[str, List[Dict]] = results["duplicates_detail"]
     duplicates_order: List[str] = results["duplicates_order"]
@@ -212,6 +272,10 @@ def generate_markdown_report(
         lines.append("Дубликаты не обнаружены.")
         lines.append("")
     else:
+        shown = results.get("duplicates_shown", results["duplicates_found"])
+        if shown < results["duplicates_found"]:
+            lines.append(f"_Показаны первые {shown} из {results['duplicates_found']} групп дубликатов._")
+            lines.append("")
         for idx, normalized in enumerate(duplicates_order, 1):
             entries = duplicates_detail[normalized]
             merged = merge_duplicate_entries(entries)
@@ -261,6 +325,9 @@ def generate_markdown_report(
             lines.append("---")
             lines.append("")
 
+    if results.get("near_threshold") is not None:
+        lines.extend(_near_duplicates_section(results))
+
     lines.extend(
         [
             "## 📁 Сгенерированные файлы",
@@ -288,13 +355,84 @@ def generate_markdown_report(
     report_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
 
-def main() -> None:
+def _near_duplicates_section(results: Dict) -> List[str]:
+    """Раздел отчёта с группами похожих записей (MinHash/LSH)."""
+    merge_threshold = results.get("merge_threshold")
+    lines = [
+        "## 🧩 Похожие записи",
+        "",
+        f"Группы записей с оценкой сходства не ниже {results['near_threshold']} "
+        "(фраза и первое значение, после учёта ё/е, пунктуации и порядка слов). "
+        + (
+            f"Группы с оценкой от {merge_threshold} объединены автоматически, остальные требуют проверки."
+            if merge_threshold is not None
+            else "Автоматическое объединение выключено: все группы требуют проверки."
+        ),
+        "",
+    ]
+    near_duplicates: List[Dict] = results["near_duplicates"]
+    if not near_duplicates:
+        lines.extend(["Похожие записи не обнаружены.", "", "---", ""])
+        return lines
+
+    lines.extend(["| № | Оценка | Статус | Фразы |", "|---|--------|--------|-------|"])
+    for idx, cluster in enumerate(near_duplicates, 1):
+        status = "объединено" if cluster["merged"] else "на проверку"
+        phrases = " / ".join(entry.get("phrase", "") for entry in cluster["entries"])
+        lines.append(f"| {idx} | {cluster['score']:.2f} | {status} | {phrases} |")
+    lines.append("")
+
+    for idx, cluster in enumerate(near_duplicates, 1):
+        lines.append(f"### {idx}. Оценка {cluster['score']:.2f}")
+        lines.append("")
+        for entry in cluster["entries"]:
+            meanings = entry.get("meanings", []) or []
+            meaning = meanings[0] if meanings else "_нет данных_"
+            category = entry.get("category") or "_нет данных_"
+            lines.append(f"- **{entry.get('phrase', '')}** ({category}) — {meaning}")
+        lines.append("")
+    lines.extend(["---", ""])
+    return lines
+
+
+def _print_totals(results: Dict) -> None:
+    print(f"📊 Всего фразеологизмов до очистки: {results['total_before']}")
+    print(f"🔍 Найдено уникальных фраз с дубликатами: {results['duplicates_found']}")
+    print(f"🗑️  Удалено дублирующихся записей: {results['duplicate_entries_removed']}")
+    print(f"✅ Фразеологизмов после очистки: {results['total_after']}")
+
+
+def main(
+    near_threshold: Optional[float] = None,
+    merge_threshold: Optional[float] = None,
+    stream: bool = False,
+    run_bytes: Optional[int] = None,
+    sources: Sequence[Path] = (),
+    workers: Optional[int] = None,
+) -> None:
     input_path = Path("table_phrases.json")
     cleaned_path = Path("table_phrases_cleaned.json")
     backup_path = Path(f"table_phrases_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
     report_path = Path("DEDUPLICATION_REPORT.md")
 
-    results = find_and_remove_duplicates(input_path, cleaned_path)
+    if stream:
+        # Imported here: streaming_dedup builds on this module
+        from streaming_dedup import RUN_BYTES, stream_deduplicate
+
+        print(f"🌊 Потоковая очистка {input_path} (внешняя сортировка)...")
+        results = stream_deduplicate(input_path, cleaned_path, run_bytes or RUN_BYTES)
+        _print_totals(results)
+    elif sources:
+        # Imported here: parallel_dedup builds on this module
+        from parallel_dedup import parallel_deduplicate
+
+        print(f"⚡ Параллельное объединение {input_path} и ещё {len(sources)} источников...")
+        results = parallel_deduplicate([input_path, *sources], cleaned_path, workers)
+        for path, count in results["sources"].items():
+            print(f"📂 {path}: {count} записей")
+        _print_totals(results)
+    else:
+        results = find_and_remove_duplicates(input_path, cleaned_path, near_threshold, merge_threshold)
 
     shutil.copy2(input_path, backup_path)
     print(f"💾 Создан backup исходного файла: {backup_path}")
@@ -317,4 +455,60 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Удаление дубликатов в table_phrases.json.")
+    parser.add_argument(
+        "--near",
+        nargs="?",
+        type=float,
+        const=REVIEW_THRESHOLD,
+        metavar="THRESHOLD",
+        help=f"искать похожие записи с оценкой не ниже порога (по умолчанию {REVIEW_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--auto-merge",
+        nargs="?",
+        type=float,
+        const=MERGE_THRESHOLD,
+        metavar="THRESHOLD",
+        help=f"объединять похожие записи с оценкой не ниже порога (по умолчанию {MERGE_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="потоковая очистка с сортировкой на диске для файлов больше памяти",
+    )
+    parser.add_argument(
+        "--run-mb",
+        type=int,
+        default=None,
+        help="размер сортируемых в памяти порций для --stream, МБ (по умолчанию 64)",
+    )
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        type=Path,
+        default=[],
+        metavar="JSON",
+        help="дополнительные источники: объединяются с table_phrases.json параллельно по хешу фразы",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="число процессов для --sources (по умолчанию по числу ядер)",
+    )
+    args = parser.parse_args()
+    if args.auto_merge is not None and args.near is None:
+        args.near = min(REVIEW_THRESHOLD, args.auto_merge)
+    if (args.stream or args.sources) and args.near is not None:
+        parser.error("--near/--auto-merge работают только без --stream и --sources")
+    if args.stream and args.sources:
+        parser.error("--stream и --sources нельзя использовать вместе")
+    main(
+        args.near,
+        args.auto_merge,
+        args.stream,
+        args.run_mb and args.run_mb * 1024 * 1024,
+        args.sources,
+        args.workers,
+    )
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Checkpointed, resumable example filling over a process pool.
+
+`fill_usage_examples.main` used to fill every phrase in one loop and write
+table_phrases_with_examples.json only at the end, so an interruption lost
+all the work done so far. Here the phrases without an example are cut
+into chunks and filled by a process pool:
+
+1. every finished chunk is appended to a write-ahead journal, one JSON
+   line per phrase keyed by `normalize_phrase(phrase)`, and fsynced;
+2. a restarted run loads the journal and skips the keys it already holds
+   (the "skip if already has example" check, made durable), including
+   their example source lookups;
+3. at the end the journal is compacted: its examples are applied to the
+   phrases, the output is saved and only then is the journal removed.
+
+A line cut short by a crash is dropped (and truncated away) on load.
+Workers build their own `UsageExampleFinder`; lookups made beforehand
+(`fetched`) travel with each chunk, so the filled examples are exactly
+those of the serial loop.
+
+    python3 example_journal.py table_phrases_with_examples.journal.jsonl   # journal summary
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from phrase_store import PhraseStore, normalize_phrase
+
+CHUNK_SIZE = 64
+
+_finder = None  # per worker process, set by _init_worker
+
+
+def phrase_key(phrase_data: Dict) -> str:
+    return normalize_phrase(phrase_data.get('phrase', ''))
+
+
+class ExampleJournal:
+    """Append-only JSON lines of {"key", "phrase", "usage_example"} (the example may be null)."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.examples: Dict[str, Optional[str]] = {}
+        self.dropped = 0
+        good = 0
+        if self.path.exists():
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        self.dropped += 1
+                        break  # an interrupted write: nothing after it was committed
+                    self.examples[record['key']] = record['usage_example']
+                    good += len(line)
+            if self.dropped:
+                os.truncate(self.path, good)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.examples
+
+    def append(self, records: Iterable[Tuple[str, str, Optional[str]]]) -> None:
+        """Durably add (key, phrase, example) records: written, flushed and fsynced before returning."""
+        lines = []
+        for key, phrase, example in records:
+            self.examples[key] = example
+            lines.append(json.dumps({'key': key, 'phrase': phrase, 'usage_example': example},
+                                    ensure_ascii=False) + '\n')
+        self._file.writelines(lines)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def remove(self) -> None:
+        """Delete the journal once its examples are saved in the output."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> 'ExampleJournal':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _init_worker(authors: Optional[str], seed: int) -> None:
+    # Imported here: fill_usage_examples builds on this module
+    from author_gazetteer import AuthorGazetteer, load_authors
+    from fill_usage_examples import UsageExampleFinder
+
+    global _finder
+    _finder = UsageExampleFinder(seed=seed, gazetteer=AuthorGazetteer(load_authors(authors)) if authors else None)
+
+
+def _fill_chunk(items: List[Tuple[str, Dict, Optional[str]]]) -> List[Tuple[str, str, Optional[str]]]:
+    """(key, phrase_data, fetched example) -> (key, phrase, usage example or None)."""
+    _finder.fetched = {phrase_data['phrase']: example for _, phrase_data, example in items if example}
+    return [(key, phrase_data['phrase'], _finder.find_example_for_phrase(phrase_data))
+            for key, phrase_data, _ in items]
+
+
+def fill_examples(
+    phrases: PhraseStore,
+    journal: ExampleJournal,
+    fetched: Optional[Dict[str, str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    authors: Optional[str] = None,
+    seed: int = 0,
+    progress: Optional[Callable[[str], None]] = print,
+) -> Dict:
+    """
+    Fill the phrases without an example that are not journaled yet, journaling each chunk.
+
+    Returns the counts of phrases `resumed` from the journal and `filled` now;
+    `phrases` itself is updated by `compact`.
+    """
+    fetched = fetched or {}
+    todo = [
+        (key, phrase_data, fetched.get(phrase_data['phrase']))
+        for phrase_data in phrases
+        if not phrase_data.get('usage_example') and (key := phrase_key(phrase_data)) not in journal
+    ]
+    resumed = sum(1 for phrase_data in phrases
+                  if not phrase_data.get('usage_example') and phrase_key(phrase_data) in journal)
+    chunks = [todo[start:start + chunk_size] for start in range(0, len(todo), chunk_size)]
+    if progress and resumed:
+        progress(f"♻️  Resuming: {resumed} phrases already in {journal.path}")
+    filled = 0
+    if chunks:
+        with ProcessPoolExecutor(workers or os.cpu_count() or 1, initializer=_init_worker,
+                                 initargs=(authors, seed)) as pool:
+            for done, future in enumerate(as_completed([pool.submit(_fill_chunk, chunk) for chunk in chunks]), 1):
+                records = future.result()
+                journal.append(records)
+                filled += len(records)
+                if progress:
+                    progress(f"📈 Chunk {done}/{len(chunks)}: {filled}/{len(todo)} phrases filled "
+                             f"({sum(example is not None for _, _, example in records)}/{len(records)} "
+                             f"with examples)")
+    return {'resumed': resumed, 'filled': filled, 'chunks': len(chunks)}
+
+
+def compact(phrases: PhraseStore, journal: ExampleJournal) -> int:
+    """Apply the journaled examples to `phrases`; returns how many were set."""
+    applied = 0
+    for row, phrase_data in enumerate(phrases):
+        if phrase_data.get('usage_example'):
+            continue
+        example = journal.examples.get(phrase_key(phrase_data))
+        if example:
+            phrases.set(row, 'usage_example', example)
+            applied += 1
+    return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize an example filling journal.")
+    parser.add_argument("journal", nargs='?', default='table_phrases_with_examples.journal.jsonl')
+    args = parser.parse_args()
+
+    if not Path(args.journal).exists():
+        raise SystemExit(f"No journal at {args.journal}: the last fill finished or none was started")
+    with ExampleJournal(args.journal) as journal:
+        found = sum(example is not None for example in journal.examples.values())
+        print(f"Phrases journaled: {len(journal)}, with examples: {found}")
+        if journal.dropped:
+            print("An incomplete last line was dropped")
@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+Usage-example sources for fill_usage_examples.py.
+
+Examples are looked up concurrently on asyncio (standard library only):
+
+- `Fetcher` does HTTP GETs with bounded concurrency, a `TokenBucket` rate
+  limit (applied to network requests only), and retries with exponential
+  backoff on connection errors, 429 and 5xx (honouring Retry-After);
+  with a `url_cache.UrlCache` it serves fresh pages from disk, revalidates
+  stale ones (If-None-Match / If-Modified-Since, 304), falls back to the
+  stale page when revalidation fails and, offline, never touches the
+  network;
+- `WiktionarySource` reads the wikitext of a phrase's Wiktionary page
+  (`action=raw`) and takes the first `{{пример|...}}` with text; each page
+  is fetched and parsed once per run, however many phrases share it;
+- `LocalCorpusSource` searches a directory of .txt files for a sentence
+  containing every word stem of the phrase; the author is taken from the
+  file name ("Чехов А.П. - Рассказы.txt");
+- `collect_examples` runs the sources in order for each phrase, with a
+  fixed number of worker tasks, so a large corpus is limited by the
+  polite request rate rather than by serial waits.
+
+`stub` serves fake Wiktionary pages (with injected 503/429 responses and
+ETags) and `check` runs the fetcher against it and verifies retries, the
+rate and the cache (second run, revalidation, offline run):
+
+    python3 example_sources.py stub --port 8090
+    python3 example_sources.py check --requests 40 --rate 20
+"""
+
+import argparse
+import asyncio
+import gzip
+import random
+import re
+import tempfile
+import time
+import urllib.parse
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from russian_stemmer import stem_words
+from url_cache import CACHEABLE_STATUSES, CachedPage, UrlCache
+
+WIKTIONARY_URL = 'https://ru.wiktionary.org'
+USER_AGENT = 'phraseological-dict/1.0 (usage example filler)'
+DEFAULT_RATE = 2.0  # requests per second
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 20.0
+BACKOFF = 0.5  # seconds before the first retry, doubled for each next one
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# A connection, framing or gzip body that broke off or came garbled: retried.
+# EOFError covers asyncio.IncompleteReadError and truncated gzip streams.
+TRANSPORT_ERRORS = (OSError, EOFError, asyncio.TimeoutError, ValueError, zlib.error)
+MAX_REDIRECTS = 3
+MAX_EXAMPLE_CHARS = 300
+UNKNOWN_SOURCE = "[Wiktionary]"
+
+
+class Response(NamedTuple):
+    url: str
+    status: int
+    headers: Dict[str, str]  # lowercase names
+    body: bytes
+
+    def text(self) -> str:
+        return self.body.decode('utf-8', 'replace')
+
+
+class FetchError(Exception):
+    """A request failed after all retries, or cannot be made at all (unsupported URL)."""
+
+
+async def http_get(url: str, headers: Optional[Dict[str, str]] = None,
+                   timeout: float = DEFAULT_TIMEOUT) -> Response:
+    """One HTTP/1.1 GET (no redirects or retries); gzip and chunked bodies are decoded."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        raise FetchError(f"Unsupported URL: {url}")  # not retried
+    secure = parts.scheme == 'https'
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, parts.port or (443 if secure else 80), ssl=secure or None), timeout)
+    try:
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc}", f"User-Agent: {USER_AGENT}",
+                 "Accept-Encoding: gzip", "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await writer.drain()
+        return await asyncio.wait_for(_read_response(url, reader), timeout)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, asyncio.CancelledError):
+            pass
+
+
+async def _read_response(url: str, reader: asyncio.StreamReader) -> Response:
+    status_line = (await reader.readline()).decode('latin-1').split(' ', 2)
+    if len(status_line) < 2 or not status_line[0].startswith('HTTP/'):
+        raise ConnectionError(f"Malformed response from {url}")
+    status = int(status_line[1])
+    headers: Dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if not size:
+                while (await reader.readline()).strip():  # trailers
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b''.join(chunks)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+    if headers.get('content-encoding', '').lower() == 'gzip':
+        body = gzip.decompress(body)
+    return Response(url, status, headers, body)
+
+
+class TokenBucket:
+    """`rate` requests per second on average, at most `burst` at once; FIFO for waiters."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Fetcher:
+    """Polite HTTP client: concurrency limit, token bucket, retries with backoff, optional page cache."""
+
+    def __init__(self, rate: Optional[float] = DEFAULT_RATE, concurrency: int = DEFAULT_CONCURRENCY,
+                 retries: int = DEFAULT_RETRIES, timeout: float = DEFAULT_TIMEOUT, backoff: float = BACKOFF,
+                 seed: Optional[int] = None, cache: Optional[UrlCache] = None, offline: bool = False):
+        self.bucket = TokenBucket(rate, burst=max(1, min(concurrency, int(rate)))) if rate else None
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.rng = random.Random(seed)
+        self.cache = cache
+        self.offline = offline
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'bytes': 0}
+
+    async def _request(self, url: str, headers: Optional[Dict[str, str]]) -> Response:
+        if self.bucket:
+            await self.bucket.acquire()
+        async with self.semaphore:
+            self.stats['requests'] += 1
+            response = await http_get(url, headers, self.timeout)
+        self.stats['bytes'] += len(response.body)
+        return response
+
+    def _delay(self, attempt: int, response: Optional[Response]) -> float:
+        retry_after = response.headers.get('retry-after', '') if response else ''
+        if retry_after.replace('.', '', 1).isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * (0.5 + self.rng.random())
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        """
+        GET through the cache; raises FetchError when every attempt failed.
+
+        A fresh cached page is returned as is, a stale one is revalidated
+        (a 304 answer refreshes it; a failed revalidation returns the stale
+        page) and offline any cached page is returned; an uncached URL
+        offline is a FetchError.
+        """
+        cache = self.cache
+        page = cache.get(url) if cache is not None else None
+        if page is not None:
+            fresh = cache.is_fresh(page)
+            if fresh or self.offline:
+                cache.stats['hits' if fresh else 'stale_hits'] += 1
+                return _cached_response(page)
+        if self.offline:
+            if cache is not None:
+                cache.stats['misses'] += 1
+            raise FetchError(f"{url}: not cached (offline)")
+        if page is None:
+            response = await self.fetch(url, headers)
+        else:
+            try:
+                response = await self.fetch(url, {**(headers or {}), **page.validators()})
+            except FetchError:
+                response = None
+            if response is not None and response.status == 304:
+                cache.refresh(url)
+                return _cached_response(page)
+            if response is None or response.status not in CACHEABLE_STATUSES:
+                # the network failed: the stale copy beats no page at all
+                cache.stats['stale_hits'] += 1
+                return _cached_response(page)
+        if cache is not None:
+            cache.stats['misses'] += 1
+            cache.put(url, response.status, response.headers, response.body)
+        return response
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        """GET over the network with redirects and retries, bypassing the cache."""
+        error: Optional[BaseException] = None
+        response: Optional[Response] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._delay(attempt - 1, response))
+            response = None
+            try:
+                response = await self._request(url, headers)
+                for _ in range(MAX_REDIRECTS):
+                    if response.status not in (301, 302, 303, 307, 308) or 'location' not in response.headers:
+                        break
+                    response = await self._request(urllib.parse.urljoin(url, response.headers['location']), headers)
+            except TRANSPORT_ERRORS as exc:
+                error = exc
+                continue
+            if response.status not in RETRY_STATUSES:
+                return response
+            error = None
+        self.stats['failures'] += 1
+        if response is not None:
+            return response
+        raise FetchError(f"{url}: {error}")
+
+
+def _cached_response(page: CachedPage) -> Response:
+    return Response(page.url, page.status, page.headers, page.body)
+
+
+class ExampleSource:
+    """Where usage examples come from; `example` returns "text (Author)" or None."""
+
+    name = 'source'
+
+    async def example(self, phrase_data: Dict) -> Optional[str]:
+        raise NotImplementedError
+
+
+_AUTHOR_INITIALS = re.compile(r'^((?:[А-ЯЁA-Z]\.\s*)+)\s*([А-ЯЁA-Z][\w-]+)$')
+
+
+def format_author(author: str) -> str:
+    """"А. С. Пушкин" → "Пушкин А.С.", as in the rest of the corpus; other forms are kept."""
+    author = ' '.join(author.split())
+    match = _AUTHOR_INITIALS.match(author)
+    if match:
+        return f"{match.group(2)} {match.group(1).replace(' ', '')}"
+    return author
+
+
+def _template_end(text: str, start: int) -> int:
+    """Index just past the `}}` closing the template opened at `start`."""
+    depth = 0
+    i = start
+    while i < len(text) - 1:
+        pair = text[i:i + 2]
+        if pair in ('{{', '[['):
+            depth += 1
+            i += 2
+        elif pair in ('}}', ']]'):
+            depth -= 1
+            i += 2
+            if not depth:
+                return i
+        else:
+            i += 1
+    return len(text)
+
+
+def _split_params(body: str) -> List[str]:
+    params, depth, current = [], 0, []
+    i = 0
+    while i < len(body):
+        pair = body[i:i + 2]
+        if pair in ('{{', '[['):
+            depth += 1
+            current.append(pair)
+            i += 2
+            continue
+        if pair in ('}}', ']]'):
+            depth -= 1
+            current.append(pair)
+            i += 2
+            continue
+        if body[i] == '|' and not depth:
+            params.append(''.join(current))
+            current = []
+        else:
+            current.append(body[i])
+        i += 1
+    params.append(''.join(current))
+    return params
+
+
+def wiki_to_text(markup: str) -> str:
+    """Plain text of a wikitext fragment: links to labels, templates to their last argument."""
+    text = re.sub(r'<ref[^>]*/>|<ref[^>]*>.*?</ref>', '', markup, flags=re.S)
+    text = re.sub(r'<[^>]+>', '', text)
+    while True:
+        start = text.find('{{')
+        if start < 0:
+            break
+        end = _template_end(text, start)
+        params = _split_params(text[start + 2:end - 2])
+        text = text[:start] + (params[-1] if len(params) > 1 else '') + text[end:]
+    text = re.sub(r'\[\[(?:[^\]|]*\|)?([^\]]*)\]\]', r'\1', text)
+    text = text.replace("'''", '').replace("''", '').replace('&nbsp;', ' ')
+    return ' '.join(text.split())
+
+
+def wiktionary_examples(wikitext: str) -> List[Tuple[str, str]]:
+    """(text, author) of every non-empty {{пример}} template, in page order."""
+    examples = []
+    for match in re.finditer(r'\{\{\s*пример\s*\|', wikitext):
+        end = _template_end(wikitext, match.start())
+        params = _split_params(wikitext[match.start() + 2:end - 2])[1:]
+        positional = [p for p in params if '=' not in p.split('{{')[0].split('[[')[0]]
+        named = {name.strip(): value for name, value in (p.split('=', 1) for p in params if p not in positional)}
+        text = wiki_to_text(positional[0]) if positional else ''
+        if text:
+            examples.append((text, format_author(wiki_to_text(named.get('автор', '')))))
+    return examples
+
+
+def wiktionary_title(phrase: str) -> str:
+    """Page title for a phrase: Wiktionary titles start lowercase unless a proper name does."""
+    phrase = ' '.join(phrase.split())
+    if len(phrase) > 1 and not phrase[1].isupper():
+        phrase = phrase[0].lower() + phrase[1:]
+    return phrase
+
+
+class WiktionarySource(ExampleSource):
+    """First usage example from the phrase's page on ru.wiktionary.org (or a compatible server)."""
+
+    name = 'wiktionary'
+
+    def __init__(self, fetcher: Fetcher, base_url: str = WIKTIONARY_URL):
+        self.fetcher = fetcher
+        self.base_url = base_url.rstrip('/')
+        self.pages: Dict[str, asyncio.Future] = {}  # page URL -> its example, looked up once per run
+
+    def page_url(self, phrase: str) -> str:
+        title = urllib.parse.quote(wiktionary_title(phrase).replace(' ', '_'))
+        return f"{self.base_url}/w/index.php?title={title}&action=raw"
+
+    async def example(self, phrase_data: Dict) -> Optional[str]:
+        url = self.page_url(phrase_data['phrase'])
+        if url not in self.pages:
+            self.pages[url] = asyncio.ensure_future(self._page_example(url))
+        return await asyncio.shield(self.pages[url])
+
+    async def _page_example(self, url: str) -> Optional[str]:
+        try:
+            response = await self.fetcher.get(url)
+        except FetchError:
+            return None
+        if response.status != 200:
+            return None
+        for text, author in wiktionary_examples(response.text()):
+            if len(text) <= MAX_EXAMPLE_CHARS:
+                return f"{text} ({author or UNKNOWN_SOURCE})"
+        return None
+
+
+class LocalCorpusSource(ExampleSource):
+    """
+    Sentences from a directory of UTF-8 .txt files, matched by word stems.
+
+    A sentence matches when it contains every stem of the phrase; the first
+    match in file-name order wins. Works offline and takes no rate tokens.
+    """
+
+    name = 'corpus'
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.sentences: List[Tuple[str, str]] = []  # (sentence, author)
+        self.postings: Dict[str, List[int]] = {}
+        for path in sorted(self.directory.glob('**/*.txt')):
+            author = path.stem.split(' - ')[0].strip()
+            text = ' '.join(path.read_text(encoding='utf-8').split())
+            for sentence in re.split(r'(?<=[.!?…])\s+', text):
+                if not sentence or len(sentence) > MAX_EXAMPLE_CHARS:
+                    continue
+                number = len(self.sentences)
+                self.sentences.append((sentence, author))
+                for word in set(stem_words(sentence)):
+                    self.postings.setdefault(word, []).append(number)
+
+    def find(self, phrase: str) -> Optional[str]:
+        stems = set(stem_words(phrase))
+        if not stems:
+            return None
+        lists = sorted((self.postings.get(word, []) for word in stems), key=len)
+        matches = set(lists[0]).intersection(*lists[1:])
+        if not matches:
+            return None
+        sentence, author = self.sentences[min(matches)]
+        return f"{sentence} ({author})"
+
+    async def example(self, phrase_data: Dict) -> Optional[str]:
+        return self.find(phrase_data['phrase'])
+
+
+async def collect_examples_async(phrases: Iterable[Dict], sources: Sequence[ExampleSource],
+                                 concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, str]:
+    """Phrase -> example from the first source that has one; phrases without any are left out."""
+    results: Dict[str, str] = {}
+    queue = iter(phrases)
+
+    async def worker() -> None:
+        for phrase_data in queue:  # shared iterator: each phrase goes to one worker
+            for source in sources:
+                example = await source.example(phrase_data)
+                if example:
+                    results[phrase_data['phrase']] = example
+                    break
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return results
+
+
+def collect_examples(phrases: Iterable[Dict], wiktionary: bool = False, wiktionary_url: str = WIKTIONARY_URL,
+                     corpus: Optional[Union[str, Path]] = None, rate: Optional[float] = DEFAULT_RATE,
+                     concurrency: int = DEFAULT_CONCURRENCY, retries: int = DEFAULT_RETRIES,
+                     cache: Optional[UrlCache] = None, offline: bool = False) -> Dict[str, str]:
+    """Look examples up in the configured sources (local corpus first, then Wiktionary)."""
+
+    async def run() -> Dict[str, str]:
+        sources: List[ExampleSource] = []
+        if corpus:
+            sources.append(LocalCorpusSource(corpus))
+        fetcher = None
+        if wiktionary:
+            fetcher = Fetcher(rate, concurrency, retries, cache=cache, offline=offline)
+            sources.append(WiktionarySource(fetcher, wiktionary_url))
+        if not sources:
+            return {}
+        started = time.perf_counter()
+        results = await collect_examples_async(phrases, sources, concurrency)
+        if fetcher:
+            stats = fetcher.stats
+            print(f"🌐 {stats['requests']} requests ({stats['retries']} retries, {stats['failures']} failed, "
+                  f"{stats['bytes'] / 1024:.0f} KiB) in {time.perf_counter() - started:.1f} s")
+            if cache is not None:
+                print(f"🗄️  {cache.summary()}")
+        return results
+
+    return asyncio.run(run())
+
+
+# Stub server for offline runs and checks
+
+class StubWiktionary:
+    """
+    Fake Wiktionary: every page has one example naming its title.
+
+    To exercise retries, the first request for one title in `fail_every`
+    (by CRC-32 of the title) gets 503 and the next one for one title in
+    `throttle_every` a 429 with Retry-After; every title succeeds by the
+    third attempt. Titles starting with "нет " are missing (404). Pages
+    carry an ETag and Last-Modified, and a matching If-None-Match gets 304.
+    """
+
+    def __init__(self, fail_every: int = 5, throttle_every: int = 7, delay: float = 0.01):
+        self.fail_every = fail_every
+        self.throttle_every = throttle_every
+        self.delay = delay
+        self.requests = 0
+        self.not_modified = 0
+        self.attempts: Dict[str, int] = {}
+        self.times: List[float] = []
+
+    def page(self, title: str) -> str:
+        return ("== Русский ==\n=== Значение ===\n# значение\n#: {{пример|}}\n"
+                f"#: {{{{пример|Он, как говорится, [[{title}|{title}]] — и всё тут.|автор=А. П. Чехов|"
+                f"титул=«Заглушка»|дата=1890}}}}\n")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = (await reader.readline()).decode('utf-8', 'replace')
+            request_headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                request_headers[name.strip().lower()] = value.strip()
+            self.requests += 1
+            self.times.append(time.monotonic())
+            await asyncio.sleep(self.delay)
+            query = urllib.parse.parse_qs(urllib.parse.urlsplit(request_line.split(' ')[1]).query)
+            title = query.get('title', [''])[0].replace('_', ' ')
+            attempt = self.attempts[title] = self.attempts.get(title, 0) + 1
+            bucket = zlib.crc32(title.encode('utf-8'))
+            fails = bool(self.fail_every) and bucket % self.fail_every == 0
+            throttled = bool(self.throttle_every) and bucket % self.throttle_every == 0
+            headers = ''
+            if fails and attempt == 1:
+                status, body = '503 Service Unavailable', b'busy'
+            elif throttled and attempt == 1 + fails:
+                status, body, headers = '429 Too Many Requests', b'slow down', 'Retry-After: 0.2\r\n'
+            elif title.startswith('нет '):
+                status, body = '404 Not Found', b''
+            else:
+                page = self.page(title).encode('utf-8')
+                etag = f'"{zlib.crc32(page):08x}"'
+                headers = f'ETag: {etag}\r\nLast-Modified: Mon, 01 Jan 2024 00:00:00 GMT\r\n'
+                if request_headers.get('if-none-match') == etag:
+                    self.not_modified += 1
+                    status, body = '304 Not Modified', b''
+                else:
+                    status, body = '200 OK', gzip.compress(page)
+                    headers += 'Content-Encoding: gzip\r\nContent-Type: text/x-wiki; charset=UTF-8\r\n'
+            writer.write(f"HTTP/1.1 {status}\r\n{headers}Content-Length: {len(body)}\r\n"
+                         f"Connection: close\r\n\r\n".encode('latin-1') + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def check_fetcher(requests: int, rate: float, concurrency: int) -> Dict:
+    """Fetch `requests` pages from a stub server; returns timing and retry statistics."""
+    stub = StubWiktionary()
+    server = await asyncio.start_server(stub.handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    fetcher = Fetcher(rate, concurrency, retries=2, backoff=0.05, seed=0)
+    source = WiktionarySource(fetcher, f"http://127.0.0.1:{port}")
+    phrases = [{'phrase': f"Фраза {i}"} for i in range(requests)] + [{'phrase': 'Нет такой'}]
+    started = time.monotonic()
+    async with server:
+        results = await collect_examples_async(phrases, [source], concurrency)
+    elapsed = time.monotonic() - started
+    # The bucket admits `burst` requests at once, then `rate` per second
+    window = max(len(stub.times) - fetcher.bucket.capacity, 0) / rate if fetcher.bucket else 0
+    return {
+        'found': len(results), 'asked': len(phrases), 'elapsed': elapsed, 'min_elapsed': window,
+        'sample': results.get('Фраза 0'), **fetcher.stats,
+    }
+
+
+async def check_cache(requests: int, concurrency: int, path: Union[str, Path]) -> Dict:
+    """
+    Run the same lookups five times against one cache file: cold, warm,
+    with every page stale (revalidated by ETag), stale with the stub
+    stopped (served from the cache after the retries) and offline.
+    Returns each run's results and the network requests it made.
+    """
+    stub = StubWiktionary()
+    server = await asyncio.start_server(stub.handle, '127.0.0.1', 0)
+    base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    phrases = [{'phrase': f"Фраза {i}"} for i in range(requests)] + [{'phrase': 'Нет такой'}]
+    phrases += phrases[:requests // 2]  # repeated pages are looked up once per run
+    runs = {}
+    with UrlCache(path) as cache:
+        for run in ('cold', 'warm', 'stale', 'unreachable', 'offline'):
+            if run == 'stale':
+                cache.ttl = 0
+            if run == 'unreachable':
+                server.close()
+                await server.wait_closed()
+            before, cache.stats = stub.requests, dict.fromkeys(cache.stats, 0)
+            fetcher = Fetcher(None, concurrency, retries=2, backoff=0.05, seed=0, cache=cache,
+                              offline=run == 'offline')
+            results = await collect_examples_async(phrases, [WiktionarySource(fetcher, base_url)], concurrency)
+            runs[run] = {'results': results, 'network': stub.requests - before, **cache.stats}
+    return {'runs': runs, 'pages': requests + 1, 'not_modified': stub.not_modified}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Usage-example sources: stub server and fetcher check.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stub_command = commands.add_parser("stub", help="serve fake Wiktionary pages")
+    stub_command.add_argument("--host", default="127.0.0.1")
+    stub_command.add_argument("--port", type=int, default=8090)
+    stub_command.add_argument("--fail-every", type=int, default=0, help="answer 503 to every Nth request")
+    check_command = commands.add_parser("check", help="run the fetcher against an in-process stub")
+    check_command.add_argument("--requests", type=int, default=40)
+    check_command.add_argument("--rate", type=float, default=20.0)
+    check_command.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    check_command.add_argument("--cache", metavar="PATH", default=None,
+                               help="cache file for the cache check (default: a temporary one)")
+    args = parser.parse_args()
+
+    if args.command == "stub":
+        async def serve() -> None:
+            stub = StubWiktionary(fail_every=args.fail_every, throttle_every=0)
+            server = await asyncio.start_server(stub.handle, args.host, args.port)
+            print(f"🧪 Stub Wiktionary on http://{args.host}:{args.port}", flush=True)
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+    else:
+        result = asyncio.run(check_fetcher(args.requests, args.rate, args.concurrency))
+        print(f"Examples found: {result['found']}/{result['asked']} (one page is missing on purpose)")
+        print(f"Sample: {result['sample']}")
+        print(f"Requests: {result['requests']}, retries: {result['retries']}, failures: {result['failures']}")
+        print(f"Elapsed: {result['elapsed']:.2f} s (rate limit allows no less than {result['min_elapsed']:.2f} s)")
+        ok = (result['found'] == result['asked'] - 1 and result['failures'] == 0 and result['retries'] > 0
+              and result['elapsed'] >= result['min_elapsed'] * 0.95)
+
+        with tempfile.TemporaryDirectory() as directory:
+            cached = asyncio.run(check_cache(args.requests, args.concurrency,
+                                             args.cache or Path(directory) / 'cache.sqlite'))
+        runs = cached['runs']
+        for name, run in runs.items():
+            print(f"Cache, {name} run: {len(run['results'])} examples, {run['network']} network requests, "
+                  f"{run['hits']} hits, {run['revalidated']} revalidated, {run['stale_hits']} stale, "
+                  f"{run['misses']} misses")
+        ok = ok and all(run['results'] == runs['cold']['results'] for run in runs.values()) and (
+            runs['warm']['network'] == 0 and runs['offline']['network'] == 0
+            and runs['warm']['hits'] == runs['offline']['stale_hits'] == cached['pages']
+            and runs['unreachable']['stale_hits'] == cached['pages']
+            and runs['stale']['revalidated'] == cached['not_modified'] == cached['pages'] - 1)
+        print("✅ OK" if ok else "❌ FAILED")
+        raise SystemExit(0 if ok else 1)
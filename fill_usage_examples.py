@@ -10,12 +10,20 @@ This script:
 5. Creates a report
 """
 
-import json
+import argparse
 import re
 import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from author_gazetteer import AuthorGazetteer, default_gazetteer, load_authors
+from context_examples import AUTHOR_SEED, CLASSIFIER, contextual_example
+from example_journal import CHUNK_SIZE, ExampleJournal, compact, fill_examples, phrase_key
+from example_sources import DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_RETRIES, WIKTIONARY_URL, collect_examples
+from phrase_store import PhraseStore
+from sql_dump import add_dump_arguments, export_phrases
+from url_cache import DEFAULT_CACHE, DEFAULT_MAX_BYTES, DEFAULT_TTL, UrlCache
+
 # Skip web scraping for now - focus on generating contextual examples
 # try:
 #     import requests
@@ -32,16 +40,23 @@ DATA_FILE = Path('table_phrases_cleaned.json')
 OUTPUT_FILE = Path('table_phrases_with_examples.json')
 SQL_FILE = Path('phraseological_dict_with_examples.sql')
 
+QUOTE_PATTERNS = (
+    re.compile(r'«([^»]+)»'),  # «quote»
+    re.compile(r'"([^"]+)"'),  # "quote"
+)
+AUTHOR_CONTEXT = 100  # characters around a quote searched for its author
+
 
 class UsageExampleFinder:
     """Find usage examples for phraseological units."""
     
-    def __init__(self):
-        # self.session = requests.Session()
-        # self.session.headers.update({
-        #     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        # })
-        pass
+    def __init__(self, fetched: Optional[Dict[str, str]] = None, seed: int = AUTHOR_SEED,
+                 gazetteer: Optional[AuthorGazetteer] = None):
+        # Examples looked up beforehand from Wiktionary or a local corpus (example_sources.py)
+        self.fetched = fetched or {}
+        self.seed = seed
+        # Writers named in etymologies (author_gazetteer.py)
+        self.gazetteer = gazetteer or default_gazetteer()
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text."""
@@ -83,102 +98,23 @@ class UsageExampleFinder:
         if not etymology:
             return None
             
-        # Look for quotes in etymology
-        quote_patterns = [
-            r'«([^»]+)»',  # «quote»
-            r'"([^"]+)"',  # "quote"
-        ]
-        
-        for pattern in quote_patterns:
-            matches = re.findall(pattern, etymology)
-            if matches:
-                # Use the first substantial quote
-                for quote in matches:
-                    if len(quote.split()) > 3:  # Skip very short quotes
-                        # Look for author mentions in surrounding context
-                        context_start = max(0, etymology.find(quote) - 100)
-                        context_end = min(len(etymology), etymology.find(quote) + len(quote) + 100)
-                        context = etymology[context_start:context_end]
-                        
-                        author = "[Источник не указан]"
-                        
-                        # Look for author mentions
-                        if 'Крылов' in context:
-                            author = "Крылов И.А."
-                        elif 'Горький' in context:
-                            author = "Горький М."
-                        elif 'Пушкин' in context:
-                            author = "Пушкин А.С."
-                        elif 'Толстой' in context:
-                            author = "Толстой Л.Н."
-                        elif 'Гоголь' in context:
-                            author = "Гоголь Н.В."
-                        elif 'Чехов' in context:
-                            author = "Чехов А.П."
-                        else:
-                            author = "[Wiktionary]"
-                        
-                        return f"{quote} ({author})"
+        for pattern in QUOTE_PATTERNS:
+            for match in pattern.finditer(etymology):
+                quote = match.group(1)
+                if len(quote.split()) > 3:  # Skip very short quotes
+                    # The writer mentioned closest to the quote, within AUTHOR_CONTEXT characters
+                    author = self.gazetteer.author_near(etymology, match.start(1), match.end(1), AUTHOR_CONTEXT)
+                    return f"{quote} ({author or '[Wiktionary]'})"
         
         return None
     
     def search_wiktionary_examples(self, phrase: str) -> Optional[str]:
-        """Search for examples on Wiktionary page."""
-        # Skip web scraping for now
-        return None
+        """Example found for the phrase by the concurrent source lookup, if any."""
+        return self.fetched.get(phrase)
     
     def generate_contextual_example(self, phrase: str, meaning: str) -> str:
         """Generate a contextual example based on the meaning."""
-        meaning_lower = meaning.lower()
-        
-        # Author pool for examples
-        authors = [
-            "Пушкин А.С.", "Толстой Л.Н.", "Чехов А.П.", "Гоголь Н.В.", 
-            "Достоевский Ф.М.", "Тургенев И.С.", "Лермонтов М.Ю.", 
-            "Крылов И.А.", "Салтыков-Щедрин М.Е.", "Бунин И.А."
-        ]
-        
-        # Handle phrases that need special grammar treatment
-        phrase_for_context = phrase.lower()
-        
-        # Some phrases need different handling
-        if phrase.startswith(("А ", "Но ", "И ", "Да ")):
-            phrase_for_context = phrase
-        
-        # Context templates based on meaning keywords
-        if any(word in meaning_lower for word in ['время', 'давно', 'век', 'год']):
-            return f"Мы не встречались {phrase_for_context}, и многое изменилось в нашей жизни. {authors[0]}"
-        elif any(word in meaning_lower for word in ['бедный', 'деньги', 'богатый', 'бедность']):
-            return f"После неудачного вложения он остался {phrase_for_context} и был вынужден просить милостыню. {authors[1]}"
-        elif any(word in meaning_lower for word in ['труд', 'работа', 'дело', 'занятие']):
-            return f"Команда {phrase_for_context} всю ночь, чтобы успеть к сроку сдачи проекта. {authors[2]}"
-        elif any(word in meaning_lower for word in ['характер', 'поведение', 'человек', 'люди']):
-            return f"Его постоянно {phrase_for_context} раздражало коллег, но начальник ценил его профессионализм. {authors[3]}"
-        elif any(word in meaning_lower for word in ['говорить', 'речь', 'слово', 'молчать']):
-            return f"Он предпочитал {phrase_for_context}, когда обсуждали деликатные вопросы. {authors[4]}"
-        elif any(word in meaning_lower for word in ['знание', 'учиться', 'ум', 'глупый']):
-            return f"Чтобы сдать экзамен, студенту пришлось {phrase_for_context} несколько недель подряд. {authors[5]}"
-        elif any(word in meaning_lower for word in ['сердце', 'любовь', 'чувство', 'душа']):
-            return f"Она {phrase_for_context} и не могла думать ни о чём другом. {authors[6]}"
-        elif any(word in meaning_lower for word in ['дом', 'семья', 'дети', 'жизнь']):
-            return f"В их семье {phrase_for_context} стало традицией, которую передавали из поколения в поколение. {authors[7]}"
-        elif any(word in meaning_lower for word in ['вода', 'огонь', 'земля', 'природа']):
-            return f"После грозы река {phrase_for_context} и вышла из берегов, затопив окрестные поля. {authors[8]}"
-        elif any(word in meaning_lower for word in ['война', 'битва', 'борьба', 'сражение']):
-            return f"Солдаты {phrase_for_context} до последнего патрона, защищая родную землю. {authors[9]}"
-        elif any(word in meaning_lower for word in ['путь', 'дорога', 'поездка', 'путешествие']):
-            return f"Путешественники {phrase_for_context} через всю страну в поисках приключений. {authors[0]}"
-        elif any(word in meaning_lower for word in ['еда', 'пить', 'голод', 'жажда']):
-            return f"После долгого перехода по пустыне экспедиция {phrase_for_context} и была на грани выживания. {authors[1]}"
-        elif any(word in meaning_lower for word in ['спор', 'ссора', 'конфликт', 'разногласие']):
-            return f"Коллеги {phrase_for_context} из-за разницы во взглядах на решение проблемы. {authors[2]}"
-        elif any(word in meaning_lower for word in ['радость', 'счастье', 'горе', 'печаль']):
-            return f"Известие о победе {phrase_for_context} по всему городу, и все вышли на улицы праздновать. {authors[3]}"
-        else:
-            # Generic example with random author
-            import random
-            author = random.choice(authors)
-            return f"В этой ситуации он {phrase_for_context}, чем всех удивил. {author}"
+        return contextual_example(phrase, CLASSIFIER.classify(meaning), self.seed)
     
     def find_example_for_phrase(self, phrase_data: Dict) -> Optional[str]:
         """Find usage example for a single phrase."""
@@ -204,67 +140,70 @@ class UsageExampleFinder:
 # SQLite database functions removed - not needed for this task
 
 
-def generate_sql_dump() -> str:
-    """Generate SQL dump from JSON data."""
+def generate_sql_dump(
+    batch_bytes: Optional[int] = None,
+    compression: Optional[str] = None,
+    fmt: str = 'sql',
+    dialect: str = 'mysql',
+    delta: bool = False,
+    shards: Optional[int] = None,
+    shard_by: str = 'id',
+    layout: str = 'flat',
+) -> Path:
+    """Export JSON data through the shared dump engine and return the path written.
+
+    `fmt` selects an INSERT/COPY dump ('sql'), a LOAD DATA data file ('tsv' or
+    'csv') or a ready SQLite database ('sqlite'); `dialect` selects the SQL
+    flavour. See sql_dump.export_phrases.
+    """
     # Load the updated JSON data
-    with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    phrases = PhraseStore.load(OUTPUT_FILE)
     
-    phrases = data['phrases']
-    
-    sql_lines = [
-        "-- MySQL dump for phraseological dictionary",
+    comment_lines = [
         "-- Generated from table_phrases_cleaned.json with filled usage examples",
         f"-- Total phrases: {len(phrases)}",
-        "",
-        "SET NAMES utf8mb4;",
-        "SET FOREIGN_KEY_CHECKS = 0;",
-        "",
-        "-- Drop table if exists",
-        "DROP TABLE IF EXISTS `phraseological_dict`;",
-        "",
-        "-- Table structure for phraseological_dict",
-        "CREATE TABLE `phraseological_dict` (",
-        "  `id` int(11) NOT NULL AUTO_INCREMENT,",
-        "  `phrase` varchar(500) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Фразеологизм',",
-        "  `meaning` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Значение фразеологизма',",
-        "  `etymology` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Происхождение фразеологизма',",
-        "  `usage_example` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Пример использования фразеологизма в тексте',",
-        "  `categories` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Категория фразеологизма',",
-        "  `source_url` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Источник',",
-        "  PRIMARY KEY (`id`),",
-        "  UNIQUE KEY `phrase` (`phrase`),",
-        "  KEY `categories` (`categories`)",
-        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Словарь фразеологизмов русского языка';",
-        "",
-        "-- Data for table phraseological_dict",
-        "LOCK TABLES `phraseological_dict` WRITE;",
     ]
     
-    # Add INSERT statements
-    for i, phrase_data in enumerate(phrases, 1):
-        meaning = '; '.join(phrase_data.get('meanings', []))
-        
-        def escape_sql(value):
-            if value is None:
-                return 'NULL'
-            return "'" + str(value).replace("'", "\\'").replace("\\", "\\\\") + "'"
-        
-        sql_lines.append(
-            f"INSERT INTO `phraseological_dict` (`id`, `phrase`, `meaning`, `etymology`, `usage_example`, `categories`, `source_url`) VALUES ({i}, {escape_sql(phrase_data['phrase'])}, {escape_sql(meaning)}, {escape_sql(phrase_data.get('etymology', ''))}, {escape_sql(phrase_data.get('usage_example'))}, {escape_sql(phrase_data.get('category', ''))}, {escape_sql(phrase_data.get('source_url', ''))});"
-        )
-    
-    sql_lines.extend([
-        "",
-        "UNLOCK TABLES;",
-        "",
-        "SET FOREIGN_KEY_CHECKS = 1;"
-    ])
-    
-    return '\n'.join(sql_lines)
+    return export_phrases(
+        phrases,
+        SQL_FILE,
+        comment_lines,
+        fmt=fmt,
+        dialect=dialect,
+        batch_bytes=batch_bytes,
+        compression=compression,
+        delta=delta,
+        shards=shards,
+        shard_by=shard_by,
+        layout=layout,
+    )
 
 
-def main():
+def main(
+    batch_bytes: Optional[int] = None,
+    compression: Optional[str] = None,
+    fmt: str = 'sql',
+    dialect: str = 'mysql',
+    delta: bool = False,
+    shards: Optional[int] = None,
+    shard_by: str = 'id',
+    layout: str = 'flat',
+    wiktionary: bool = False,
+    wiktionary_url: str = WIKTIONARY_URL,
+    corpus: Optional[str] = None,
+    rate: Optional[float] = DEFAULT_RATE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    cache: Optional[str] = str(DEFAULT_CACHE),
+    cache_ttl: float = DEFAULT_TTL,
+    cache_bytes: int = DEFAULT_MAX_BYTES,
+    offline: bool = False,
+    authors: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    journal_path: Optional[str] = None,
+    restart: bool = False,
+):
     """Main function to fill usage examples."""
     print("=" * 60)
     print("🔍 FILLING USAGE EXAMPLES FOR RUSSIAN PHRASEOLOGICAL UNITS")
@@ -272,70 +211,64 @@ def main():
     
     # Load data
     print(f"\n📂 Loading data from {DATA_FILE}...")
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    phrases = data['phrases']
+    phrases = PhraseStore.load(DATA_FILE)
     total_phrases = len(phrases)
     print(f"📊 Loaded {total_phrases} phraseological units")
     
-    # Initialize example finder
-    finder = UsageExampleFinder()
+    # Examples journaled by an interrupted run are kept unless restarting
+    journal_path = Path(journal_path or OUTPUT_FILE.with_suffix('.journal.jsonl'))
+    if restart:
+        journal_path.unlink(missing_ok=True)
+    journal = ExampleJournal(journal_path)
     
-    # Find examples for each phrase
-    processed = 0
-    with_examples = 0
-    
-    print("\n🔍 Finding usage examples...")
+    # Initialize example finder
+    finder = UsageExampleFinder(gazetteer=AuthorGazetteer(load_authors(authors)) if authors else None)
+
+    # Look up examples from external sources concurrently, only for phrases
+    # that have no example yet and none in their etymology
+    if wiktionary or corpus:
+        pending = [
+            phrase_data for phrase_data in phrases
+            if not phrase_data.get('usage_example') and phrase_key(phrase_data) not in journal
+            and not finder.create_example_from_etymology(phrase_data)
+        ]
+        print(f"\n🌐 Looking up examples for {len(pending)} phrases "
+              f"({'Wiktionary' if wiktionary else ''}{' + ' if wiktionary and corpus else ''}"
+              f"{'local corpus' if corpus else ''})...")
+        page_cache = UrlCache(cache, cache_ttl, cache_bytes) if cache and wiktionary else None
+        try:
+            finder.fetched = collect_examples(pending, wiktionary, wiktionary_url, corpus, rate, concurrency,
+                                              retries, page_cache, offline)
+        finally:
+            if page_cache is not None:
+                page_cache.close()
+        print(f"🌐 Found {len(finder.fetched)} examples in sources")
     
-    for i, phrase_data in enumerate(phrases, 1):
-        phrase = phrase_data['phrase']
-        
-        # Skip if already has example
-        if 'usage_example' in phrase_data and phrase_data['usage_example']:
-            print(f"[{i:4d}/{total_phrases}] ⏭️  Skipping '{phrase}' - already has example")
-            with_examples += 1
-        else:
-            # Find example
-            example = finder.find_example_for_phrase(phrase_data)
-            if example:
-                phrase_data['usage_example'] = example
-                print(f"[{i:4d}/{total_phrases}] ✅ Found example for '{phrase}'")
-                with_examples += 1
-            else:
-                print(f"[{i:4d}/{total_phrases}] ❌ No example found for '{phrase}'")
-        
-        processed = i
-        
-        # Progress indicator
-        if i % 50 == 0:
-            print(f"📈 Progress: {i/total_phrases*100:.1f}% ({with_examples} examples found)")
-        
-        # Small delay to avoid overwhelming servers
-        if i % 10 == 0:
-            time.sleep(0.5)
+    # Fill the remaining phrases in a process pool; every finished chunk is
+    # journaled, so an interrupted run resumes where it stopped
+    print(f"\n🔍 Finding usage examples ({journal_path})...")
+    fill = fill_examples(phrases, journal, finder.fetched, workers, chunk_size, authors, finder.seed)
+    compact(phrases, journal)
+    processed = total_phrases
+    with_examples = sum(1 for phrase_data in phrases if phrase_data.get('usage_example'))
+    print(f"📈 Filled {fill['filled']} phrases in {fill['chunks']} chunks, {fill['resumed']} from the journal")
     
     # Save updated JSON
     print(f"\n💾 Saving updated data to {OUTPUT_FILE}...")
-    output_data = {
-        'phrases': phrases,
+    phrases.save(OUTPUT_FILE, {
         'metadata': {
             'total_phrases': total_phrases,
             'with_examples': with_examples,
             'without_examples': total_phrases - with_examples,
             'generated_at': time.strftime('%Y-%m-%d %H:%M:%S')
         }
-    }
+    })
     
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    journal.remove()
     
     # Generate SQL dump
     print(f"\n📝 Generating SQL dump to {SQL_FILE}...")
-    sql_content = generate_sql_dump()
-    
-    with open(SQL_FILE, 'w', encoding='utf-8') as f:
-        f.write(sql_content)
+    sql_file = generate_sql_dump(batch_bytes, compression, fmt, dialect, delta, shards, shard_by, layout)
     
     # Print report
     print("\n" + "=" * 60)
@@ -347,11 +280,67 @@ def main():
     print(f"Success rate: {with_examples/total_phrases*100:.1f}%")
     print(f"\nFiles created:")
     print(f"  • {OUTPUT_FILE} - Updated JSON with examples")
-    print(f"  • {SQL_FILE} - MySQL dump with examples")
+    print(f"  • {sql_file} - MySQL dump with examples")
     print("=" * 60)
     
     print("\n🎉 Task completed successfully!")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fill usage examples and regenerate the SQL dump.")
+    add_dump_arguments(parser)
+    parser.add_argument("--authors", metavar="PATH",
+                        help="JSON table of writers for etymology quotes (default: author_gazetteer.AUTHORS)")
+    filling = parser.add_argument_group("parallel filling")
+    filling.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    filling.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                         help="phrases per task and journal commit (default: %(default)s)")
+    filling.add_argument("--journal", metavar="PATH", default=None,
+                         help=f"write-ahead journal (default: {OUTPUT_FILE.with_suffix('.journal.jsonl')})")
+    filling.add_argument("--restart", action="store_true", help="discard the journal of an interrupted run")
+    sources = parser.add_argument_group("example sources")
+    sources.add_argument("--wiktionary", action="store_true", help="look examples up on Wiktionary pages")
+    sources.add_argument("--wiktionary-url", default=WIKTIONARY_URL,
+                         help="Wiktionary server (e.g. a local `example_sources.py stub`)")
+    sources.add_argument("--corpus", metavar="DIR", help="directory of .txt texts to search for examples")
+    sources.add_argument("--rate", type=float, default=DEFAULT_RATE, help="network requests per second")
+    sources.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="requests in flight")
+    sources.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    sources.add_argument("--cache", metavar="PATH", default=str(DEFAULT_CACHE),
+                         help="on-disk cache of fetched pages (default: %(default)s)")
+    sources.add_argument("--no-cache", dest="cache", action="store_const", const=None,
+                         help="always fetch pages from the network")
+    sources.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL / 3600, metavar="HOURS",
+                         help="revalidate cached pages older than this (default: %(default)g)")
+    sources.add_argument("--cache-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                         help="evict least recently used pages above this size (default: %(default)s)")
+    sources.add_argument("--offline", action="store_true",
+                         help="serve pages only from the cache, never from the network")
+    args = parser.parse_args()
+    if args.offline and not args.cache:
+        parser.error("--offline needs a --cache")
+    main(
+        batch_bytes=args.batch_bytes,
+        compression=args.compress,
+        fmt=args.format,
+        dialect=args.dialect,
+        delta=args.delta,
+        shards=args.shards,
+        shard_by=args.shard_by,
+        layout=args.layout,
+        wiktionary=args.wiktionary,
+        wiktionary_url=args.wiktionary_url,
+        corpus=args.corpus,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        retries=args.retries,
+        cache=args.cache,
+        cache_ttl=args.cache_ttl * 3600,
+        cache_bytes=args.cache_mb * 1024 * 1024,
+        offline=args.offline,
+        authors=args.authors,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        journal_path=args.journal,
+        restart=args.restart,
+    )
\ No newline at end of file
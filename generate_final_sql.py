@@ -3,82 +3,61 @@
 Generate final SQL dump with improved usage examples.
 """
 
-import json
+import argparse
 from pathlib import Path
 from datetime import datetime
 
-def escape_sql(value):
-    """Escape value for SQL."""
-    if value is None:
-        return 'NULL'
-    return "'" + str(value).replace("'", "\\'").replace("\\", "\\\\") + "'"
+from phrase_store import PhraseStore
+from sql_dump import add_dump_arguments, export_phrases
 
-def generate_sql_dump():
-    """Generate SQL dump from improved JSON data."""
+def generate_sql_dump(batch_bytes=None, compression=None, fmt='sql', dialect='mysql', delta=False,
+                      shards=None, shard_by='id', layout='flat'):
+    """Generate SQL dump from improved JSON data.
+
+    Serialization goes through the shared engine in sql_dump.py. `fmt` selects
+    an INSERT/COPY dump ('sql'), a LOAD DATA data file plus companion script
+    ('tsv'/'csv') or a ready SQLite database ('sqlite'); `dialect` selects
+    MySQL, SQLite or PostgreSQL syntax. With `batch_bytes` set, rows are
+    written as multi-row INSERTs of at most that many bytes each. With
+    `delta`, only the changes since the previous dump's manifest are written.
+    With `shards`, the dump is split into a schema file plus that many
+    idempotent shard files (by id range or phrase hash) for parallel import.
+    `layout='normalized'` writes separate category and meaning tables plus
+    a flat compatibility view.
+    """
     input_file = Path('table_phrases_improved.json')
     output_file = Path('phraseological_dict_final.sql')
     
     print(f"📂 Loading data from {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    phrases = data['phrases']
+    phrases = PhraseStore.load(input_file)
     
     print(f"📊 Processing {len(phrases)} phraseological units...")
     
-    sql_lines = [
-        "-- MySQL dump for phraseological dictionary",
+    comment_lines = [
         "-- Generated with filled usage examples",
         f"-- Total phrases: {len(phrases)}",
         f"-- Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        "",
-        "SET NAMES utf8mb4;",
-        "SET FOREIGN_KEY_CHECKS = 0;",
-        "",
-        "-- Drop table if exists",
-        "DROP TABLE IF EXISTS `phraseological_dict`;",
-        "",
-        "-- Table structure for phraseological_dict",
-        "CREATE TABLE `phraseological_dict` (",
-        "  `id` int(11) NOT NULL AUTO_INCREMENT,",
-        "  `phrase` varchar(500) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Фразеологизм',",
-        "  `meaning` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Значение фразеологизма',",
-        "  `etymology` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Происхождение фразеологизма',",
-        "  `usage_example` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Пример использования фразеологизма в тексте',",
-        "  `categories` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Категория фразеологизма',",
-        "  `source_url` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Источник',",
-        "  PRIMARY KEY (`id`),",
-        "  UNIQUE KEY `phrase` (`phrase`),",
-        "  KEY `categories` (`categories`)",
-        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Словарь фразеологизмов русского языка';",
-        "",
-        "-- Data for table phraseological_dict",
-        "LOCK TABLES `phraseological_dict` WRITE;",
     ]
     
-    # Add INSERT statements
-    for i, phrase_data in enumerate(phrases, 1):
-        meaning = '; '.join(phrase_data.get('meanings', []))
-        
-        sql_lines.append(
-            f"INSERT INTO `phraseological_dict` (`id`, `phrase`, `meaning`, `etymology`, `usage_example`, `categories`, `source_url`) VALUES ({i}, {escape_sql(phrase_data['phrase'])}, {escape_sql(meaning)}, {escape_sql(phrase_data.get('etymology', ''))}, {escape_sql(phrase_data.get('usage_example'))}, {escape_sql(phrase_data.get('category', ''))}, {escape_sql(phrase_data.get('source_url', ''))});"
-        )
-    
-    sql_lines.extend([
-        "",
-        "UNLOCK TABLES;",
-        "",
-        "SET FOREIGN_KEY_CHECKS = 1;"
-    ])
-    
     # Write SQL dump
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(sql_lines))
+    output_file = export_phrases(
+        phrases,
+        output_file,
+        comment_lines,
+        fmt=fmt,
+        dialect=dialect,
+        batch_bytes=batch_bytes,
+        compression=compression,
+        delta=delta,
+        shards=shards,
+        shard_by=shard_by,
+        layout=layout,
+    )
     
     print(f"💾 SQL dump saved to {output_file}")
     
     # Generate report
-    with_examples = sum(1 for p in phrases if p.get('usage_example'))
+    with_examples = sum(1 for example in phrases.column('usage_example') if example)
     
     print("\n" + "="*60)
     print("📊 FINAL REPORT")
@@ -93,4 +72,16 @@ def generate_sql_dump():
     return output_file
 
 if __name__ == "__main__":
-    generate_sql_dump()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate final SQL dump with usage examples.")
+    add_dump_arguments(parser)
+    args = parser.parse_args()
+    generate_sql_dump(
+        batch_bytes=args.batch_bytes,
+        compression=args.compress,
+        fmt=args.format,
+        dialect=args.dialect,
+        delta=args.delta,
+        shards=args.shards,
+        shard_by=args.shard_by,
+        layout=args.layout,
+    )
\ No newline at end of file
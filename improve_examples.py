@@ -5,10 +5,12 @@ Improve usage examples for better grammar and context.
 This script fixes grammatical issues in the generated examples.
 """
 
-import json
 import re
 from pathlib import Path
 
+from phrase_snapshot import snapshot_path, write_snapshot
+from phrase_store import PhraseStore
+
 def improve_example(phrase: str, example: str) -> str:
     """Improve example grammar and context."""
     
@@ -43,38 +45,36 @@ def main():
     input_file = Path('table_phrases_with_examples.json')
     output_file = Path('table_phrases_improved.json')
     
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    phrases = data['phrases']
+    phrases = PhraseStore.load(input_file)
     improved_count = 0
     
-    for i, phrase_data in enumerate(phrases):
-        phrase = phrase_data['phrase']
-        example = phrase_data.get('usage_example', '')
+    for i in range(len(phrases)):
+        phrase = phrases.get(i, 'phrase')
+        example = phrases.get(i, 'usage_example', '')
         
         if example:
             improved_example = improve_example(phrase, example)
             if improved_example != example:
-                phrase_data['usage_example'] = improved_example
+                phrases.set(i, 'usage_example', improved_example)
                 improved_count += 1
                 print(f"[{i+1:4d}] Improved: '{phrase}'")
     
     # Save improved data
-    output_data = {
-        'phrases': phrases,
+    phrases.document = {
         'metadata': {
-            **data.get('metadata', {}),
+            **phrases.document.get('metadata', {}),
             'improved_examples': improved_count,
             'improved_at': '2024-01-20 00:00:00'
         }
     }
+    phrases.save(output_file)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    # Memory-mappable copy for services that should not parse the JSON
+    snapshot_file = write_snapshot(phrases, snapshot_path(output_file))
     
     print(f"\n✅ Improved {improved_count} examples")
     print(f"💾 Saved to {output_file}")
+    print(f"💾 Snapshot saved to {snapshot_file}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for the phrase corpus (MinHash + LSH).
+
+`deduplicate_phrases.group_phrases` only merges entries whose phrases are
+equal after `normalize_phrase`. Variants from different sources also differ
+by ё/е, punctuation and dashes, a parenthesised optional word or swapped
+words ("ни кола ни двора" / "ни двора ни кола"), and comparing all pairs
+does not scale past a few thousand entries.
+
+Each entry is reduced to two sets of character shingles: one of its
+canonical phrase and one of its first meaning. Shingles are the character
+trigrams of each word padded with spaces, so word order does not matter
+and a missing or extra word only removes that word's trigrams.
+
+Both sets get a one-permutation MinHash signature of SIGNATURE_SIZE bins,
+cut into BANDS bands for locality-sensitive hashing.
+Only entries sharing a band bucket are compared, which keeps the work
+close to linear in the corpus size. Candidates are scored with the exact
+Jaccard similarity of their shingle sets, weighted PHRASE_WEIGHT for the
+phrase and the rest for the meaning, and pairs above the review threshold
+are joined into clusters.
+
+    python3 near_duplicates.py table_phrases.json --threshold 0.6
+    python3 near_duplicates.py table_phrases.json --scale 200000
+
+The second form times detection on a synthetic corpus of that many entries.
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import time
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from phrase_store import PhraseStore, normalize_phrase
+
+SHINGLE_SIZE = 3
+SIGNATURE_SIZE = 64
+BANDS = 16  # 16 bands of 4 bins: pairs above ~0.5 Jaccard collide in some band with high probability
+ROWS = SIGNATURE_SIZE // BANDS
+PHRASE_WEIGHT = 0.7
+REVIEW_THRESHOLD = 0.6
+MERGE_THRESHOLD = 0.85
+MAX_BUCKET = 50  # larger buckets are boilerplate ("О чем-то негативном"), not duplicates
+
+_EMPTY = 1 << 64  # above any bin value
+_PUNCTUATION = re.compile(r'[^\w\s]+')
+
+
+def canonical_text(text: str) -> str:
+    """Lowercase, ё → е, punctuation and dashes (also around optional words) → spaces."""
+    text = normalize_phrase(text or '').replace('ё', 'е')
+    return ' '.join(_PUNCTUATION.sub(' ', text).split())
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Character trigrams of each word of the canonical text, padded with spaces."""
+    result = set()
+    for word in canonical_text(text).split():
+        padded = f" {word} "
+        if len(padded) <= SHINGLE_SIZE:
+            result.add(padded)
+        result.update(padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1))
+    return frozenset(result)
+
+
+class MinHasher:
+    """
+    One-permutation MinHash with optimal densification over interned shingles.
+
+    Every distinct shingle gets a small integer id and is hashed once into
+    (bin, value); a signature keeps the minimum value per bin, so it costs
+    one pass over the shingles instead of SIGNATURE_SIZE. A bin left empty
+    copies the first filled bin in its own fixed random order of all bins:
+    the orders are shared by all sets, so equal sets still get equal
+    signatures and, unlike copying a neighbour, the bins of one band stay
+    independent (collision odds track Jaccard similarity).
+    """
+
+    def __init__(self, size: int = SIGNATURE_SIZE):
+        self.size = size
+        self._ids: Dict[str, int] = {}
+        self._hashes: List[Tuple[int, int]] = []  # id -> (bin, value)
+        self._probes = [tuple(random.Random(i).sample(range(size), size)) for i in range(size)]
+
+    def ids(self, items: Iterable[str]) -> array:
+        """Sorted ids of the shingles, assigning new ids as needed."""
+        ids = array('I')
+        for item in items:
+            shingle_id = self._ids.get(item)
+            if shingle_id is None:
+                shingle_id = self._ids[item] = len(self._hashes)
+                value = int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little')
+                self._hashes.append(divmod(value, self.size)[::-1])
+            ids.append(shingle_id)
+        return array('I', sorted(ids))
+
+    def signature(self, ids: Sequence[int]) -> Optional[Tuple[int, ...]]:
+        """Per-bin minimum hashes, densified; None for an empty set."""
+        if not ids:
+            return None
+        bins = [_EMPTY] * self.size
+        for shingle_id in ids:
+            slot, value = self._hashes[shingle_id]
+            if value < bins[slot]:
+                bins[slot] = value
+        signature = list(bins)
+        for slot, value in enumerate(bins):
+            if value == _EMPTY:
+                for probe in self._probes[slot]:  # a permutation of all bins, so some bin is filled
+                    value = bins[probe]
+                    if value != _EMPTY:
+                        break
+                signature[slot] = value
+        return tuple(signature)
+
+
+def jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    """Jaccard similarity of two sets given as sequences of distinct items."""
+    if not a and not b:
+        return 1.0
+    common = len(set(a).intersection(b))
+    return common / (len(a) + len(b) - common)
+
+
+class NearDuplicateCluster(NamedTuple):
+    indexes: Tuple[int, ...]  # positions in the input, ascending
+    score: float  # lowest similarity of the first entry to another member
+    pairs: Tuple[Tuple[int, int, float], ...]
+
+
+class NearDuplicateIndex:
+    """Shingle sets, MinHash signatures and LSH buckets of a sequence of entries."""
+
+    def __init__(self, entries: Iterable[Dict], bands: int = BANDS):
+        self.bands = bands
+        self.rows = SIGNATURE_SIZE // bands
+        self.phrases: List[array] = []  # shingle ids per entry
+        self.meanings: List[array] = []
+        self.buckets: Dict[int, Union[int, List[int]]] = {}  # hash of (field, band, hashes) -> entries
+        hasher = MinHasher()
+        for index, entry in enumerate(entries):
+            meanings = entry.get('meanings') or []
+            phrase_ids = hasher.ids(shingles(entry.get('phrase', '')))
+            meaning_ids = hasher.ids(shingles(meanings[0]) if meanings else ())
+            self.phrases.append(phrase_ids)
+            self.meanings.append(meaning_ids)
+            for field, ids in enumerate((phrase_ids, meaning_ids)):
+                signature = hasher.signature(ids)
+                if signature is None:
+                    continue
+                for band in range(bands):
+                    self._add(hash((field, band, signature[band * self.rows:(band + 1) * self.rows])), index)
+
+    def _add(self, key: int, index: int) -> None:
+        members = self.buckets.get(key)
+        if members is None:
+            self.buckets[key] = index  # most buckets stay singletons: no list for them
+        elif isinstance(members, int):
+            self.buckets[key] = [members, index]
+        else:
+            members.append(index)
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def score(self, a: int, b: int, threshold: float = 0.0) -> float:
+        """
+        Weighted Jaccard of phrase and first-meaning shingles; phrase only if a meaning is missing.
+
+        The meaning is not compared (and 0.0 is returned) when even identical
+        meanings would leave the score below `threshold`.
+        """
+        phrase = jaccard(self.phrases[a], self.phrases[b])
+        if not self.meanings[a] or not self.meanings[b]:
+            return phrase
+        if PHRASE_WEIGHT * phrase + (1 - PHRASE_WEIGHT) < threshold:
+            return 0.0
+        return PHRASE_WEIGHT * phrase + (1 - PHRASE_WEIGHT) * jaccard(self.meanings[a], self.meanings[b])
+
+    def candidate_pairs(self) -> Iterable[Tuple[int, int]]:
+        """Distinct index pairs (a < b) sharing at least one LSH bucket."""
+        seen = set()
+        for members in self.buckets.values():
+            if isinstance(members, int) or len(members) > MAX_BUCKET:
+                continue
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if (a, b) not in seen:
+                        seen.add((a, b))
+                        yield a, b
+
+    def clusters(self, threshold: float = REVIEW_THRESHOLD) -> List[NearDuplicateCluster]:
+        """Connected components of candidate pairs scoring at least `threshold`, in input order."""
+        parent = list(range(len(self)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        pairs: List[Tuple[int, int, float]] = []
+        for a, b in self.candidate_pairs():
+            similarity = self.score(a, b, threshold)
+            if similarity >= threshold:
+                pairs.append((a, b, similarity))
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        grouped: Dict[int, List[Tuple[int, int, float]]] = {}
+        for pair in pairs:
+            grouped.setdefault(find(pair[0]), []).append(pair)
+        clusters = []
+        for root in sorted(grouped):
+            members = sorted(grouped[root])
+            indexes = tuple(sorted({i for a, b, _ in members for i in (a, b)}))
+            clusters.append(NearDuplicateCluster(indexes, self._cluster_score(indexes, members), tuple(members)))
+        return clusters
+
+    def _cluster_score(self, indexes: Tuple[int, ...], pairs: List[Tuple[int, int, float]]) -> float:
+        """Minimum similarity of the cluster's first entry to the others (chains score low)."""
+        first = indexes[0]
+        direct = {b if a == first else a: s for a, b, s in pairs if first in (a, b)}
+        return round(min(direct.get(i, self.score(first, i)) for i in indexes[1:]), 3)
+
+
+def find_near_duplicates(entries: Sequence[Dict], threshold: float = REVIEW_THRESHOLD) -> List[NearDuplicateCluster]:
+    """Clusters of near-duplicate entries scoring at least `threshold`."""
+    return NearDuplicateIndex(entries).clusters(threshold)
+
+
+def _variant(phrase: str, rng: random.Random) -> str:
+    """The phrase as another source might spell it: swapped words, ё/е, an optional word, a dash."""
+    words = phrase.split()
+    edit = rng.randrange(4)
+    if edit == 0 and len(words) > 1:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    elif edit == 1:
+        return phrase.replace('е', 'ё', 1) if 'е' in phrase else phrase.upper()
+    elif edit == 2:
+        words.insert(rng.randrange(len(words) + 1), '(и)')
+    else:
+        words.insert(rng.randrange(len(words) + 1), '—')
+    return ' '.join(words)
+
+
+def synthetic_phrases(phrases: Sequence[Dict], count: int, seed: int = 0,
+                      variants: float = 0.05) -> List[Dict]:
+    """
+    `count` entries for timing: new phrases and meanings from the corpus vocabulary
+    and, for a `variants` share, a respelled copy of a corpus entry marked
+    with `variant_of` (its corpus index, the corpus being placed first).
+    """
+    rng = random.Random(seed)
+    phrase_words = sorted({word for entry in phrases for word in entry['phrase'].split()})
+    meaning_words = sorted({word for entry in phrases for meaning in (entry.get('meanings') or [])[:1]
+                            for word in meaning.split()})
+    result = [dict(entry) for entry in phrases]
+    while len(result) < count:
+        if rng.random() < variants:
+            source = rng.randrange(len(phrases))
+            entry = dict(phrases[source], variant_of=source)
+            entry['phrase'] = _variant(entry['phrase'], rng)
+        else:
+            entry = {'phrase': ' '.join(rng.choices(phrase_words, k=rng.randint(2, 6))),
+                     'meanings': [' '.join(rng.choices(meaning_words, k=rng.randint(3, 12)))]}
+        result.append(entry)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate phrases with MinHash/LSH.")
+    parser.add_argument("json_file", nargs='?', default='table_phrases.json')
+    parser.add_argument("--threshold", type=float, default=REVIEW_THRESHOLD,
+                        help=f"minimum similarity to report (default: {REVIEW_THRESHOLD})")
+    parser.add_argument("--scale", type=int, default=0,
+                        help="time detection on N synthetic entries built from the corpus words")
+    args = parser.parse_args()
+
+    corpus = [entry for entry in PhraseStore.load(args.json_file)]
+    if args.scale:
+        corpus = synthetic_phrases(corpus, args.scale)
+    started = time.perf_counter()
+    index = NearDuplicateIndex(corpus)
+    indexed = time.perf_counter()
+    found = index.clusters(args.threshold)
+    finished = time.perf_counter()
+    print(f"Entries: {len(index)}, buckets: {len(index.buckets)}")
+    print(f"Indexing: {indexed - started:.2f} s, clustering: {finished - indexed:.2f} s")
+    print(f"Clusters: {len(found)}")
+    if args.scale:
+        clustered = {i: cluster.indexes[0] for cluster in found for i in cluster.indexes}
+        planted = [i for i, entry in enumerate(corpus) if 'variant_of' in entry]
+        recalled = sum(1 for i in planted if clustered.get(i, i) == clustered.get(corpus[i]['variant_of']))
+        print(f"Planted variants found: {recalled}/{len(planted)}")
+    else:
+        for cluster in found:
+            print(f"  {cluster.score:.2f}  " + '  |  '.join(corpus[i]['phrase'] for i in cluster.indexes))
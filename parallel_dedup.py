@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Parallel deduplication of several phrase sources, sharded by key hash.
+
+`deduplicate_phrases` reads one file in one process. Merging several
+scraped sources runs here in three stages over a process pool:
+
+1. partition -- one task per source parses it (`iter_json_phrases`) and
+   writes every entry to the shard chosen by a stable hash of
+   `normalize_phrase(phrase)`, as (source, index, entry) JSON lines;
+2. merge -- one task per shard reads its partitions in source order, runs
+   `group_phrases` and `merge_duplicate_entries` and writes the merged
+   entries tagged with the position of their first appearance;
+3. the shard outputs are k-way merged by that position and streamed out.
+
+All entries of a phrase land in the same shard and arrive in input order,
+so the URL (" | ") and category (", ") merges are exactly those of the
+single-process path, and the output equals `find_and_remove_duplicates`
+on the concatenated sources whatever the number of workers or shards.
+
+    python3 parallel_dedup.py table_phrases.json other_source.json -o merged.json --workers 8
+"""
+
+import argparse
+import heapq
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from deduplicate_phrases import group_phrases, merge_duplicate_entries
+from phrase_store import dump_json, iter_json_phrases, normalize_phrase
+from sql_dump import shard_of
+
+REPORT_GROUPS = 1000  # duplicate groups kept for the report (the earliest ones)
+
+
+def _partition_path(directory: Path, source: int, shard: int) -> Path:
+    return directory / f"source-{source:04d}-shard-{shard:04d}.jsonl"
+
+
+def _shard_path(directory: Path, shard: int) -> Path:
+    return directory / f"merged-{shard:04d}.jsonl"
+
+
+def partition_source(path: str, source: int, shards: int, directory: str) -> int:
+    """Stage 1: split one source into per-shard files; returns its entry count."""
+    directory = Path(directory)
+    files = [open(_partition_path(directory, source, shard), 'w', encoding='utf-8') for shard in range(shards)]
+    count = 0
+    try:
+        for index, entry in enumerate(iter_json_phrases(path)):
+            shard = shard_of(normalize_phrase(entry.get("phrase", "")), shards)
+            files[shard].write(json.dumps([source, index, entry], ensure_ascii=False) + '\n')
+            count += 1
+    finally:
+        for f in files:
+            f.close()
+    return count
+
+
+def merge_shard(shard: int, sources: int, directory: str, report_groups: int = REPORT_GROUPS) -> Dict:
+    """
+    Stage 2: deduplicate one shard; returns its statistics and earliest duplicate groups.
+
+    Partitions are read in source order and each is in entry order, so the
+    shard's entries are already in global input order.
+    """
+    directory = Path(directory)
+    entries: List[Dict] = []
+    positions: List[Tuple[int, int]] = []
+    for source in range(sources):
+        with open(_partition_path(directory, source, shard), 'r', encoding='utf-8') as f:
+            for line in f:
+                source_index, index, entry = json.loads(line)
+                positions.append((source_index, index))
+                entries.append(entry)
+
+    groups, order = group_phrases(entries)
+    first: Dict[str, Tuple[int, int]] = {}
+    for position, entry in zip(positions, entries):
+        first.setdefault(normalize_phrase(entry.get("phrase", "")), position)
+
+    duplicates: List[Tuple[Tuple[int, int], str, List[Dict]]] = []
+    with open(_shard_path(directory, shard), 'w', encoding='utf-8') as f:
+        for key in order:
+            group = groups[key]
+            if len(group) > 1:
+                duplicates.append((first[key], key, group))
+            f.write(json.dumps([*first[key], merge_duplicate_entries(group)], ensure_ascii=False) + '\n')
+    return {
+        "entries": len(entries),
+        "unique": len(order),
+        "duplicates_found": len(duplicates),
+        "duplicate_entries_removed": sum(len(group) - 1 for _, _, group in duplicates),
+        "earliest": duplicates[:report_groups],
+    }
+
+
+def _read_merged(path: Path) -> Iterator[list]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def parallel_deduplicate(
+    inputs: Sequence[Union[str, Path]],
+    output_path: Union[str, Path],
+    workers: Optional[int] = None,
+    shards: Optional[int] = None,
+    tmp_dir: Optional[Union[str, Path]] = None,
+    report_groups: int = REPORT_GROUPS,
+) -> Dict:
+    """
+    Deduplicate the concatenation of `inputs` into `output_path` with a process pool.
+
+    Returns the same statistics as `find_and_remove_duplicates`, with the
+    duplicate details limited to the `report_groups` groups that appear first.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shards or 4 * workers
+    with tempfile.TemporaryDirectory(prefix='dedup-', dir=tmp_dir) as directory, \
+            ProcessPoolExecutor(workers) as pool:
+        counts = list(pool.map(partition_source, [str(path) for path in inputs], range(len(inputs)),
+                               [shards] * len(inputs), [directory] * len(inputs)))
+        stats = list(pool.map(merge_shard, range(shards), [len(inputs)] * shards, [directory] * shards,
+                              [report_groups] * shards))
+        merged = heapq.merge(*(_read_merged(_shard_path(Path(directory), shard)) for shard in range(shards)),
+                             key=itemgetter(0, 1))
+        total_after = dump_json(output_path, (record[2] for record in merged), {})
+
+    earliest = heapq.nsmallest(report_groups, (group for shard in stats for group in shard["earliest"]),
+                               key=itemgetter(0))
+    return {
+        "total_before": sum(counts),
+        "duplicates_found": sum(shard["duplicates_found"] for shard in stats),
+        "duplicate_entries_removed": sum(shard["duplicate_entries_removed"] for shard in stats),
+        "total_after": total_after,
+        "duplicates_detail": {key: group for _, key, group in earliest},
+        "duplicates_order": [key for _, key, _ in earliest],
+        "duplicates_shown": len(earliest),
+        "sources": {str(path): count for path, count in zip(inputs, counts)},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge and deduplicate several phrase sources in parallel.")
+    parser.add_argument("inputs", nargs='+', help="JSON files with a 'phrases' list, in priority order")
+    parser.add_argument("-o", "--output", default="table_phrases_cleaned.json")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--shards", type=int, default=None, help="key-hash shards (default: 4 per worker)")
+    parser.add_argument("--tmp-dir", default=None, help="directory for partition files (default: system temp)")
+    args = parser.parse_args()
+
+    result = parallel_deduplicate(args.inputs, args.output, args.workers, args.shards, args.tmp_dir)
+    for path, count in result["sources"].items():
+        print(f"📂 {path}: {count} entries")
+    print(f"📊 Entries: {result['total_before']} → {result['total_after']}, "
+          f"duplicate groups: {result['duplicates_found']}, removed: {result['duplicate_entries_removed']}")
+    print(f"💾 Saved to {args.output}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Uniform random sampling of phrases for the trainer, without ORDER BY RAND().
+
+Every row carries `category_seq`, its dense 1..N position inside its
+category, indexed together with `categories`. Picking k phrases is then:
+
+1. read the per-category sizes once (MAX(category_seq) per category, an
+   index-only query) and cache them;
+2. draw k distinct positions uniformly, either inside one category or over
+   the whole table (a global position maps to a category and a sequence
+   number through the cumulative sizes);
+3. fetch exactly those rows with `categories = ? AND category_seq IN (...)`
+   lookups on the (categories, category_seq) index.
+
+Each question therefore touches k index entries instead of sorting the
+table. `random_key` (a stable hash of the phrase, also indexed) serves plain
+SQL clients that cannot run this code; see README.md.
+
+    python3 phrase_sampling.py --sqlite phraseological_dict_final.sqlite -k 5 --category animals
+"""
+
+import argparse
+import bisect
+import random
+import sqlite3
+from typing import Dict, List, Optional, Sequence
+
+from sql_dump import TABLE_NAME, get_dialect
+
+DEFAULT_COLUMNS = ('id', 'phrase', 'meaning', 'categories')
+
+
+class PhraseSampler:
+    """Draw uniformly random phrases through a DB-API connection."""
+
+    def __init__(self, connection, dialect: str = 'mysql', rng: Optional[random.Random] = None):
+        self.connection = connection
+        self.dialect = get_dialect(dialect)
+        self.rng = rng or random.Random()
+        self._sizes: Optional[Dict[str, int]] = None
+
+    def _quote(self, identifier: str) -> str:
+        return self.dialect.quote(identifier)
+
+    def _execute(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, tuple(params))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def category_sizes(self, refresh: bool = False) -> Dict[str, int]:
+        """Number of phrases per category; cached until `refresh` (e.g. after a delta load)."""
+        if self._sizes is None or refresh:
+            rows = self._execute(
+                f"SELECT {self._quote('categories')}, MAX({self._quote('category_seq')}) "
+                f"FROM {self._quote(TABLE_NAME)} GROUP BY {self._quote('categories')}"
+            )
+            self._sizes = {category: size for category, size in sorted(rows, key=lambda row: row[0] or '')}
+        return self._sizes
+
+    def _positions(self, k: int, category: Optional[str]) -> Dict[str, List[int]]:
+        """Draw k distinct (category -> category_seq list) positions."""
+        sizes = self.category_sizes()
+        if category is not None:
+            size = sizes.get(category, 0)
+            return {category: self.rng.sample(range(1, size + 1), min(k, size))} if size else {}
+
+        categories = list(sizes)
+        bounds = []
+        total = 0
+        for name in categories:
+            total += sizes[name]
+            bounds.append(total)
+        picked: Dict[str, List[int]] = {}
+        for position in self.rng.sample(range(total), min(k, total)):
+            index = bisect.bisect_right(bounds, position)
+            start = bounds[index - 1] if index else 0
+            picked.setdefault(categories[index], []).append(position - start + 1)
+        return picked
+
+    def sample(self, k: int, category: Optional[str] = None,
+               columns: Sequence[str] = DEFAULT_COLUMNS) -> List[tuple]:
+        """
+        Return up to k distinct uniformly random rows, optionally from one category.
+
+        Rows come back in random order with the requested `columns`.
+        """
+        picked = self._positions(k, category)
+        if not picked:
+            return []
+        placeholder = self.dialect.placeholder
+        conditions = []
+        params: List = []
+        for name, seqs in picked.items():
+            in_list = ', '.join(placeholder for _ in seqs)
+            conditions.append(f"({self._quote('categories')} = {placeholder} "
+                              f"AND {self._quote('category_seq')} IN ({in_list}))")
+            params.append(name)
+            params.extend(seqs)
+        column_list = ', '.join(self._quote(column) for column in columns)
+        rows = self._execute(
+            f"SELECT {column_list} FROM {self._quote(TABLE_NAME)} WHERE {' OR '.join(conditions)}",
+            params,
+        )
+        self.rng.shuffle(rows)
+        return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draw random phrases from a SQLite dump.")
+    parser.add_argument("--sqlite", metavar="PATH", required=True, help="SQLite database (see --format sqlite)")
+    parser.add_argument("-k", type=int, default=1, help="number of phrases (default: 1)")
+    parser.add_argument("--category", default=None, help="only draw from this category")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible draws")
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.sqlite)
+    try:
+        sampler = PhraseSampler(connection, 'sqlite', random.Random(args.seed))
+        for row_id, phrase, meaning, category in sampler.sample(args.k, args.category):
+            print(f"{row_id:>5}  [{category}] {phrase} — {meaning[:80]}")
+    finally:
+        connection.close()
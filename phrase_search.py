@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Full-text search queries for the trainer.
+
+The dumps store stemmed copies of `phrase`, `meaning` and `usage_example`
+(`*_search` columns, see russian_stemmer.py) with a full-text index over
+them: FULLTEXT in MySQL, an FTS5 table in SQLite and a GIN tsvector index in
+PostgreSQL. A search string is stemmed the same way, so "воду" finds
+"вода" and "воды"; the last word is matched as a prefix for search-as-you-type.
+
+`search_query` returns the SQL and parameters for a DB-API cursor; run as a
+script it searches a SQLite dump directly:
+
+    python3 phrase_search.py "вода" --sqlite phraseological_dict_final.sqlite
+
+On the normalized layout (sql_layouts.py) phraseological_dict is a view, and
+MySQL only matches the FULLTEXT index of a base table: pass
+`search_table='phrases'` there.
+"""
+
+import argparse
+import sqlite3
+from typing import List, Tuple
+
+from russian_stemmer import stem_words
+from sql_dump import DIALECTS, POSTGRESQL_SEARCH_VECTOR, SEARCH_COLUMNS, SEARCH_TABLE, TABLE_NAME, get_dialect
+
+DEFAULT_LIMIT = 20
+
+RESULT_COLUMNS = ('id', 'phrase', 'meaning', 'categories')
+
+
+def search_terms(text: str) -> List[str]:
+    """Unique stems of a search string, in order of appearance."""
+    return list(dict.fromkeys(stem_words(text)))
+
+
+def match_expression(terms: List[str], dialect: str = 'mysql') -> str:
+    """
+    Build the full-text match string requiring every term.
+
+    The last term is matched as a prefix, since it may still be being typed.
+    Stems only contain word characters, so no operator escaping is needed.
+    """
+    name = get_dialect(dialect).name
+    *complete, last = terms
+    if name == 'mysql':
+        return ' '.join([f"+{term}" for term in complete] + [f"+{last}*"])
+    if name == 'sqlite':
+        return ' AND '.join([f'"{term}"' for term in complete] + [f'"{last}"*'])
+    return ' & '.join(list(complete) + [f"{last}:*"])
+
+
+def search_query(text: str, dialect: str = 'mysql', limit: int = DEFAULT_LIMIT,
+                 search_table: str = TABLE_NAME) -> Tuple[str, tuple]:
+    """
+    Return (sql, params) finding phrases that match `text`, best matches first.
+
+    `search_table` is the base table holding the search columns, when it is
+    not phraseological_dict itself (MySQL only; SQLite always has SEARCH_TABLE
+    and PostgreSQL expands the view onto the indexed expression).
+
+    Raises ValueError when `text` contains no searchable words.
+    """
+    terms = search_terms(text)
+    if not terms:
+        raise ValueError("Search text contains no words")
+    dialect = get_dialect(dialect)
+    match = match_expression(terms, dialect.name)
+    placeholder = dialect.placeholder
+    columns = ', '.join(f"d.{dialect.quote(column)}" for column in RESULT_COLUMNS)
+    table = dialect.quote(TABLE_NAME)
+
+    if dialect.name == 'mysql':
+        source, alias = f"{table} AS d", 'd'
+        if search_table != TABLE_NAME:
+            source, alias = f"{dialect.quote(search_table)} AS s JOIN {source} ON d.`id` = s.`id`", 's'
+        search_columns = ', '.join(f"{alias}.{dialect.quote(column)}" for column in SEARCH_COLUMNS)
+        against = f"MATCH ({search_columns}) AGAINST ({placeholder} IN BOOLEAN MODE)"
+        sql = (
+            f"SELECT {columns}, {against} AS score FROM {source} "
+            f"WHERE {against} ORDER BY score DESC LIMIT {int(limit)}"
+        )
+        return sql, (match, match)
+
+    if dialect.name == 'sqlite':
+        fts = dialect.quote(SEARCH_TABLE)
+        sql = (
+            f"SELECT {columns}, -f.rank AS score FROM {fts} AS f "
+            f"JOIN {table} AS d ON d.{dialect.quote('id')} = f.rowid "
+            f"WHERE {fts} MATCH {placeholder} ORDER BY f.rank LIMIT {int(limit)}"
+        )
+        return sql, (match,)
+
+    vector = POSTGRESQL_SEARCH_VECTOR
+    sql = (
+        f"SELECT {columns}, ts_rank({vector}, to_tsquery('simple', {placeholder})) AS score "
+        f"FROM {table} AS d WHERE {vector} @@ to_tsquery('simple', {placeholder}) "
+        f"ORDER BY score DESC LIMIT {int(limit)}"
+    )
+    return sql, (match, match)
+
+
+def search_sqlite(path: str, text: str, limit: int = DEFAULT_LIMIT) -> List[tuple]:
+    """Run a search against a SQLite dump file (see `--format sqlite`)."""
+    sql, params = search_query(text, 'sqlite', limit)
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(sql, params).fetchall()
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search phraseological units by stemmed words.")
+    parser.add_argument("text", help="search string, e.g. 'вода'")
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help="search this SQLite database; without it the SQL for --dialect is printed")
+    parser.add_argument("--dialect", choices=sorted(DIALECTS), default="mysql")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--search-table", default=TABLE_NAME,
+                        help="base table with the search columns: 'phrases' for the normalized layout (MySQL)")
+    args = parser.parse_args()
+
+    try:
+        if args.sqlite:
+            for row_id, phrase, meaning, category, score in search_sqlite(args.sqlite, args.text, args.limit):
+                print(f"{row_id:>5}  {phrase} — {meaning[:80]}")
+        else:
+            sql, params = search_query(args.text, args.dialect, args.limit, args.search_table)
+            print(sql)
+            print(params)
+    except ValueError as e:  # no searchable words in the text
+        parser.error(str(e))
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Memory-mappable binary snapshot of the phrase corpus.
+
+Parsing the pretty-printed JSON costs every process the full corpus in
+dicts before the first question can be served. A snapshot is the same data
+as a PhraseStore laid out in one file that is opened with `mmap`: nothing is
+decoded up front, each field is decoded from its UTF-8 bytes when it is
+read, and worker processes mapping the same file share its pages.
+
+Layout (all integers little-endian, sections 8-byte aligned):
+
+    header     magic b'PHRSNAP\\0', u16 version, u16 reserved,
+               u32 entry count, u32 section count, u32 reserved
+    directory  per section: 24-byte ASCII name, u64 offset, u64 length
+    sections   text:    u64 n, u64[n + 1] heap offsets, null bitmap, heap
+               codes:   u32[n] indexes into a dictionary's values section
+               offsets: u64[n + 1] item ranges (meanings)
+               json:    UTF-8 JSON (sparse extra fields, top-level document)
+               index:   u64 m, u32[m] open-addressing table of row + 1,
+                        keyed by BLAKE2b of the normalized phrase
+
+`Snapshot` offers the same read API as PhraseStore (`get`, indexing,
+iteration, `column`, `by_id`, `find`), so code reading a store can read a
+snapshot. Converting in both directions:
+
+    python3 phrase_snapshot.py to-snapshot table_phrases_improved.json
+    python3 phrase_snapshot.py to-json table_phrases_improved.snapshot restored.json
+    python3 phrase_snapshot.py info table_phrases_improved.snapshot
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from phrase_store import (
+    DICTIONARY_FIELDS,
+    LIST_FIELDS,
+    TEXT_FIELDS,
+    PhraseReader,
+    PhraseStore,
+    dump_json,
+    normalize_phrase,
+)
+
+MAGIC = b'PHRSNAP\0'
+VERSION = 1
+SNAPSHOT_SUFFIX = '.snapshot'
+
+HEADER = struct.Struct('<8sHHIII')
+DIRECTORY_ENTRY = struct.Struct('<24sQQ')
+EMPTY_SLOT = 0
+
+
+def snapshot_path(json_path: Union[str, Path]) -> Path:
+    """Default snapshot file next to a JSON corpus."""
+    return Path(json_path).with_suffix(SNAPSHOT_SUFFIX)
+
+
+def phrase_hash(normalized: str) -> int:
+    """Stable 64-bit hash of a normalized phrase (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _padding(size: int) -> bytes:
+    return b'\0' * (-size % 8)
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _text_section(values: Sequence[Optional[str]]) -> bytes:
+    offsets = array('Q', [0])
+    nulls = bytearray((len(values) + 7) // 8)
+    heap = bytearray()
+    for row, value in enumerate(values):
+        if value is None:
+            nulls[row >> 3] |= 1 << (row & 7)
+        else:
+            heap += value.encode('utf-8')
+        offsets.append(len(heap))
+    return struct.pack('<Q', len(values)) + _little_endian(offsets) + bytes(nulls) + _padding(len(nulls)) + bytes(heap)
+
+
+def _index_section(phrases: Sequence[Optional[str]]) -> bytes:
+    size = 8
+    while size < 2 * len(phrases):
+        size *= 2
+    slots = array('I', [EMPTY_SLOT]) * size
+    for row, phrase in enumerate(phrases):
+        slot = phrase_hash(normalize_phrase(phrase or '')) & (size - 1)
+        while slots[slot] != EMPTY_SLOT:
+            slot = (slot + 1) & (size - 1)
+        slots[slot] = row + 1
+    return struct.pack('<Q', size) + _little_endian(slots)
+
+
+def snapshot_sections(store: PhraseStore) -> List[Tuple[str, bytes]]:
+    """Serialize a store into named snapshot sections."""
+    rows = range(len(store))
+    sections = []
+    for field in TEXT_FIELDS:
+        sections.append((field, _text_section([store.columns[field][row] for row in rows])))
+    for field in LIST_FIELDS:
+        column = store.columns[field]
+        offsets = array('Q', [0])
+        items = []
+        for row in rows:
+            items.extend(column[row])
+            offsets.append(len(items))
+        sections.append((f'{field}.items', _text_section(items)))
+        sections.append((f'{field}.rows', _little_endian(offsets)))
+    for field, column in [(field, store.columns[field]) for field in DICTIONARY_FIELDS] + [('shapes', store.shapes)]:
+        values = column.values if field != 'shapes' else [json.dumps(shape, ensure_ascii=False) for shape in column.values]
+        sections.append((f'{field}.values', _text_section(values)))
+        sections.append((f'{field}.codes', _little_endian(array('I', column.rows))))
+    extras = {str(row): fields for row, fields in store.extras.items()}
+    sections.append(('extras', json.dumps(extras, ensure_ascii=False).encode('utf-8')))
+    sections.append(('document', json.dumps(store.document, ensure_ascii=False).encode('utf-8')))
+    sections.append(('index', _index_section([store.columns['phrase'][row] for row in rows])))
+    return sections
+
+
+def write_snapshot(phrases: Union[PhraseStore, Iterable[Dict]], path: Union[str, Path],
+                   document: Optional[Dict] = None) -> Path:
+    """Write a snapshot of a PhraseStore (or of plain entries) and return its path."""
+    store = phrases if isinstance(phrases, PhraseStore) else PhraseStore(phrases)
+    if document is not None:
+        store = PhraseStore(store, document)
+    sections = snapshot_sections(store)
+
+    offset = HEADER.size + DIRECTORY_ENTRY.size * len(sections)
+    offset += len(_padding(offset))
+    directory = []
+    for name, data in sections:
+        if len(name) > 24:
+            raise ValueError(f"Section name too long: {name!r}")
+        directory.append(DIRECTORY_ENTRY.pack(name.encode('ascii'), offset, len(data)))
+        offset += len(data) + len(_padding(len(data)))
+
+    path = Path(path)
+    temporary = path.with_name(path.name + '.tmp')
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(store), len(sections), 0))
+        f.write(b''.join(directory))
+        f.write(_padding(f.tell()))
+        for _, data in sections:
+            f.write(data)
+            f.write(_padding(len(data)))
+    temporary.replace(path)  # readers never map a half-written file
+    return path
+
+
+class _TextSection:
+    """Lazily decoded strings of a text section."""
+
+    __slots__ = ('offsets', 'nulls', 'heap')
+
+    def __init__(self, snapshot: 'Snapshot', view: memoryview):
+        count = struct.unpack_from('<Q', view)[0]
+        end = 8 + 8 * (count + 1)
+        self.offsets = snapshot._integers(snapshot._view(view[8:end]), 'Q')
+        null_bytes = (count + 7) // 8
+        self.nulls = snapshot._view(view[end:end + null_bytes])
+        self.heap = snapshot._view(view[end + null_bytes + len(_padding(null_bytes)):])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        if self.nulls[row >> 3] >> (row & 7) & 1:
+            return None
+        return str(self.heap[self.offsets[row]:self.offsets[row + 1]], 'utf-8')
+
+
+class _ListSection:
+    """Per-row lists of strings: item ranges over a text section."""
+
+    __slots__ = ('items', 'offsets')
+
+    def __init__(self, items: _TextSection, offsets):
+        self.items = items
+        self.offsets = offsets
+
+    def __getitem__(self, row: int) -> List[str]:
+        return [self.items[item] for item in range(self.offsets[row], self.offsets[row + 1])]
+
+
+class _DictionarySection:
+    """Dictionary-encoded values; the (small) value list is decoded once on first use."""
+
+    __slots__ = ('encoded', 'codes', 'decode', '_values')
+
+    def __init__(self, values: _TextSection, codes, decode=None):
+        self.encoded = values
+        self.codes = codes
+        self.decode = decode
+        self._values = None
+
+    @property
+    def values(self) -> List[Any]:
+        if self._values is None:
+            values = [self.encoded[code] for code in range(len(self.encoded))]
+            self._values = [self.decode(value) for value in values] if self.decode else values
+        return self._values
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> Any:
+        return self.values[self.codes[row]]
+
+
+class Snapshot(PhraseReader):
+    """
+    Read-only, memory-mapped phrase corpus with the PhraseStore read API.
+
+    Opening only parses the header and section directory; use as a context
+    manager (or call `close`) to unmap the file.
+    """
+
+    __slots__ = ('path', 'count', 'sections', 'columns', 'shapes', '_file', '_map', '_views',
+                 '_extras', '_document', '_index_size', '_index')
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views: List[memoryview] = []
+        self._extras = self._document = None
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{self.path}: not a phrase snapshot (file too short)")
+        magic, version, _, self.count, section_count, _ = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: not a phrase snapshot")
+        if version != VERSION:
+            raise ValueError(f"{self.path}: unsupported snapshot version {version} (expected {VERSION})")
+        root = self._view(memoryview(self._map))
+        self.sections: Dict[str, memoryview] = {}
+        for i in range(section_count):
+            name, offset, length = DIRECTORY_ENTRY.unpack_from(self._map, HEADER.size + i * DIRECTORY_ENTRY.size)
+            self.sections[name.rstrip(b'\0').decode('ascii')] = self._view(root[offset:offset + length])
+
+        self.columns = {field: _TextSection(self, self.sections[field]) for field in TEXT_FIELDS}
+        for field in LIST_FIELDS:
+            self.columns[field] = _ListSection(_TextSection(self, self.sections[f'{field}.items']),
+                                               self._integers(self.sections[f'{field}.rows'], 'Q'))
+        for field in DICTIONARY_FIELDS:
+            self.columns[field] = self._dictionary(field)
+        self.shapes = self._dictionary('shapes', lambda shape: tuple(json.loads(shape)))
+        index = self.sections['index']
+        self._index_size = struct.unpack_from('<Q', index)[0]
+        self._index = self._integers(self._view(index[8:]), 'I')
+
+    def _view(self, view: memoryview) -> memoryview:
+        """Track a view of the map; all of them must be released before it can be closed."""
+        self._views.append(view)
+        return view
+
+    def _integers(self, view: memoryview, typecode: str):
+        """Little-endian integer array over `view`: zero-copy on little-endian hosts."""
+        if sys.byteorder == 'little':
+            return self._view(view.cast(typecode))
+        values = array(typecode, bytes(view))
+        values.byteswap()
+        return values
+
+    def _dictionary(self, field: str, decode=None) -> _DictionarySection:
+        return _DictionarySection(_TextSection(self, self.sections[f'{field}.values']),
+                                  self._integers(self.sections[f'{field}.codes'], 'I'), decode)
+
+    def _json(self, section: str) -> Any:
+        return json.loads(str(self.sections[section], 'utf-8'))
+
+    @property
+    def extras(self) -> Dict[int, Dict[str, Any]]:
+        if self._extras is None:
+            self._extras = {int(row): fields for row, fields in self._json('extras').items()}
+        return self._extras
+
+    @property
+    def document(self) -> Dict[str, Any]:
+        if self._document is None:
+            self._document = self._json('document')
+        return self._document
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _candidates(self, normalized: str) -> Iterable[int]:
+        mask = self._index_size - 1
+        slot = phrase_hash(normalized) & mask
+        while self._index[slot] != EMPTY_SLOT:
+            yield self._index[slot] - 1
+            slot = (slot + 1) & mask
+
+    def to_store(self) -> PhraseStore:
+        """Decode everything into an editable PhraseStore."""
+        return PhraseStore(self, self.document)
+
+    def save_json(self, path: Union[str, Path]) -> None:
+        """Write the JSON layout the snapshot was made from."""
+        dump_json(path, self, self.document)
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def json_to_snapshot(json_path: Union[str, Path], path: Optional[Union[str, Path]] = None) -> Path:
+    """Convert a JSON corpus to a snapshot (next to it by default)."""
+    return write_snapshot(PhraseStore.load(json_path), path or snapshot_path(json_path))
+
+
+def snapshot_to_json(path: Union[str, Path], json_path: Union[str, Path]) -> None:
+    """Convert a snapshot back to the JSON corpus layout."""
+    with Snapshot(path) as snapshot:
+        snapshot.save_json(json_path)
+
+
+def print_info(path: Union[str, Path], json_path: Optional[Union[str, Path]] = None) -> None:
+    """Print the section table and compare cold-start time with parsing the JSON."""
+    started = time.perf_counter()
+    with Snapshot(path) as snapshot:
+        first = snapshot[0]['phrase'] if len(snapshot) else None
+        opened = time.perf_counter() - started
+        print(f"{snapshot.path}: version {VERSION}, {len(snapshot)} entries")
+        for name, view in snapshot.sections.items():
+            print(f"  {name:<20} {len(view):>10} bytes")
+    print(f"Open + first entry: {opened * 1000:.2f} ms ({first!r})")
+    if json_path:
+        started = time.perf_counter()
+        with open(json_path, 'r', encoding='utf-8') as f:
+            json.load(f)
+        print(f"json.load of {json_path}: {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert between the JSON corpus and binary snapshots.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    to_snapshot = subparsers.add_parser("to-snapshot", help="write a snapshot of a JSON corpus")
+    to_snapshot.add_argument("json_file")
+    to_snapshot.add_argument("snapshot", nargs='?', help=f"output path (default: JSON path with {SNAPSHOT_SUFFIX})")
+    to_json = subparsers.add_parser("to-json", help="write the JSON corpus back from a snapshot")
+    to_json.add_argument("snapshot")
+    to_json.add_argument("json_file")
+    info = subparsers.add_parser("info", help="show sections and cold-start time")
+    info.add_argument("snapshot")
+    info.add_argument("--json", metavar="PATH", help="also time json.load of this file")
+    args = parser.parse_args()
+
+    if args.command == "to-snapshot":
+        output = json_to_snapshot(args.json_file, args.snapshot)
+        print(f"💾 Snapshot saved to {output} ({output.stat().st_size / 1024:.1f} KB)")
+    elif args.command == "to-json":
+        snapshot_to_json(args.snapshot, args.json_file)
+        print(f"💾 JSON saved to {args.json_file}")
+    else:
+        print_info(args.snapshot, args.json)
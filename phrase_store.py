@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Compact in-process store for the phrase corpus.
+
+`json.load` turns every entry into a dict with its own copies of strings that
+are mostly identical across rows: all entries share one ~330 character
+Wiktionary `source_url` and `category` takes a couple of dozen values. A
+million entries then cost gigabytes in worker processes. `PhraseStore` keeps
+the same data column by column instead:
+
+- text fields (`phrase`, `etymology`, `usage_example`) live in one UTF-8
+  heap per column, addressed by (start, length) offset arrays;
+- `meanings` is a text column of all meanings plus per-row item ranges;
+- `category` and `source_url` are dictionary-encoded: one copy of each
+  distinct value and an array of codes;
+- the key order of each entry is dictionary-encoded as well, so entries come
+  back exactly as loaded (missing keys stay missing) and `save` writes the
+  same JSON as `json.dump`.
+
+Entries are returned as fresh dicts, so code written for `data['phrases']`
+keeps working for reading; writes go through `set`. Lookups by SQL id
+(1-based position, as in the dumps) and by normalized phrase are O(1).
+
+    python3 phrase_store.py table_phrases_improved.json --scale 100
+
+compares memory against the plain `json.load` list of dicts.
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+TEXT_FIELDS = ('phrase', 'etymology', 'usage_example')
+LIST_FIELDS = ('meanings',)
+DICTIONARY_FIELDS = ('category', 'source_url')
+FIELDS = TEXT_FIELDS + LIST_FIELDS + DICTIONARY_FIELDS
+
+
+class TextColumn:
+    """Strings in a UTF-8 heap addressed by per-row start offsets and byte lengths."""
+
+    __slots__ = ('heap', 'starts', 'sizes', 'nulls')
+
+    def __init__(self):
+        self.heap = bytearray()
+        self.starts = array('Q')
+        self.sizes = array('I')
+        self.nulls = set()  # rows holding None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _store(self, value: Optional[str]) -> Tuple[int, int]:
+        if value is None:
+            return 0, 0
+        encoded = value.encode('utf-8')
+        start = len(self.heap)
+        self.heap += encoded
+        return start, len(encoded)
+
+    def append(self, value: Optional[str]) -> None:
+        start, size = self._store(value)
+        if value is None:
+            self.nulls.add(len(self.starts))
+        self.starts.append(start)
+        self.sizes.append(size)
+
+    def __getitem__(self, row: int) -> Optional[str]:
+        if row in self.nulls:
+            return None
+        start = self.starts[row]
+        return self.heap[start:start + self.sizes[row]].decode('utf-8')
+
+    def __setitem__(self, row: int, value: Optional[str]) -> None:
+        """Replace a value; the old bytes stay in the heap until `compact`."""
+        self.starts[row], self.sizes[row] = self._store(value)
+        if value is None:
+            self.nulls.add(row)
+        else:
+            self.nulls.discard(row)
+
+    def compact(self) -> None:
+        """Rewrite the heap without bytes orphaned by `__setitem__`."""
+        heap = bytearray()
+        for row in range(len(self.starts)):
+            start, size = self.starts[row], self.sizes[row]
+            self.starts[row] = len(heap)
+            heap += self.heap[start:start + size]
+        self.heap = heap
+
+    def nbytes(self) -> int:
+        return (sys.getsizeof(self.heap) + sys.getsizeof(self.starts) + sys.getsizeof(self.sizes)
+                + sys.getsizeof(self.nulls))
+
+
+class ListColumn:
+    """Lists of strings: one text column of items plus each row's first item and count."""
+
+    __slots__ = ('items', 'firsts', 'counts')
+
+    def __init__(self):
+        self.items = TextColumn()
+        self.firsts = array('Q')
+        self.counts = array('I')
+
+    def __len__(self) -> int:
+        return len(self.firsts)
+
+    def _store(self, values: Sequence[str]) -> Tuple[int, int]:
+        first = len(self.items)
+        for value in values:
+            self.items.append(value)
+        return first, len(values)
+
+    def append(self, values: Sequence[str]) -> None:
+        first, count = self._store(values)
+        self.firsts.append(first)
+        self.counts.append(count)
+
+    def __getitem__(self, row: int) -> List[str]:
+        first = self.firsts[row]
+        return [self.items[item] for item in range(first, first + self.counts[row])]
+
+    def __setitem__(self, row: int, values: Sequence[str]) -> None:
+        self.firsts[row], self.counts[row] = self._store(values)
+
+    def compact(self) -> None:
+        rows = [self[row] for row in range(len(self))]
+        self.items = TextColumn()
+        for row, values in enumerate(rows):
+            self.firsts[row], self.counts[row] = self._store(values)
+
+    def nbytes(self) -> int:
+        return self.items.nbytes() + sys.getsizeof(self.firsts) + sys.getsizeof(self.counts)
+
+
+class DictionaryColumn:
+    """Dictionary-encoded values: each distinct value once, rows hold codes."""
+
+    __slots__ = ('values', 'codes', 'rows')
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.codes: Dict[Any, int] = {}
+        self.rows = array('I')
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def encode(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: Any) -> None:
+        self.rows.append(self.encode(value))
+
+    def __getitem__(self, row: int) -> Any:
+        return self.values[self.rows[row]]
+
+    def __setitem__(self, row: int, value: Any) -> None:
+        self.rows[row] = self.encode(value)
+
+    def compact(self) -> None:
+        pass
+
+    def nbytes(self) -> int:
+        return (sys.getsizeof(self.values) + sum(sys.getsizeof(value) for value in self.values)
+                + sys.getsizeof(self.codes) + sys.getsizeof(self.rows))
+
+
+def normalize_phrase(phrase: str) -> str:
+    """Нормализуем фразу: удаляем лишние пробелы и приводим к нижнему регистру."""
+    return " ".join(phrase.lower().strip().split())
+
+
+def _fits(field: str, value: Any) -> bool:
+    """Whether `value` has the type the column for `field` stores."""
+    if field in TEXT_FIELDS:
+        return value is None or isinstance(value, str)
+    if field in LIST_FIELDS:
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    return isinstance(value, str) or value is None
+
+
+class PhraseReader:
+    """
+    Read access shared by PhraseStore and phrase_snapshot.Snapshot.
+
+    Subclasses provide `columns` (field -> per-row indexable column),
+    `shapes` (per-row key tuples), `extras` (row -> sparse extra fields) and
+    `_candidates` for the normalized phrase index.
+    """
+
+    __slots__ = ()
+
+    def __len__(self) -> int:
+        return len(self.shapes)
+
+    def get(self, row: int, field: str, default: Any = None) -> Any:
+        """One field of the entry at `row`, like `entry.get(field, default)`."""
+        if field not in self.shapes[row]:
+            return default
+        extras = self.extras.get(row)
+        if extras and field in extras:
+            return extras[field]
+        return self.columns[field][row]
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(f'{type(self).__name__} index out of range')
+        extras = self.extras.get(row, {})
+        return {
+            key: extras[key] if key in extras else self.columns[key][row]
+            for key in self.shapes[row]
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def column(self, field: str) -> Iterator[Any]:
+        """Values of one field for every entry (None where the key is missing)."""
+        for row in range(len(self)):
+            yield self.get(row, field)
+
+    def by_id(self, row_id: int) -> Dict[str, Any]:
+        """Entry with the given dump id (1-based position)."""
+        if row_id < 1:
+            raise IndexError(f'No phrase with id {row_id}')
+        return self[row_id - 1]
+
+    def find_all(self, phrase: str) -> List[int]:
+        """Positions of all entries whose normalized phrase equals that of `phrase`."""
+        normalized = normalize_phrase(phrase)
+        return [row for row in self._candidates(normalized)
+                if normalize_phrase(self.columns['phrase'][row] or '') == normalized]
+
+    def _candidates(self, normalized: str) -> Iterable[int]:
+        """Positions that may hold `normalized`; find_all checks each one."""
+        raise NotImplementedError
+
+    def find(self, phrase: str) -> Optional[int]:
+        """Position of the first entry matching `phrase` after normalization, or None."""
+        rows = self.find_all(phrase)
+        return rows[0] if rows else None
+
+
+class PhraseStore(PhraseReader):
+    """
+    Columnar phrase corpus with dict-compatible entries.
+
+    Positions are 0-based like a list; `by_id` uses the dumps' 1-based ids.
+    Fields outside FIELDS (or with unexpected types) are kept per entry in a
+    sparse side table, so any JSON entry round-trips unchanged.
+    """
+
+    __slots__ = ('columns', 'shapes', 'extras', 'document', '_index')
+
+    def __init__(self, phrases: Iterable[Dict] = (), document: Optional[Dict] = None):
+        self.columns = {field: self._new_column(field) for field in FIELDS}
+        self.shapes = DictionaryColumn()  # key order of each entry
+        self.extras: Dict[int, Dict[str, Any]] = {}
+        self.document = dict(document or {})  # top-level keys besides 'phrases'
+        self._index: Dict[int, Union[int, Tuple[int, ...]]] = {}  # hash(normalized phrase) -> rows
+        for entry in phrases:
+            self.append(entry)
+
+    @staticmethod
+    def _new_column(field: str):
+        if field in TEXT_FIELDS:
+            return TextColumn()
+        if field in LIST_FIELDS:
+            return ListColumn()
+        return DictionaryColumn()
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'PhraseStore':
+        """Load a `{"phrases": [...], ...}` JSON file; other top-level keys go to `document`."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_document(json.load(f))
+
+    @classmethod
+    def from_document(cls, data: Dict) -> 'PhraseStore':
+        """Build a store from a parsed JSON document, consuming its 'phrases' list."""
+        phrases = data.pop('phrases', [])
+        store = cls(document=data)
+        for i in range(len(phrases)):
+            store.append(phrases[i])
+            phrases[i] = None  # let each dict go as soon as it is encoded
+        return store
+
+    # -- building -------------------------------------------------------------
+
+    def append(self, entry: Dict) -> int:
+        """Add an entry and return its position."""
+        row = len(self)
+        extras = {}
+        for field in FIELDS:
+            value = entry.get(field)
+            if field in entry and not _fits(field, value):
+                extras[field] = value
+                value = None
+            self.columns[field].append(value if value is not None or field not in LIST_FIELDS else [])
+        for key, value in entry.items():
+            if key not in self.columns:
+                extras[key] = value
+        if extras:
+            self.extras[row] = extras
+        self.shapes.append(tuple(entry))
+        self._add_to_index(row, entry.get('phrase'))
+        return row
+
+    def _add_to_index(self, row: int, phrase: Optional[str]) -> None:
+        key = hash(normalize_phrase(phrase or ''))
+        rows = self._index.get(key)
+        if rows is None:
+            self._index[key] = row
+        else:
+            self._index[key] = (rows if isinstance(rows, tuple) else (rows,)) + (row,)
+
+    def _candidates(self, normalized: str) -> Iterable[int]:
+        rows = self._index.get(hash(normalized))
+        if rows is None:
+            return ()
+        return rows if isinstance(rows, tuple) else (rows,)
+
+    def _remove_from_index(self, row: int, phrase: Optional[str]) -> None:
+        key = hash(normalize_phrase(phrase or ''))
+        rows = self._index.get(key)
+        if rows == row:
+            del self._index[key]
+        elif isinstance(rows, tuple):
+            remaining = tuple(other for other in rows if other != row)
+            self._index[key] = remaining if len(remaining) > 1 else remaining[0]
+
+    # -- updating -------------------------------------------------------------
+
+    def set(self, row: int, field: str, value: Any) -> None:
+        """Set one field of the entry at `row`, adding the key at the end if it is new."""
+        shape = self.shapes[row]
+        if field not in shape:
+            self.shapes[row] = shape + (field,)
+        if field == 'phrase':
+            self._remove_from_index(row, self.columns['phrase'][row])
+        extras = self.extras.get(row)
+        if field in self.columns and _fits(field, value):
+            if extras and field in extras:
+                del extras[field]
+                if not extras:
+                    del self.extras[row]
+            self.columns[field][row] = value
+        else:
+            self.extras.setdefault(row, {})[field] = value
+        if field == 'phrase':
+            self._add_to_index(row, value if isinstance(value, str) else None)
+
+    def compact(self) -> None:
+        """Drop heap bytes left behind by `set`."""
+        for column in self.columns.values():
+            column.compact()
+
+    # -- saving ---------------------------------------------------------------
+
+    def save(self, path: Union[str, Path], document: Optional[Dict] = None) -> None:
+        """Write the corpus as JSON; `document` defaults to the top-level keys loaded."""
+        dump_json(path, self, self.document if document is None else document)
+
+    def nbytes(self) -> int:
+        """Approximate size of the store's own buffers, excluding the phrase index."""
+        return (sum(column.nbytes() for column in self.columns.values()) + self.shapes.nbytes()
+                + sys.getsizeof(self.extras))
+
+
+def dump_json(path: Union[str, Path], phrases: Iterable[Dict], document: Dict) -> int:
+    """
+    Write `{"phrases": [...], **document}` exactly as `json.dump(..., indent=2)` would.
+
+    Entries are serialized one at a time, so a store, a snapshot or a
+    generator is saved without materializing the whole list of dicts.
+    Returns the number of entries written.
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "phrases": [')
+        for entry in phrases:
+            f.write(',\n    ' if count else '\n    ')
+            f.write(json.dumps(entry, ensure_ascii=False, indent=2).replace('\n', '\n    '))
+            count += 1
+        if count:
+            f.write('\n  ')
+        f.write(']')
+        for key, value in document.items():
+            f.write(f',\n  {json.dumps(key, ensure_ascii=False)}: ')
+            f.write(json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+        f.write('\n}')
+    return count
+
+
+def iter_json_phrases(path: Union[str, Path], chunk_size: int = 1 << 20) -> Iterator[Dict]:
+    """
+    Yield the entries of a `{"phrases": [...]}` file one by one.
+
+    The file is read in chunks of `chunk_size` characters and each entry is
+    decoded as soon as it is complete, so memory stays at about one chunk
+    plus one entry whatever the file size. Other top-level keys are skipped.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        position = 0
+        eof = False
+
+        def token(what: str) -> str:
+            """Skip whitespace and return the next character, reading more input as needed."""
+            nonlocal buffer, position, eof
+            while True:
+                while position < len(buffer) and buffer[position] in ' \t\r\n':
+                    position += 1
+                if position < len(buffer):
+                    return buffer[position]
+                if eof:
+                    raise ValueError(f"{path}: unexpected end of file, expected {what}")
+                buffer, position = f.read(chunk_size), 0
+                eof = not buffer
+
+        def value() -> Any:
+            """Decode the JSON value at `position`, reading more input until it is complete."""
+            nonlocal buffer, position, eof
+            token('a value')
+            while True:
+                try:
+                    result, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    end = -1
+                # A number cut by the chunk boundary ("2." of "2.5") still decodes: accept
+                # values only once a delimiter follows them or the input has ended
+                if end >= 0 and (eof or end < len(buffer) and buffer[end] in ' \t\r\n,]}:'):
+                    position = end
+                    return result
+                more = f.read(chunk_size) if not eof else ''
+                if not more:
+                    eof = True
+                    if end < 0:
+                        raise ValueError(f"{path}: invalid JSON near {buffer[position:position + 40]!r}")
+                    continue
+                buffer, position = buffer[position:] + more, 0
+
+        if token("'{'") != '{':
+            raise ValueError(f"{path}: expected a JSON object")
+        position += 1
+        while token('a key or "}"') != '}':
+            key = value()
+            if token("':'") != ':':
+                raise ValueError(f"{path}: expected ':' after {key!r}")
+            position += 1
+            if key != 'phrases':
+                value()
+            else:
+                if token("'['") != '[':
+                    raise ValueError(f"{path}: 'phrases' is not a list")
+                position += 1
+                while token('an entry or "]"') != ']':
+                    yield value()
+                    if token("',' or ']'") == ',':
+                        position += 1
+                position += 1
+            if token("',' or '}'") == ',':
+                position += 1
+
+
+def scaled_phrases(phrases: Sequence[Dict], scale: int) -> Iterator[Dict]:
+    """Repeat the corpus `scale` times with distinct phrases, to simulate a large one."""
+    for copy in range(scale):
+        for entry in phrases:
+            yield dict(entry, phrase=f"{entry['phrase']} #{copy}") if copy else entry
+
+
+def measure_memory(path: Union[str, Path], scale: int = 1) -> Dict[str, int]:
+    """
+    Retained bytes of the corpus as a json.load-style list of dicts vs. a PhraseStore.
+
+    Both are built from the same serialized text, so the baseline has its own
+    string objects per entry just like `json.load` of a real file of that size.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        phrases = json.load(f)['phrases']
+    text = json.dumps({'phrases': list(scaled_phrases(phrases, scale))}, ensure_ascii=False)
+    del phrases
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        baseline = json.loads(text)['phrases']
+        baseline_bytes = tracemalloc.get_traced_memory()[0] - before
+        count = len(baseline)
+        del baseline
+
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        store = PhraseStore.from_document(json.loads(text))
+        store_bytes, store_peak = (value - before for value in tracemalloc.get_traced_memory())
+        del store
+    finally:
+        tracemalloc.stop()
+    return {
+        'entries': count,
+        'baseline_bytes': baseline_bytes,
+        'store_bytes': store_bytes,
+        'store_peak_bytes': store_peak,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare PhraseStore memory with json.load.")
+    parser.add_argument("json_file", nargs='?', default='table_phrases_improved.json')
+    parser.add_argument("--scale", type=int, default=1, help="repeat the corpus N times (default: 1)")
+    args = parser.parse_args()
+
+    result = measure_memory(args.json_file, args.scale)
+    mib = 1024 * 1024
+    print(f"Entries:               {result['entries']}")
+    print(f"json.load dicts/lists: {result['baseline_bytes'] / mib:8.1f} MiB")
+    print(f"PhraseStore:           {result['store_bytes'] / mib:8.1f} MiB "
+          f"({result['store_bytes'] / result['baseline_bytes']:.0%} of baseline)")
+    print(f"PhraseStore load peak: {result['store_peak_bytes'] / mib:8.1f} MiB (includes the parsed JSON)")
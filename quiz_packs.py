@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Precompute multiple-choice quiz items for the trainer.
+
+"Guess the meaning" and "guess the phrase" need plausible wrong answers.
+Picking them per request (same category, similar length, not a synonym of
+the right answer) costs several random queries per question, so this stage
+runs once after improve_examples.py and stores M items per phrase and mode
+in a `quiz_items` table keyed by (phrase_id, mode, item_no): serving a
+question is then one primary-key lookup with a random item_no.
+
+Distractors for a phrase:
+
+- come from the phrase's own categories, topped up from the whole corpus
+  when a category is too small;
+- have no duplicate texts among the choices (after normalization);
+- exclude near-synonyms: entries whose meaning shares at least
+  NEAR_SYNONYM_OVERLAP of its stems with the right meaning;
+- prefer similar length: they are drawn from the candidates closest in
+  length to the right answer.
+
+Each item uses its own seeded random stream, so the output does not depend
+on how the work is split across the process pool.
+
+Phrase ids are read from the dump manifest (see sql_dump.py) when there is
+one, since delta dumps keep ids fixed while the corpus positions move.
+
+    python3 quiz_packs.py --items 3 --dialect sqlite
+    python3 quiz_packs.py --sqlite phraseological_dict_final.sqlite
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from phrase_snapshot import Snapshot, snapshot_path
+from phrase_store import PhraseStore, normalize_phrase
+from russian_stemmer import stem_words
+from sql_dump import DIALECTS, Dialect, dialect_path, manifest_ids, manifest_path, write_dump
+from sql_layouts import Table, iter_tables_dump, split_categories
+
+DEFAULT_JSON = Path('table_phrases_improved.json')
+DEFAULT_DUMP = Path('phraseological_dict_final.sql')  # its manifest holds the database ids
+QUIZ_TABLE_NAME = 'quiz_items'
+MODES = ('guess-meaning', 'guess-phrase')
+DEFAULT_ITEMS = 3
+DISTRACTORS = 3
+NEAR_SYNONYM_OVERLAP = 0.5
+LENGTH_WINDOW = 4  # draw distractors from the DISTRACTORS * LENGTH_WINDOW closest lengths
+MAX_CANDIDATES = 256  # distractor candidates examined per phrase, bounds the work in big categories
+CHUNK_SIZE = 64
+
+QUIZ_TABLE = Table(
+    QUIZ_TABLE_NAME,
+    [
+        ('phrase_id', 'int', True),
+        ('mode', 'varchar100', True),
+        ('item_no', 'int', True),
+        ('prompt', 'text', True),
+        ('choices', 'text', True),
+        ('answer', 'int', True),
+    ],
+    primary_key=('phrase_id', 'mode', 'item_no'),
+    comment='Готовые вопросы тренажёра с вариантами ответа',
+)
+
+
+class QuizEntry(NamedTuple):
+    row_id: int
+    phrase: str
+    meaning: str
+    categories: Tuple[str, ...]
+    stems: FrozenSet[str]  # stems of the meaning, for the near-synonym check
+
+
+def quiz_entries(phrases, ids: Optional[Dict[str, int]] = None) -> List[QuizEntry]:
+    """
+    Reduce entries (dicts, a store or a snapshot) to what distractor selection needs.
+
+    `ids` maps phrases to their database ids (sql_dump.manifest_ids); phrases
+    missing from it are not in the database and are left out. Without it the
+    1-based positions are used, the ids of a full dump.
+    """
+    entries = []
+    for position, entry in enumerate(phrases, 1):
+        row_id = position if ids is None else ids.get(entry['phrase'])
+        if row_id is None:
+            continue
+        meaning = '; '.join(entry.get('meanings') or [])
+        entries.append(QuizEntry(row_id, entry['phrase'], meaning,
+                                 tuple(split_categories(entry.get('category'))), frozenset(stem_words(meaning))))
+    return entries
+
+
+def load_corpus(source: Union[str, Path], manifest: Optional[Union[str, Path]] = None) -> List[QuizEntry]:
+    """Quiz entries from a snapshot (by suffix) or a JSON corpus, with ids from `manifest` if given."""
+    ids = manifest_ids(manifest) if manifest else None
+    if Path(source).suffix == snapshot_path(source).suffix:
+        with Snapshot(source) as snapshot:
+            return quiz_entries(snapshot, ids)
+    return quiz_entries(PhraseStore.load(source), ids)
+
+
+def near_synonym(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """Whether two meanings share at least NEAR_SYNONYM_OVERLAP of the smaller stem set."""
+    if not a or not b:
+        return False
+    return len(a & b) / min(len(a), len(b)) >= NEAR_SYNONYM_OVERLAP
+
+
+class QuizBuilder:
+    """Distractor selection over one corpus; one instance per worker process."""
+
+    def __init__(self, entries: Sequence[QuizEntry], seed: int = 0, items: int = DEFAULT_ITEMS):
+        self.entries = list(entries)
+        self.seed = seed
+        self.items = items
+        self.by_category: Dict[str, List[int]] = {}
+        for index, entry in enumerate(self.entries):
+            for name in entry.categories:
+                self.by_category.setdefault(name, []).append(index)
+
+    def _text(self, entry: QuizEntry, mode: str) -> str:
+        return entry.meaning if mode == 'guess-meaning' else entry.phrase
+
+    def _candidates(self, index: int, mode: str) -> List[int]:
+        """
+        Indexes of usable distractors for entry `index`, same categories first.
+
+        Each pool is scanned from a seeded random offset and the scan stops
+        after MAX_CANDIDATES, so big categories do not favour their first
+        entries or cost a full pass per phrase.
+        """
+        target = self.entries[index]
+        answer_key = normalize_phrase(self._text(target, mode))
+        pools = [sorted({i for name in target.categories for i in self.by_category[name]}),
+                 range(len(self.entries))]
+        rng = random.Random(f"{self.seed}:{target.row_id}:{mode}")
+        seen = {answer_key}
+        candidates: List[int] = []
+        for pool in pools:
+            start = rng.randrange(len(pool)) if pool else 0
+            for i in itertools.chain(pool[start:], pool[:start]):
+                if len(candidates) >= MAX_CANDIDATES:
+                    break
+                entry = self.entries[i]
+                key = normalize_phrase(self._text(entry, mode))
+                if i == index or key in seen or not key or near_synonym(entry.stems, target.stems):
+                    continue
+                seen.add(key)
+                candidates.append(i)
+            if len(candidates) >= DISTRACTORS * LENGTH_WINDOW:
+                break
+        return candidates
+
+    def item(self, index: int, mode: str, item_no: int, candidates: List[int]) -> Tuple:
+        """One quiz_items row: the answer shuffled among distractors of similar length."""
+        target = self.entries[index]
+        answer = self._text(target, mode)
+        rng = random.Random(f"{self.seed}:{target.row_id}:{mode}:{item_no}")
+        # Shuffle before the stable sort so equally close candidates are drawn at random
+        order = list(candidates)
+        rng.shuffle(order)
+        order.sort(key=lambda i: abs(len(self._text(self.entries[i], mode)) - len(answer)))
+        window = order[:DISTRACTORS * LENGTH_WINDOW]
+        choices = [self._text(self.entries[i], mode) for i in rng.sample(window, min(DISTRACTORS, len(window)))]
+        position = rng.randrange(len(choices) + 1)
+        choices.insert(position, answer)
+        prompt = target.phrase if mode == 'guess-meaning' else target.meaning
+        return (target.row_id, mode, item_no, prompt, json_list(choices), position)
+
+    def rows(self, indexes: Sequence[int]) -> List[Tuple]:
+        rows = []
+        for index in indexes:
+            for mode in MODES:
+                candidates = self._candidates(index, mode)
+                rows.extend(self.item(index, mode, item_no, candidates) for item_no in range(1, self.items + 1))
+        return rows
+
+
+def json_list(values: Sequence[str]) -> str:
+    """Choices as a compact JSON array (readable with JSON_EXTRACT / json_each / ::jsonb)."""
+    return json.dumps(list(values), ensure_ascii=False, separators=(',', ':'))
+
+
+_builder: Optional[QuizBuilder] = None
+
+
+def _init_worker(source: str, seed: int, items: int, manifest: Optional[str]) -> None:
+    global _builder
+    _builder = QuizBuilder(load_corpus(source, manifest), seed, items)
+
+
+def _build_chunk(indexes: Sequence[int]) -> List[Tuple]:
+    return _builder.rows(indexes)
+
+
+def build_quiz_rows(source: Union[str, Path], seed: int = 0, items: int = DEFAULT_ITEMS,
+                    workers: Optional[int] = None, manifest: Optional[Union[str, Path]] = None) -> List[Tuple]:
+    """
+    quiz_items rows for every phrase and mode, in phrase order.
+
+    Each worker loads `source` itself (a snapshot is mapped, not copied);
+    with `workers=1` everything runs in this process.
+    """
+    source = str(source)
+    manifest = str(manifest) if manifest else None
+    if workers == 1:
+        builder = QuizBuilder(load_corpus(source, manifest), seed, items)
+        return builder.rows(range(len(builder.entries)))
+    count = len(load_corpus(source, manifest))
+    chunks = [range(start, min(start + CHUNK_SIZE, count)) for start in range(0, count, CHUNK_SIZE)]
+    rows: List[Tuple] = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(source, seed, items, manifest)) as pool:
+        for chunk_rows in pool.map(_build_chunk, chunks):
+            rows.extend(chunk_rows)
+    return rows
+
+
+def iter_quiz_dump(rows: Sequence[Tuple], comment_lines: Sequence[str] = (),
+                   dialect: Union[str, Dialect] = 'mysql', batch_bytes: Optional[int] = None):
+    """Yield a dump that (re)creates and fills the quiz_items table."""
+    return iter_tables_dump(QUIZ_TABLE_NAME, [QUIZ_TABLE], {QUIZ_TABLE_NAME: rows}, [], None,
+                            comment_lines, dialect, batch_bytes)
+
+
+def load_sqlite(path: Union[str, Path], rows: Sequence[Tuple]) -> None:
+    """Replace the quiz_items table of an SQLite database (e.g. a --format sqlite dump)."""
+    connection = sqlite3.connect(path)
+    try:
+        connection.executescript('\n'.join(iter_quiz_dump(rows, dialect='sqlite')))
+    finally:
+        connection.close()
+
+
+def main(source: Union[str, Path] = DEFAULT_JSON, output: Union[str, Path] = 'quiz_items.sql',
+         dialect: str = 'mysql', items: int = DEFAULT_ITEMS, seed: int = 0, workers: Optional[int] = None,
+         batch_bytes: Optional[int] = None, compression: Optional[str] = None,
+         sqlite: Optional[str] = None, manifest: Optional[str] = None) -> None:
+    if Path(source) == DEFAULT_JSON and snapshot_path(DEFAULT_JSON).exists():
+        source = snapshot_path(DEFAULT_JSON)
+    if manifest is None:
+        default_manifest = manifest_path(dialect_path(DEFAULT_DUMP, 'sqlite' if sqlite else dialect))
+        manifest = default_manifest if default_manifest.exists() else None
+    print(f"📂 Building {items} items per phrase and mode from {source} ({workers or os.cpu_count()} workers)...")
+    print(f"🔑 Phrase ids from {manifest}" if manifest else "🔑 Phrase ids: corpus positions (no dump manifest)")
+    rows = build_quiz_rows(source, seed, items, workers, manifest)
+    if sqlite:
+        load_sqlite(sqlite, rows)
+        print(f"💾 {len(rows)} quiz items loaded into {sqlite}")
+        return
+    comment_lines = [f"-- Quiz items: {len(rows)} ({items} per phrase and mode, seed {seed})"]
+    path = write_dump(dialect_path(output, dialect), iter_quiz_dump(rows, comment_lines, dialect, batch_bytes),
+                      compression)
+    print(f"💾 {len(rows)} quiz items saved to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute multiple-choice quiz items.")
+    parser.add_argument("--source", default=str(DEFAULT_JSON),
+                        help="JSON corpus or .snapshot (default: the improved corpus, its snapshot if present)")
+    parser.add_argument("--output", default="quiz_items.sql")
+    parser.add_argument("--dialect", choices=sorted(DIALECTS), default="mysql")
+    parser.add_argument("--items", type=int, default=DEFAULT_ITEMS, help="items per phrase and mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--batch-bytes", type=int, default=None)
+    parser.add_argument("--compress", choices=("gzip", "zstd"), default=None)
+    parser.add_argument("--sqlite", metavar="PATH", help="load into this SQLite database instead of writing a dump")
+    parser.add_argument("--manifest", metavar="PATH", default=None,
+                        help="dump manifest with the database ids (default: the phraseological_dict_final one, if any)")
+    args = parser.parse_args()
+    main(args.source, args.output, args.dialect, args.items, args.seed, args.workers,
+         args.batch_bytes, args.compress, args.sqlite, args.manifest)
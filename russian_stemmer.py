@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Offline Russian stemmer (Snowball "russian" algorithm) and text normalization.
+
+Bundled so that dump generation and search never need network access or
+third-party packages. Text is lower-cased, `ё` is folded to `е`, and
+punctuation is replaced by spaces before each word is stemmed, so
+"Воду", "воды" and "вода!" all map to the stem "вод".
+
+The algorithm follows http://snowball.tartarus.org/algorithms/russian/stemmer.html:
+endings are only removed inside RV (the part of the word after its first
+vowel), derivational endings only inside R2.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+VOWELS = 'аеиоуыэюя'
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def _by_length(*endings: str) -> tuple:
+    """Endings ordered longest first, so the longest match wins as in Snowball `among`."""
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+# Endings of group 1 must follow а or я, which stays in the word
+PERFECTIVE_GERUND_1 = _by_length('в', 'вши', 'вшись')
+PERFECTIVE_GERUND_2 = _by_length('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись')
+ADJECTIVE = _by_length(
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+    'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE_1 = _by_length('ем', 'нн', 'вш', 'ющ', 'щ')
+PARTICIPLE_2 = _by_length('ивш', 'ывш', 'ующ')
+REFLEXIVE = _by_length('ся', 'сь')
+VERB_1 = _by_length('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'ешь', 'нно')
+VERB_2 = _by_length(
+    'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен',
+    'ило', 'ыло', 'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+)
+NOUN = _by_length(
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и', 'ией', 'ей', 'ой', 'ий', 'й',
+    'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+)
+SUPERLATIVE = _by_length('ейш', 'ейше')
+DERIVATIONAL = _by_length('ост', 'ость')
+
+
+def _strip_ending(rv: str, endings: tuple, endings_after_a: tuple = ()) -> Optional[str]:
+    """
+    Remove the longest matching ending from `rv`, or return None.
+
+    `endings_after_a` (the "group 1" endings) only count after а/я, which is
+    kept; like Snowball, a longest match that fails that condition is not
+    retried shorter.
+    """
+    match = next((ending for ending in endings if rv.endswith(ending)), '')
+    match_after_a = next((ending for ending in endings_after_a if rv.endswith(ending)), '')
+    if len(match_after_a) > len(match):
+        stem = rv[:-len(match_after_a)]
+        return stem if stem.endswith(('а', 'я')) else None
+    if not match:
+        return None
+    return rv[:-len(match)]
+
+
+def _regions(word: str):
+    """Return the start offsets of RV and R2 in `word`."""
+    rv = r1 = r2 = len(word)
+    for i, char in enumerate(word):
+        if char in VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Stem one lower-case word (ё already folded)."""
+    rv_start, r2_start = _regions(word)
+    prefix, rv = word[:rv_start], word[rv_start:]
+
+    # Step 1: perfective gerund, or reflexive + adjectival/verb/noun
+    stripped = _strip_ending(rv, PERFECTIVE_GERUND_2, PERFECTIVE_GERUND_1)
+    if stripped is not None:
+        rv = stripped
+    else:
+        stripped = _strip_ending(rv, REFLEXIVE)
+        if stripped is not None:
+            rv = stripped
+        stripped = _strip_ending(rv, ADJECTIVE)
+        if stripped is not None:
+            participle = _strip_ending(stripped, PARTICIPLE_2, PARTICIPLE_1)
+            rv = participle if participle is not None else stripped
+        else:
+            stripped = _strip_ending(rv, VERB_2, VERB_1)
+            if stripped is None:
+                stripped = _strip_ending(rv, NOUN)
+            if stripped is not None:
+                rv = stripped
+
+    # Step 2
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    # Step 3: derivational ending inside R2
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and rv_start + len(rv) - len(ending) >= r2_start:
+            rv = rv[:-len(ending)]
+            break
+
+    # Step 4: undouble н, superlative, soft sign
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        stripped = _strip_ending(rv, SUPERLATIVE)
+        if stripped is not None:
+            rv = stripped[:-1] if stripped.endswith('нн') else stripped
+        elif rv.endswith('ь'):
+            rv = rv[:-1]
+
+    return prefix + rv
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lower-case, fold ё to е and replace punctuation with single spaces."""
+    if not text:
+        return ''
+    return _NON_WORD.sub(' ', text.lower().replace('ё', 'е')).strip()
+
+
+def stem_words(text: Optional[str]) -> List[str]:
+    """Normalize `text` and stem each of its words."""
+    return [stem(word) for word in normalize_text(text).split()]
+
+
+def stem_text(text: Optional[str]) -> Optional[str]:
+    """Space-separated stems of `text`, as stored in the *_search columns; None stays None."""
+    if text is None:
+        return None
+    return ' '.join(stem_words(text))
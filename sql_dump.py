@@ -0,0 +1,1121 @@
+#!/usr/bin/env python3
+"""
+Shared dump engine for the phraseological_dict table.
+
+Every entry point (create_mysql_db.py, fill_usage_examples.py,
+generate_final_sql.py) maps phrases to rows and serializes them here, so the
+column mapping, escaping and load form are defined once per SQL dialect:
+
+- mysql:      LOCK TABLES + (multi-row) INSERT, or LOAD DATA INFILE (tsv/csv)
+- sqlite:     INSERTs inside one transaction, or a ready .sqlite file built
+              with a prepared statement and executemany
+- postgresql: COPY ... FROM stdin, indexes built after the load
+
+With `shards=N` a full dump is split into a schema file plus N shard files of
+idempotent UPSERTs (by id range or phrase hash) that can be loaded in
+parallel, listed with row counts and checksums in `<dump>_shards.json`.
+
+Each export also writes `<dump>.manifest.json`, a per-row content hash keyed
+on `phrase`. With `delta=True` the new data is diffed against that manifest
+and only UPSERT/DELETE statements for added, changed and removed phrases are
+emitted, instead of a DROP TABLE and full reload.
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import math
+import re
+import sqlite3
+from decimal import Decimal
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from russian_stemmer import stem_text
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for .sql.zst output
+    zstandard = None
+
+TABLE_NAME = 'phraseological_dict'
+COLUMNS = ('id', 'phrase', 'meaning', 'etymology', 'usage_example', 'categories', 'source_url',
+           'phrase_search', 'meaning_search', 'usage_example_search', 'category_seq', 'random_key')
+
+# random_key is a 32-bit hash of the phrase: uniformly spread, and stable across
+# regenerations so delta dumps do not rewrite every row
+RANDOM_KEY_BITS = 32
+
+# Stemmed copies of these columns (see russian_stemmer.py) carry the full-text indexes
+SEARCH_COLUMNS = ('phrase_search', 'meaning_search', 'usage_example_search')
+# SQLite's FTS5 table over them, under this name whichever table holds the columns
+SEARCH_TABLE = f'{TABLE_NAME}_fts'
+
+# Keep each multi-row INSERT well under MySQL's max_allowed_packet
+# (4 MB by default on 5.7, 64 MB on 8.0; shared hosting often sticks to 1-4 MB).
+DEFAULT_BATCH_BYTES = 1024 * 1024
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+LOAD_DATA_FORMATS = ('tsv', 'csv')
+OUTPUT_FORMATS = ('sql',) + LOAD_DATA_FORMATS + ('sqlite',)
+
+# Number of phrases per DELETE ... WHERE phrase IN (...) in delta dumps
+DELETE_BATCH_SIZE = 500
+
+# Table layouts: the single flat table, or split tables (see sql_layouts.py)
+LAYOUTS = ('flat', 'split', 'normalized')
+
+# How rows are assigned to shards: contiguous id ranges or a stable hash of `phrase`
+SHARD_STRATEGIES = ('id', 'hash')
+
+CREATE_TABLE_LINES = [
+    "-- Table structure for phraseological_dict",
+    "CREATE TABLE `phraseological_dict` (",
+    "  `id` int(11) NOT NULL AUTO_INCREMENT,",
+    "  `phrase` varchar(500) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Фразеологизм',",
+    "  `meaning` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Значение фразеологизма',",
+    "  `etymology` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Происхождение фразеологизма',",
+    "  `usage_example` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Пример использования фразеологизма в тексте',",
+    "  `categories` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Категория фразеологизма',",
+    "  `source_url` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Источник',",
+    "  `phrase_search` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Основы слов фразеологизма для поиска',",
+    "  `meaning_search` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL COMMENT 'Основы слов значения для поиска',",
+    "  `usage_example_search` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'Основы слов примера для поиска',",
+    "  `category_seq` int(11) NOT NULL COMMENT 'Номер внутри категории (1..N без пропусков) для случайной выборки',",
+    "  `random_key` int(10) unsigned NOT NULL COMMENT 'Случайный ключ для выборки без ORDER BY RAND()',",
+    "  PRIMARY KEY (`id`),",
+    "  UNIQUE KEY `phrase` (`phrase`),",
+    "  KEY `categories` (`categories`, `category_seq`),",
+    "  KEY `random_key` (`random_key`),",
+    "  FULLTEXT KEY `search` (`phrase_search`, `meaning_search`, `usage_example_search`)",
+    ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Словарь фразеологизмов русского языка';",
+]
+
+# Full mysql_real_escape_string set except `"`, which needs no escape inside
+# single quotes: NUL, LF, CR, Ctrl-Z (cuts files short on Windows), backslash, quote
+_MYSQL_ESCAPES = {'\0': '\\0', '\n': '\\n', '\r': '\\r', '\x1a': '\\Z', '\\': '\\\\', "'": "\\'"}
+# One compiled character class instead of a str.translate table: translate
+# drops off its ASCII fast path on Cyrillic text and is ~5x slower here
+_MYSQL_SPECIALS = re.compile('[' + re.escape(''.join(_MYSQL_ESCAPES)) + ']')
+
+
+def _mysql_escape(match: 're.Match') -> str:
+    return _MYSQL_ESCAPES[match.group()]
+
+
+# Escapes understood by both MySQL LOAD DATA (default ESCAPED BY '\\') and
+# PostgreSQL COPY text format
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+def random_key(phrase: str) -> int:
+    """Stable pseudo-random key of a phrase in [0, 2**RANDOM_KEY_BITS)."""
+    digest = hashlib.blake2b(phrase.encode('utf-8'), digest_size=RANDOM_KEY_BITS // 8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def phrase_row(phrase_data: Dict, row_id: int, category_seq: int = 1) -> Tuple:
+    """
+    Map one JSON phrase entry to raw column values, in COLUMNS order.
+
+    `category_seq` is the entry's 1-based position among the entries of its
+    category; phrase_rows numbers them densely.
+    """
+    meaning = '; '.join(phrase_data.get('meanings', []))
+    usage_example = phrase_data.get('usage_example')
+    return (
+        row_id,
+        phrase_data['phrase'],
+        meaning,
+        phrase_data.get('etymology', ''),
+        usage_example,
+        phrase_data.get('category', ''),
+        phrase_data.get('source_url', ''),
+        stem_text(phrase_data['phrase']),
+        stem_text(meaning),
+        stem_text(usage_example),
+        category_seq,
+        random_key(phrase_data['phrase']),
+    )
+
+
+def phrase_rows(phrases: Iterable[Dict]) -> Iterator[Tuple]:
+    """Yield raw column values for each phrase, numbering ids from 1 and category_seq per category."""
+    category_counts: Dict[str, int] = {}
+    for i, phrase_data in enumerate(phrases, 1):
+        yield phrase_row(phrase_data, i, _next_category_seq(category_counts, phrase_data))
+
+
+def _next_category_seq(category_counts: Dict[str, int], phrase_data: Dict) -> int:
+    category = phrase_data.get('category', '')
+    category_counts[category] = category_counts.get(category, 0) + 1
+    return category_counts[category]
+
+
+def scalar_literal(value) -> Optional[str]:
+    """
+    Serialize NULL, booleans and numbers, which are written the same in every dialect.
+
+    Returns None for values that are written as quoted strings (str, dates
+    and anything else whose str() is the wanted text). Raises for values
+    that have no faithful literal: NaN/infinity, bytes and containers.
+    """
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Cannot serialize non-finite float {value!r}")
+        return repr(value)
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            raise ValueError(f"Cannot serialize non-finite decimal {value!r}")
+        return str(value)
+    if isinstance(value, (bytes, bytearray, list, tuple, dict, set)):
+        raise TypeError(f"Cannot serialize {type(value).__name__} as an SQL literal")
+    return None
+
+
+def mysql_literal(value) -> str:
+    """Serialize a value as a MySQL literal, escaping _MYSQL_ESCAPES in one pass."""
+    if type(value) is not str:
+        literal = scalar_literal(value)
+        if literal is not None:
+            return literal
+        value = str(value)
+    # Plain `in` scans are memchr-fast; almost no dictionary value needs escaping,
+    # so the regex runs only for the few that do
+    if ("'" in value or '\\' in value or '\n' in value or '\r' in value
+            or '\0' in value or '\x1a' in value):
+        value = _MYSQL_SPECIALS.sub(_mysql_escape, value)
+    return "'" + value + "'"
+
+
+def standard_literal(value) -> str:
+    """Serialize a value as a standard SQL literal (quotes doubled, no backslash escapes)."""
+    if type(value) is not str:
+        literal = scalar_literal(value)
+        if literal is not None:
+            return literal
+        value = str(value)
+    if '\0' in value:
+        raise ValueError("NUL characters cannot be stored in a standard SQL string literal")
+    return "'" + value.replace("'", "''") + "'"
+
+
+def tsv_field(value) -> str:
+    """Serialize one value for a LOAD DATA / COPY text file (NULL is \\N)."""
+    if value is None:
+        return '\\N'
+    return str(value).translate(_TSV_ESCAPES)
+
+
+def csv_field(value) -> str:
+    """Serialize one value as a quoted CSV field; NULL is the unquoted word NULL."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, int):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def insert_statements(
+    rows: Iterable[Sequence[str]],
+    batch_bytes: Optional[int] = None,
+    prefix: Optional[str] = None,
+    suffix: str = '',
+) -> Iterator[str]:
+    """
+    Yield INSERT statements for rows of already serialized SQL literals.
+
+    Without `batch_bytes` every row gets its own statement, as in the original
+    dumps. With `batch_bytes` rows are grouped into multi-row VALUES lists whose
+    UTF-8 size stays under the budget; a single row larger than the budget is
+    still emitted, alone, in its own statement. `suffix` (e.g. an
+    ON DUPLICATE KEY UPDATE clause) is appended before each closing `;`.
+    """
+    if prefix is None:
+        prefix = MYSQL.insert_prefix()
+    if suffix:
+        suffix = '\n' + suffix
+
+    if not batch_bytes:
+        for row in rows:
+            yield f"{prefix} ({', '.join(row)}){suffix};"
+        return
+
+    prefix_size = len(prefix.encode('utf-8')) + 1 + len(suffix.encode('utf-8'))
+    batch = []
+    batch_size = prefix_size
+    for row in rows:
+        values = f"({', '.join(row)})"
+        # +2 for the ",\n" separator (or the closing ";\n" on the last tuple)
+        values_size = len(values.encode('utf-8')) + 2
+        if batch and batch_size + values_size > batch_bytes:
+            yield prefix + '\n' + ',\n'.join(batch) + suffix + ';'
+            batch = []
+            batch_size = prefix_size
+        batch.append(values)
+        batch_size += values_size
+
+    if batch:
+        yield prefix + '\n' + ',\n'.join(batch) + suffix + ';'
+
+
+class Dialect:
+    """How one SQL dialect quotes, serializes and bulk-loads the table."""
+
+    name = ''
+    title = ''
+    file_suffix = ''
+    placeholder = '%s'
+
+    def quote(self, identifier: str) -> str:
+        return f'"{identifier}"'
+
+    def literal(self, value) -> str:
+        return standard_literal(value)
+
+    def insert_prefix(self, table: str = TABLE_NAME, columns: Sequence[str] = COLUMNS) -> str:
+        """Return the `INSERT INTO ... VALUES` head shared by every row statement."""
+        column_list = ', '.join(self.quote(column) for column in columns)
+        return f"INSERT INTO {self.quote(table)} ({column_list}) VALUES"
+
+    def serialize_rows(self, rows: Iterable[Sequence]) -> Iterator[Tuple[str, ...]]:
+        for row in rows:
+            yield tuple(self.literal(value) for value in row)
+
+    def session_setup(self) -> List[str]:
+        """Connection settings every dump file starts with."""
+        return []
+
+    def preamble(self) -> List[str]:
+        return ["-- Drop table if exists"] + self.drop_relation(TABLE_NAME)
+
+    def drop_relation(self, name: str, kind: str = 'TABLE') -> List[str]:
+        """
+        Statements dropping `name`, which this dump creates as a `kind` ('TABLE' or 'VIEW').
+
+        Another layout may have left a view where this one creates a table
+        and vice versa (phraseological_dict), and DROP TABLE/VIEW refuse the
+        other kind, so dialects that can look it up drop whichever exists.
+        SQLite has no conditional DDL: only `kind` is dropped there.
+        """
+        return [f"DROP {kind} IF EXISTS {self.quote(name)};"]
+
+    def create_table(self, with_indexes: bool = True) -> List[str]:
+        """CREATE TABLE lines; without `with_indexes` only the primary key is declared."""
+        raise NotImplementedError
+
+    def create_indexes(self) -> List[str]:
+        """Secondary index statements for tables created without them."""
+        raise NotImplementedError
+
+    def search_index(self, table: str = TABLE_NAME) -> List[str]:
+        """Full-text index statements over the SEARCH_COLUMNS of `table`."""
+        raise NotImplementedError
+
+    def load_rows(self, rows: Iterable[Sequence], batch_bytes: Optional[int] = None) -> Iterator[str]:
+        raise NotImplementedError
+
+    def postamble(self) -> List[str]:
+        return []
+
+    def begin(self) -> str:
+        return "BEGIN;"
+
+    def upsert_clause(self, columns: Sequence[str] = COLUMNS) -> str:
+        """Clause turning an INSERT into an UPSERT on the unique `phrase` key."""
+        updates = ', '.join(
+            f"{self.quote(column)} = excluded.{self.quote(column)}"
+            for column in columns if column not in ('id', 'phrase')
+        )
+        return f"ON CONFLICT ({self.quote('phrase')}) DO UPDATE SET {updates}"
+
+    def sync_sequence(self, last_id: Optional[int] = None, table: str = TABLE_NAME) -> List[str]:
+        """
+        Statements moving the id sequence of `table` past explicitly inserted ids.
+
+        Without `last_id` the current MAX(id) of the table is used.
+        """
+        return []
+
+
+class MySQLDialect(Dialect):
+    """MySQL/MariaDB: multi-row INSERTs under LOCK TABLES."""
+
+    name = 'mysql'
+    title = 'MySQL'
+
+    def quote(self, identifier: str) -> str:
+        return f"`{identifier}`"
+
+    def literal(self, value) -> str:
+        return mysql_literal(value)
+
+    def session_setup(self) -> List[str]:
+        return ["SET NAMES utf8mb4;", "SET FOREIGN_KEY_CHECKS = 0;"]
+
+    def preamble(self) -> List[str]:
+        return self.session_setup() + [""] + super().preamble()
+
+    def drop_relation(self, name: str, kind: str = 'TABLE') -> List[str]:
+        is_view = (f"SELECT COUNT(*) FROM information_schema.VIEWS "
+                   f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = {self.literal(name)}")
+        return [
+            f"SET @drop_view = IF(({is_view}) > 0, {self.literal(f'DROP VIEW `{name}`')}, 'DO 0');",
+            "PREPARE drop_view FROM @drop_view;",
+            "EXECUTE drop_view;",
+            "DEALLOCATE PREPARE drop_view;",
+            f"DROP TABLE IF EXISTS `{name}`;",
+        ]
+
+    def create_table(self, with_indexes: bool = True) -> List[str]:
+        if with_indexes:
+            return list(CREATE_TABLE_LINES)
+        lines = [line for line in CREATE_TABLE_LINES if not line.startswith(('  UNIQUE KEY', '  KEY', '  FULLTEXT'))]
+        return [line.rstrip(',') if line.startswith('  PRIMARY KEY') else line for line in lines]
+
+    def create_indexes(self) -> List[str]:
+        return [
+            f"ALTER TABLE `{TABLE_NAME}` ADD UNIQUE KEY `phrase` (`phrase`), ADD KEY `categories` (`categories`, `category_seq`), "
+            "ADD KEY `random_key` (`random_key`);",
+        ] + self.search_index()
+
+    def search_index(self, table: str = TABLE_NAME) -> List[str]:
+        search_columns = ', '.join(f"`{column}`" for column in SEARCH_COLUMNS)
+        # InnoDB builds a FULLTEXT index in its own ALTER
+        return [f"ALTER TABLE `{table}` ADD FULLTEXT KEY `search` ({search_columns});"]
+
+    def load_rows(self, rows, batch_bytes=None):
+        yield f"-- Data for table {TABLE_NAME}"
+        yield f"LOCK TABLES `{TABLE_NAME}` WRITE;"
+        yield from insert_statements(self.serialize_rows(rows), batch_bytes, self.insert_prefix())
+        yield ""
+        yield "UNLOCK TABLES;"
+
+    def postamble(self) -> List[str]:
+        return ["SET FOREIGN_KEY_CHECKS = 1;"]
+
+    def begin(self) -> str:
+        return "START TRANSACTION;"
+
+    def upsert_clause(self, columns: Sequence[str] = COLUMNS) -> str:
+        # VALUES() keeps the clause valid on MariaDB and MySQL 5.7 alike
+        updates = ', '.join(
+            f"`{column}` = VALUES(`{column}`)" for column in columns if column not in ('id', 'phrase')
+        )
+        return f"ON DUPLICATE KEY UPDATE {updates}"
+
+
+class SQLiteDialect(Dialect):
+    """SQLite: one transaction around the INSERTs, secondary indexes after the load."""
+
+    name = 'sqlite'
+    title = 'SQLite'
+    file_suffix = '_sqlite'
+    placeholder = '?'
+
+    def create_table(self, with_indexes: bool = True) -> List[str]:
+        return [
+            f"-- Table structure for {TABLE_NAME}",
+            f'CREATE TABLE "{TABLE_NAME}" (',
+            '  "id" INTEGER PRIMARY KEY,',
+            '  "phrase" TEXT NOT NULL,',
+            '  "meaning" TEXT NOT NULL,',
+            '  "etymology" TEXT DEFAULT NULL,',
+            '  "usage_example" TEXT DEFAULT NULL,',
+            '  "categories" TEXT DEFAULT NULL,',
+            '  "source_url" TEXT DEFAULT NULL,',
+            '  "phrase_search" TEXT NOT NULL,',
+            '  "meaning_search" TEXT NOT NULL,',
+            '  "usage_example_search" TEXT DEFAULT NULL,',
+            '  "category_seq" INTEGER NOT NULL,',
+            '  "random_key" INTEGER NOT NULL',
+            ");",
+        ]
+
+    def create_indexes(self) -> List[str]:
+        return [
+            f'CREATE UNIQUE INDEX "{TABLE_NAME}_phrase" ON "{TABLE_NAME}" ("phrase");',
+            f'CREATE INDEX "{TABLE_NAME}_categories" ON "{TABLE_NAME}" ("categories", "category_seq");',
+            f'CREATE INDEX "{TABLE_NAME}_random_key" ON "{TABLE_NAME}" ("random_key");',
+        ] + self.search_index()
+
+    def search_index(self, table: str = TABLE_NAME) -> List[str]:
+        """An external-content FTS5 table (SEARCH_TABLE) kept in sync with `table` by triggers."""
+        fts = SEARCH_TABLE
+        columns = ', '.join(f'"{column}"' for column in SEARCH_COLUMNS)
+        new_values = ', '.join(f'new."{column}"' for column in SEARCH_COLUMNS)
+        old_values = ', '.join(f'old."{column}"' for column in SEARCH_COLUMNS)
+        delete_old = f'INSERT INTO "{fts}" ("{fts}", rowid, {columns}) VALUES (\'delete\', old."id", {old_values});'
+        insert_new = f'INSERT INTO "{fts}" (rowid, {columns}) VALUES (new."id", {new_values});'
+        return [
+            f'DROP TABLE IF EXISTS "{fts}";',
+            f'CREATE VIRTUAL TABLE "{fts}" USING fts5({columns}, content=\'{table}\', '
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 0');",
+            f'CREATE TRIGGER "{fts}_insert" AFTER INSERT ON "{table}" BEGIN {insert_new} END;',
+            f'CREATE TRIGGER "{fts}_delete" AFTER DELETE ON "{table}" BEGIN {delete_old} END;',
+            f'CREATE TRIGGER "{fts}_update" AFTER UPDATE ON "{table}" BEGIN {delete_old} {insert_new} END;',
+            f'INSERT INTO "{fts}" ("{fts}") VALUES (\'rebuild\');',
+        ]
+
+    def load_rows(self, rows, batch_bytes=None):
+        yield f"-- Data for table {TABLE_NAME}"
+        yield "BEGIN TRANSACTION;"
+        yield from insert_statements(self.serialize_rows(rows), batch_bytes, self.insert_prefix())
+        yield "COMMIT;"
+        yield ""
+        yield from self.create_indexes()
+
+
+# The GIN index is on this expression; queries must repeat it verbatim to use it
+POSTGRESQL_SEARCH_VECTOR = "to_tsvector('simple', " + " || ' ' || ".join(
+    f'coalesce("{column}", \'\')' for column in SEARCH_COLUMNS
+) + ")"
+
+
+class PostgreSQLDialect(Dialect):
+    """PostgreSQL: COPY ... FROM stdin, constraints and indexes after the load."""
+
+    name = 'postgresql'
+    title = 'PostgreSQL'
+    file_suffix = '_postgresql'
+
+    def session_setup(self) -> List[str]:
+        return ["SET client_encoding = 'UTF8';", "SET standard_conforming_strings = on;"]
+
+    def preamble(self) -> List[str]:
+        return self.session_setup() + [""] + super().preamble()
+
+    def drop_relation(self, name: str, kind: str = 'TABLE') -> List[str]:
+        # CASCADE: views and foreign keys of the other layouts depend on it
+        return [
+            f"DO $$ BEGIN IF EXISTS (SELECT FROM pg_views WHERE schemaname = current_schema() "
+            f"AND viewname = {self.literal(name)}) THEN DROP VIEW \"{name}\" CASCADE; END IF; END $$;",
+            f'DROP TABLE IF EXISTS "{name}" CASCADE;',
+        ]
+
+    def create_table(self, with_indexes: bool = True) -> List[str]:
+        return [
+            f"-- Table structure for {TABLE_NAME}",
+            f'CREATE TABLE "{TABLE_NAME}" (',
+            '  "id" integer GENERATED BY DEFAULT AS IDENTITY,',
+            '  "phrase" varchar(500) NOT NULL,',
+            '  "meaning" text NOT NULL,',
+            '  "etymology" text DEFAULT NULL,',
+            '  "usage_example" text DEFAULT NULL,',
+            '  "categories" varchar(100) DEFAULT NULL,',
+            '  "source_url" text DEFAULT NULL,',
+            '  "phrase_search" text NOT NULL,',
+            '  "meaning_search" text NOT NULL,',
+            '  "usage_example_search" text DEFAULT NULL,',
+            '  "category_seq" integer NOT NULL,',
+            '  "random_key" bigint NOT NULL',
+            ");",
+            f"COMMENT ON TABLE \"{TABLE_NAME}\" IS 'Словарь фразеологизмов русского языка';",
+        ]
+
+    def load_rows(self, rows, batch_bytes=None):
+        column_list = ', '.join(self.quote(column) for column in COLUMNS)
+        yield f"-- Data for table {TABLE_NAME}"
+        yield f'COPY "{TABLE_NAME}" ({column_list}) FROM stdin;'
+        for row in rows:
+            yield '\t'.join(tsv_field(value) for value in row)
+        yield "\\."
+        yield ""
+        yield from self.create_indexes()
+        yield from self.sync_sequence()
+
+    def create_indexes(self) -> List[str]:
+        return [
+            f'ALTER TABLE "{TABLE_NAME}" ADD PRIMARY KEY ("id");',
+            f'ALTER TABLE "{TABLE_NAME}" ADD CONSTRAINT "{TABLE_NAME}_phrase" UNIQUE ("phrase");',
+            f'CREATE INDEX "{TABLE_NAME}_categories" ON "{TABLE_NAME}" ("categories", "category_seq");',
+            f'CREATE INDEX "{TABLE_NAME}_random_key" ON "{TABLE_NAME}" ("random_key");',
+        ] + self.search_index()
+
+    def search_index(self, table: str = TABLE_NAME) -> List[str]:
+        return [f'CREATE INDEX "{table}_search" ON "{table}" USING GIN ({POSTGRESQL_SEARCH_VECTOR});']
+
+    def postamble(self) -> List[str]:
+        return [f'ANALYZE "{TABLE_NAME}";']
+
+    def sync_sequence(self, last_id: Optional[int] = None, table: str = TABLE_NAME) -> List[str]:
+        value = str(last_id) if last_id else f'(SELECT COALESCE(MAX("id"), 1) FROM "{table}")'
+        return [f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), {value});"]
+
+
+MYSQL = MySQLDialect()
+DIALECTS = {dialect.name: dialect for dialect in (MYSQL, SQLiteDialect(), PostgreSQLDialect())}
+
+
+def get_dialect(dialect: Union[str, Dialect]) -> Dialect:
+    if isinstance(dialect, Dialect):
+        return dialect
+    try:
+        return DIALECTS[dialect]
+    except KeyError:
+        raise ValueError(f"Unknown SQL dialect: {dialect}") from None
+
+
+def iter_dump(
+    rows: Iterable[Sequence],
+    comment_lines: Sequence[str] = (),
+    dialect: Union[str, Dialect] = 'mysql',
+    batch_bytes: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield a complete dump line by line: comments, DDL, then the row load."""
+    dialect = get_dialect(dialect)
+    yield f"-- {dialect.title} dump for phraseological dictionary"
+    yield from comment_lines
+    yield ""
+    yield from dialect.preamble()
+    yield ""
+    yield from dialect.create_table()
+    yield ""
+    yield from dialect.load_rows(rows, batch_bytes)
+    yield ""
+    yield from dialect.postamble()
+
+
+def row_hash(row: Sequence) -> str:
+    """Content hash of a row, ignoring its id."""
+    payload = json.dumps(list(row[1:]), ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def manifest_path(sql_path: Union[str, Path]) -> Path:
+    """Return the manifest file stored next to a dump (`x.sql` -> `x.manifest.json`)."""
+    sql_path = Path(sql_path)
+    return sql_path.with_name(f"{sql_path.stem}.manifest.json")
+
+
+def load_manifest(path: Union[str, Path]) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def manifest_ids(path: Union[str, Path]) -> Dict[str, int]:
+    """phrase -> database id recorded in a manifest; delta dumps keep ids fixed, so they drift from positions."""
+    return {phrase: entry['id'] for phrase, entry in load_manifest(path)['rows'].items()}
+
+
+def write_manifest(path: Union[str, Path], rows: Dict[str, Dict], next_id: int) -> None:
+    """Write the phrase -> {id, hash} manifest describing what a dump loads."""
+    manifest = {'table': TABLE_NAME, 'next_id': next_id, 'rows': rows}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def tracked_rows(rows: Iterable[Sequence], manifest_rows: Dict[str, Dict]) -> Iterator[Sequence]:
+    """Pass rows through while recording their id and content hash in `manifest_rows`."""
+    for row in rows:
+        manifest_rows[row[1]] = {'id': row[0], 'hash': row_hash(row)}
+        yield row
+
+
+def diff_against_manifest(phrases: Iterable[Dict], manifest: Dict) -> Tuple[List[Tuple], List[str], Dict]:
+    """
+    Compare phrases with a manifest.
+
+    Returns (rows to upsert, phrases to delete, new manifest rows). Phrases
+    already in the manifest keep their id; new phrases get ids from `next_id`
+    on, so ids are never reused.
+    """
+    old_rows = manifest['rows']
+    next_id = manifest['next_id']
+    upserts = []
+    new_rows = {}
+    category_counts: Dict[str, int] = {}
+    for phrase_data in phrases:
+        phrase = phrase_data['phrase']
+        category_seq = _next_category_seq(category_counts, phrase_data)
+        if phrase in old_rows:
+            row = phrase_row(phrase_data, old_rows[phrase]['id'], category_seq)
+        else:
+            row = phrase_row(phrase_data, next_id, category_seq)
+            next_id += 1
+        entry = {'id': row[0], 'hash': row_hash(row)}
+        if old_rows.get(phrase, {}).get('hash') != entry['hash']:
+            upserts.append(row)
+        new_rows[phrase] = entry
+    deletes = [phrase for phrase in old_rows if phrase not in new_rows]
+    return upserts, deletes, new_rows
+
+
+def iter_delta(
+    upserts: Sequence[Sequence],
+    deletes: Sequence[str],
+    comment_lines: Sequence[str] = (),
+    dialect: Union[str, Dialect] = 'mysql',
+    batch_bytes: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield a delta dump: DELETEs for removed phrases, then UPSERTs, in one transaction."""
+    dialect = get_dialect(dialect)
+    yield f"-- {dialect.title} delta for phraseological dictionary"
+    yield from comment_lines
+    yield f"-- Upserted: {len(upserts)}, deleted: {len(deletes)}"
+    yield ""
+    yield from _upsert_transaction(dialect, upserts, deletes, batch_bytes)
+
+
+def _upsert_transaction(
+    dialect: Dialect,
+    upserts: Iterable[Sequence],
+    deletes: Sequence[str] = (),
+    batch_bytes: Optional[int] = None,
+    sync: bool = True,
+) -> Iterator[str]:
+    """DELETE and UPSERT statements wrapped in one transaction; safe to replay."""
+    table = dialect.quote(TABLE_NAME)
+    if dialect.name == 'mysql':
+        yield "SET NAMES utf8mb4;"
+    yield dialect.begin()
+    yield ""
+    for start in range(0, len(deletes), DELETE_BATCH_SIZE):
+        chunk = ', '.join(dialect.literal(phrase) for phrase in deletes[start:start + DELETE_BATCH_SIZE])
+        yield f"DELETE FROM {table} WHERE {dialect.quote('phrase')} IN ({chunk});"
+    yield from insert_statements(
+        dialect.serialize_rows(upserts),
+        batch_bytes,
+        dialect.insert_prefix(),
+        dialect.upsert_clause(),
+    )
+    yield ""
+    if sync:
+        yield from dialect.sync_sequence()
+    yield "COMMIT;"
+
+
+def shard_of(phrase: str, shard_count: int) -> int:
+    """Stable shard number for `phrase` (independent of PYTHONHASHSEED)."""
+    digest = hashlib.sha1(phrase.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count
+
+
+def split_shards(rows: Sequence[Sequence], shard_count: int, shard_by: str = 'id') -> List[List[Sequence]]:
+    """
+    Split rows into `shard_count` lists.
+
+    'id' cuts the id-ordered rows into contiguous ranges of near-equal size;
+    'hash' assigns each row by a hash of its phrase, so a phrase stays in the
+    same shard however the rest of the dictionary changes. Row order is kept
+    within each shard.
+    """
+    if shard_count < 1:
+        raise ValueError(f"Shard count must be positive, got {shard_count}")
+    shards: List[List[Sequence]] = [[] for _ in range(shard_count)]
+    if shard_by == 'id':
+        size = -(-len(rows) // shard_count) or 1
+        for i, row in enumerate(rows):
+            shards[i // size].append(row)
+    elif shard_by == 'hash':
+        for row in rows:
+            shards[shard_of(row[1], shard_count)].append(row)
+    else:
+        raise ValueError(f"Unknown shard strategy: {shard_by}")
+    return shards
+
+
+def iter_schema(
+    comment_lines: Sequence[str] = (),
+    dialect: Union[str, Dialect] = 'mysql',
+    last_id: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield the schema file of a sharded dump: DROP/CREATE with all indexes.
+
+    The unique `phrase` key must exist before the shards are loaded, since it
+    is what makes their UPSERTs idempotent. The id sequence is moved to
+    `last_id` here, so concurrently loaded shards do not race on it.
+    """
+    dialect = get_dialect(dialect)
+    yield f"-- {dialect.title} schema for phraseological dictionary"
+    yield from comment_lines
+    yield ""
+    yield from dialect.preamble()
+    yield ""
+    yield from dialect.create_table(with_indexes=False)
+    yield from dialect.create_indexes()
+    yield from dialect.sync_sequence(last_id)
+
+
+def iter_shard(
+    rows: Sequence[Sequence],
+    index: int,
+    shard_count: int,
+    comment_lines: Sequence[str] = (),
+    dialect: Union[str, Dialect] = 'mysql',
+    batch_bytes: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield one shard: UPSERTs for its rows in a single transaction.
+
+    A shard does not lock the table or touch the schema, so shards can be
+    loaded concurrently over separate connections, in any order, and a
+    failed or repeated shard can simply be loaded again.
+    """
+    dialect = get_dialect(dialect)
+    yield f"-- {dialect.title} shard {index} of {shard_count} for phraseological dictionary"
+    yield from comment_lines
+    if rows:
+        yield f"-- Rows: {len(rows)}, ids {min(row[0] for row in rows)}-{max(row[0] for row in rows)}"
+    else:
+        yield "-- Rows: 0"
+    yield ""
+    yield from _upsert_transaction(dialect, rows, batch_bytes=batch_bytes, sync=False)
+
+
+def compressed_path(path: Union[str, Path], compression: Optional[str]) -> Path:
+    """Append the suffix for `compression` to `path` unless it is already there."""
+    path = Path(path)
+    if compression is None:
+        return path
+    suffix = COMPRESSION_SUFFIXES[compression]
+    return path if path.suffix == suffix else path.with_name(path.name + suffix)
+
+
+def open_dump_file(path: Union[str, Path], compression: Optional[str] = None) -> IO[str]:
+    """
+    Open a text handle for writing a dump, compressing on the fly.
+
+    `compression` is 'gzip', 'zstd' or None; when None it is inferred from the
+    file suffix (.gz / .zst), so `phraseological_dict.sql.gz` just works.
+    """
+    path = Path(path)
+    if compression is None:
+        for name, suffix in COMPRESSION_SUFFIXES.items():
+            if path.suffix == suffix:
+                compression = name
+
+    if compression is None:
+        return open(path, 'w', encoding='utf-8')
+    if compression == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd output requires the zstandard package: pip install zstandard")
+        raw = zstandard.ZstdCompressor().stream_writer(open(path, 'wb'))
+        return io.TextIOWrapper(raw, encoding='utf-8')
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def write_lines(handle: IO[str], lines: Iterable[str]) -> None:
+    """Write newline separated lines to `handle` one at a time, without a trailing newline."""
+    first = True
+    for line in lines:
+        if not first:
+            handle.write('\n')
+        handle.write(line)
+        first = False
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """SHA-256 of a file's bytes, as written (compressed or not)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_dump(
+    path: Union[str, Path],
+    lines: Iterable[str],
+    compression: Optional[str] = None,
+) -> Path:
+    """Stream `lines` into `path` (optionally compressed) and return the path written."""
+    path = compressed_path(path, compression)
+    with open_dump_file(path, compression) as handle:
+        write_lines(handle, lines)
+    return path
+
+
+def load_data_statement(data_file: str, fmt: str = 'tsv', table: str = TABLE_NAME,
+                        columns: Sequence[str] = COLUMNS) -> str:
+    """Return the `LOAD DATA LOCAL INFILE` statement matching `write_data_file` output."""
+    if fmt == 'tsv':
+        fields = "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'"
+    elif fmt == 'csv':
+        fields = "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY ''"
+    else:
+        raise ValueError(f"Unknown data format: {fmt}")
+    column_list = ', '.join(f"`{column}`" for column in columns)
+    return (
+        f"LOAD DATA LOCAL INFILE '{data_file}'\n"
+        f"INTO TABLE `{table}`\n"
+        "CHARACTER SET utf8mb4\n"
+        f"{fields}\n"
+        "LINES TERMINATED BY '\\n'\n"
+        f"({column_list});"
+    )
+
+
+def write_data_file(path: Union[str, Path], rows: Iterable[Sequence], fmt: str = 'tsv') -> int:
+    """Stream raw value rows into a TSV or CSV data file and return the row count."""
+    field = tsv_field if fmt == 'tsv' else csv_field
+    separator = '\t' if fmt == 'tsv' else ','
+    count = 0
+    # newline='' keeps embedded \r intact in CSV fields
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        for row in rows:
+            handle.write(separator.join(field(value) for value in row))
+            handle.write('\n')
+            count += 1
+    return count
+
+
+def write_load_data(
+    data_path: Union[str, Path],
+    rows: Iterable[Sequence],
+    fmt: str = 'tsv',
+    header_lines: Sequence[str] = (),
+) -> Tuple[Path, Path, int]:
+    """
+    Write a bulk-load data file plus its companion `<name>_load.sql`.
+
+    The companion holds the DDL and a `LOAD DATA LOCAL INFILE` statement for
+    the data file. The TSV file is also valid input for PostgreSQL
+    `COPY ... FROM` (text format); the CSV file for SQLite `.import --csv`
+    and `COPY ... WITH (FORMAT csv, NULL 'NULL')`.
+    """
+    data_path = Path(data_path)
+    sql_path = data_path.with_name(f"{data_path.stem}_load.sql")
+    count = write_data_file(data_path, rows, fmt)
+
+    lines = [f"-- MySQL bulk load for phraseological dictionary from {data_path.name}"] + list(header_lines) + [
+        "-- Import with: mysql --local-infile=1 -u username -p database_name < " + sql_path.name,
+        "",
+        *MYSQL.preamble(),
+        "",
+        *CREATE_TABLE_LINES,
+        "",
+        f"-- Data for table {TABLE_NAME}",
+        load_data_statement(data_path.name, fmt),
+        "",
+        *MYSQL.postamble(),
+    ]
+    write_dump(sql_path, lines)
+    return data_path, sql_path, count
+
+
+def write_sqlite_database(path: Union[str, Path], rows: Iterable[Sequence]) -> int:
+    """
+    Build a ready-to-ship SQLite database file and return the row count.
+
+    Rows go through one prepared INSERT via executemany inside a single
+    transaction; indexes are created afterwards.
+    """
+    path = Path(path)
+    if path.exists():
+        path.unlink()
+    dialect = DIALECTS['sqlite']
+    placeholders = ', '.join(dialect.placeholder for _ in COLUMNS)
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute('\n'.join(dialect.create_table()[1:]))
+        with connection:
+            cursor = connection.executemany(f"{dialect.insert_prefix()} ({placeholders})", rows)
+            count = cursor.rowcount
+        for statement in dialect.create_indexes():
+            connection.execute(statement)
+        connection.commit()
+    finally:
+        connection.close()
+    return count
+
+
+def dialect_path(path: Union[str, Path], dialect: Union[str, Dialect]) -> Path:
+    """Return the dump file name for `dialect` (`x.sql` -> `x_sqlite.sql` etc.)."""
+    path = Path(path)
+    suffix = get_dialect(dialect).file_suffix
+    return path.with_name(f"{path.stem}{suffix}{path.suffix}")
+
+
+def export_phrases(
+    phrases: Sequence[Dict],
+    sql_path: Union[str, Path],
+    comment_lines: Sequence[str] = (),
+    fmt: str = 'sql',
+    dialect: str = 'mysql',
+    batch_bytes: Optional[int] = None,
+    compression: Optional[str] = None,
+    delta: bool = False,
+    shards: Optional[int] = None,
+    shard_by: str = 'id',
+    layout: str = 'flat',
+) -> Path:
+    """
+    Export phrases in the requested format and return the main file written.
+
+    'sql' writes a dump for `dialect` next to `sql_path`, 'tsv'/'csv' write a
+    LOAD DATA data file plus companion script, 'sqlite' writes a database file.
+    A manifest of row hashes is written alongside; with `delta` only the
+    changes against that manifest are written (see export_delta). With
+    `shards`, the 'sql' dump is split into a schema file and that many
+    independently loadable shard files (see export_shards). A `layout` other
+    than 'flat' writes that table layout instead (see sql_layouts.py).
+    """
+    sql_path = Path(sql_path)
+    if shards and (fmt != 'sql' or delta):
+        raise ValueError("Sharded output is only available for full dumps with --format sql")
+    if layout != 'flat':
+        if fmt != 'sql' or delta or shards:
+            raise ValueError(f"The {layout} layout is only available for full, unsharded dumps with --format sql")
+        # Imported here: sql_layouts builds on this module
+        from sql_layouts import export_layout
+        return export_layout(phrases, sql_path, layout, comment_lines, dialect, batch_bytes, compression)
+    if delta:
+        return export_delta(phrases, sql_path, comment_lines, dialect, batch_bytes, compression)
+
+    manifest_rows: Dict[str, Dict] = {}
+    rows = tracked_rows(phrase_rows(phrases), manifest_rows)
+    if shards:
+        output_path = export_shards(list(rows), sql_path, shards, shard_by, comment_lines,
+                                    dialect, batch_bytes, compression)
+    else:
+        output_path = _export_rows(rows, sql_path, comment_lines, fmt, dialect, batch_bytes, compression)
+    # A .sqlite file is updated with SQLite deltas, LOAD DATA files with MySQL ones
+    manifest_dialect = {'sql': dialect, 'sqlite': 'sqlite'}.get(fmt, 'mysql')
+    write_manifest(manifest_path(dialect_path(sql_path, manifest_dialect)), manifest_rows, len(manifest_rows) + 1)
+    return output_path
+
+
+def export_delta(
+    phrases: Sequence[Dict],
+    sql_path: Union[str, Path],
+    comment_lines: Sequence[str] = (),
+    dialect: str = 'mysql',
+    batch_bytes: Optional[int] = None,
+    compression: Optional[str] = None,
+) -> Path:
+    """
+    Write `<dump>_delta.sql` with only the changes since the last manifest.
+
+    The manifest is then advanced to the new state, so the next delta is
+    relative to a database that has this one applied.
+    """
+    sql_path = Path(sql_path)
+    manifest_file = manifest_path(dialect_path(sql_path, dialect))
+    if not manifest_file.exists():
+        raise FileNotFoundError(f"{manifest_file} not found: generate a full dump first")
+    manifest = load_manifest(manifest_file)
+
+    upserts, deletes, new_rows = diff_against_manifest(phrases, manifest)
+    next_id = max([manifest['next_id']] + [entry['id'] + 1 for entry in new_rows.values()])
+    delta_path = dialect_path(sql_path.with_name(f"{sql_path.stem}_delta{sql_path.suffix}"), dialect)
+    output_path = write_dump(
+        delta_path,
+        iter_delta(upserts, deletes, comment_lines, dialect, batch_bytes),
+        compression,
+    )
+    write_manifest(manifest_file, new_rows, next_id)
+    return output_path
+
+
+def shards_manifest_path(sql_path: Union[str, Path]) -> Path:
+    """Return the shard list stored next to a sharded dump (`x.sql` -> `x_shards.json`)."""
+    sql_path = Path(sql_path)
+    return sql_path.with_name(f"{sql_path.stem}_shards.json")
+
+
+def export_shards(
+    rows: Sequence[Sequence],
+    sql_path: Union[str, Path],
+    shard_count: int,
+    shard_by: str = 'id',
+    comment_lines: Sequence[str] = (),
+    dialect: str = 'mysql',
+    batch_bytes: Optional[int] = None,
+    compression: Optional[str] = None,
+) -> Path:
+    """
+    Write a sharded dump and return the path of its shard manifest.
+
+    Produces `<dump>_schema.sql` (run first, once) and
+    `<dump>_shard_001.sql` ... `<dump>_shard_NNN.sql`, each holding the
+    UPSERTs for one slice of the rows in its own transaction. The manifest
+    `<dump>_shards.json` lists every file with its row count, id range and
+    SHA-256, so a loader can verify files and track which shards are done.
+    """
+    sql_path = dialect_path(sql_path, dialect)
+    last_id = max((row[0] for row in rows), default=0)
+    schema_path = write_dump(
+        sql_path.with_name(f"{sql_path.stem}_schema{sql_path.suffix}"),
+        iter_schema(comment_lines, dialect, last_id),
+        compression,
+    )
+
+    shard_entries = []
+    width = max(3, len(str(shard_count)))
+    for index, shard_rows in enumerate(split_shards(rows, shard_count, shard_by), 1):
+        path = write_dump(
+            sql_path.with_name(f"{sql_path.stem}_shard_{index:0{width}d}{sql_path.suffix}"),
+            iter_shard(shard_rows, index, shard_count, comment_lines, dialect, batch_bytes),
+            compression,
+        )
+        shard_entries.append({
+            'file': path.name,
+            'rows': len(shard_rows),
+            'first_id': min((row[0] for row in shard_rows), default=None),
+            'last_id': max((row[0] for row in shard_rows), default=None),
+            'sha256': file_sha256(path),
+        })
+
+    manifest = {
+        'table': TABLE_NAME,
+        'dialect': get_dialect(dialect).name,
+        'shard_by': shard_by,
+        'total_rows': len(rows),
+        'schema': {'file': schema_path.name, 'sha256': file_sha256(schema_path)},
+        'shards': shard_entries,
+    }
+    manifest_file = shards_manifest_path(sql_path)
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest_file
+
+
+def _export_rows(rows, sql_path, comment_lines, fmt, dialect, batch_bytes, compression) -> Path:
+    if fmt == 'sql':
+        lines = iter_dump(rows, comment_lines, dialect, batch_bytes)
+        return write_dump(dialect_path(sql_path, dialect), lines, compression)
+    if fmt in LOAD_DATA_FORMATS:
+        _, load_sql_path, _ = write_load_data(sql_path.with_suffix(f'.{fmt}'), rows, fmt, comment_lines)
+        return load_sql_path
+    if fmt == 'sqlite':
+        db_path = sql_path.with_suffix('.sqlite')
+        write_sqlite_database(db_path, rows)
+        return db_path
+    raise ValueError(f"Unknown output format: {fmt}")
+
+
+def add_dump_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the output options shared by every dump generator."""
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="sql",
+                        help="sql: INSERT/COPY dump; tsv/csv: data file plus LOAD DATA INFILE script; "
+                             "sqlite: ready .sqlite database file")
+    parser.add_argument("--dialect", choices=sorted(DIALECTS), default="mysql",
+                        help="SQL dialect of the dump for --format sql (default: mysql)")
+    parser.add_argument("--batch-bytes", type=int, nargs="?", const=DEFAULT_BATCH_BYTES, default=None,
+                        help=f"group rows into multi-row INSERTs of at most this many bytes (default when flag given: {DEFAULT_BATCH_BYTES})")
+    parser.add_argument("--compress", choices=sorted(COMPRESSION_SUFFIXES), default=None,
+                        help="compress the dump on the fly (.sql.gz / .sql.zst)")
+    parser.add_argument("--delta", action="store_true",
+                        help="write only UPSERT/DELETE statements for phrases changed since the last dump's manifest")
+    parser.add_argument("--layout", choices=LAYOUTS, default="flat",
+                        help="flat: one phraseological_dict table; split: narrow phraseological_dict plus "
+                             "compressed phrase_details; normalized: categories, phrases, "
+                             "phrase_categories and phrase_meanings tables plus a flat view")
+    parser.add_argument("--shards", type=int, default=None, metavar="N",
+                        help="split a --format sql dump into a schema file and N idempotent shard files "
+                             "that can be loaded concurrently")
+    parser.add_argument("--shard-by", choices=SHARD_STRATEGIES, default="id",
+                        help="assign rows to shards by id range or by hash of phrase (default: id)")
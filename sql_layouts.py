@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Alternative table layouts for the SQL dumps.
+
+The default 'flat' layout is the single phraseological_dict table written by
+sql_dump.iter_dump. The 'split' layout partitions it vertically:
+
+- phraseological_dict: a narrow hot table with only what list, quiz, search
+                       and sampling queries read (phrase, meaning, categories,
+                       search and sampling columns)
+- phrase_details:      etymology, usage example and source URL keyed by id,
+                       fetched only for the detail view; in MySQL it is
+                       stored with ROW_FORMAT=COMPRESSED
+
+so the hot working set stays small enough for the InnoDB buffer pool of a
+small hosting plan. `phraseological_dict_full` is a view joining both.
+
+The 'normalized' layout splits it up by relation instead:
+
+- categories:         one row per category name
+- phrases:            the phrase itself, etymology, example, source and the
+                      search/sampling columns
+- phrase_categories:  phrase <-> category junction with the entry's category
+                      order and a dense per-category sequence number
+- phrase_meanings:    one row per meaning, with its 1-based ordinal
+
+Multi-category entries ("body_parts, animals" after deduplication) become
+one junction row per category, so filtering by category is an index seek
+that no longer misses them. `phraseological_dict` stays available as a view
+with the legacy flat columns (meanings joined with '; ', categories with
+', '), so existing queries keep working.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sql_dump import (
+    COLUMNS,
+    SEARCH_COLUMNS,
+    TABLE_NAME,
+    Dialect,
+    dialect_path,
+    get_dialect,
+    insert_statements,
+    phrase_rows,
+    write_dump,
+)
+
+CATEGORIES_TABLE = 'categories'
+PHRASES_TABLE = 'phrases'
+PHRASE_CATEGORIES_TABLE = 'phrase_categories'
+PHRASE_MEANINGS_TABLE = 'phrase_meanings'
+
+# Column types as (MySQL, SQLite, PostgreSQL)
+TYPES = {
+    'int': ('int(11)', 'INTEGER', 'integer'),
+    'key32': ('int(10) unsigned', 'INTEGER', 'bigint'),
+    'varchar100': ('varchar(100)', 'TEXT', 'varchar(100)'),
+    'varchar500': ('varchar(500)', 'TEXT', 'varchar(500)'),
+    'text': ('text', 'TEXT', 'text'),
+}
+_TYPE_INDEX = {'mysql': 0, 'sqlite': 1, 'postgresql': 2}
+
+
+class Table:
+    """Declarative table description rendered into each dialect's DDL."""
+
+    def __init__(
+        self,
+        name: str,
+        columns: Sequence[Tuple[str, str, bool]],
+        primary_key: Sequence[str],
+        indexes: Sequence[Tuple[str, Sequence[str], bool]] = (),
+        foreign_keys: Sequence[Tuple[str, str]] = (),
+        auto_increment: bool = False,
+        comment: str = '',
+        mysql_options: str = '',
+    ):
+        self.name = name
+        self.columns = list(columns)  # (name, type key, NOT NULL)
+        self.primary_key = tuple(primary_key)
+        self.indexes = list(indexes)  # (index name, columns, unique)
+        self.foreign_keys = list(foreign_keys)  # (column, referenced table), always to its id
+        self.auto_increment = auto_increment
+        self.comment = comment
+        self.mysql_options = mysql_options  # extra InnoDB table options, e.g. ROW_FORMAT
+
+    @property
+    def column_names(self) -> Tuple[str, ...]:
+        return tuple(column for column, _, _ in self.columns)
+
+    def create(self, dialect: Dialect) -> List[str]:
+        """CREATE TABLE with the primary and foreign keys only; see create_indexes."""
+        q = dialect.quote
+        lines = [f"-- Table structure for {self.name}", f"CREATE TABLE {q(self.name)} ("]
+        definitions = []
+        for column, type_key, not_null in self.columns:
+            definition = f"  {q(column)} {TYPES[type_key][_TYPE_INDEX[dialect.name]]}"
+            if not_null:
+                definition += " NOT NULL"
+            if self.auto_increment and column == 'id':
+                if dialect.name == 'mysql':
+                    definition += " AUTO_INCREMENT"
+                elif dialect.name == 'postgresql':
+                    definition += " GENERATED BY DEFAULT AS IDENTITY"
+            definitions.append(definition)
+        definitions.append(f"  PRIMARY KEY ({', '.join(q(column) for column in self.primary_key)})")
+        for column, referenced in self.foreign_keys:
+            definitions.append(f"  FOREIGN KEY ({q(column)}) REFERENCES {q(referenced)} ({q('id')}) ON DELETE CASCADE")
+        lines.append(',\n'.join(definitions))
+        if dialect.name == 'mysql':
+            options = f" {self.mysql_options}" if self.mysql_options else ''
+            comment = f" COMMENT={dialect.literal(self.comment)}" if self.comment else ''
+            lines.append(f") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci{options}{comment};")
+        else:
+            lines.append(");")
+        return lines
+
+    def create_indexes(self, dialect: Dialect) -> List[str]:
+        q = dialect.quote
+        statements = []
+        for index, columns, unique in self.indexes:
+            column_list = ', '.join(q(column) for column in columns)
+            kind = 'UNIQUE ' if unique else ''
+            if dialect.name == 'mysql':
+                statements.append(f"ALTER TABLE {q(self.name)} ADD {kind}KEY {q(index)} ({column_list});")
+            else:
+                statements.append(f"CREATE {kind}INDEX {q(f'{self.name}_{index}')} ON {q(self.name)} ({column_list});")
+        return statements
+
+
+PHRASE_COLUMNS = ('id', 'phrase', 'etymology', 'usage_example', 'source_url') + SEARCH_COLUMNS + (
+    'category_seq', 'random_key')
+
+NORMALIZED_TABLES = [
+    Table(
+        CATEGORIES_TABLE,
+        [('id', 'int', True), ('name', 'varchar100', True)],
+        primary_key=('id',),
+        indexes=[('name', ('name',), True)],
+        auto_increment=True,
+        comment='Категории фразеологизмов',
+    ),
+    Table(
+        PHRASES_TABLE,
+        [
+            ('id', 'int', True),
+            ('phrase', 'varchar500', True),
+            ('etymology', 'text', False),
+            ('usage_example', 'text', False),
+            ('source_url', 'text', False),
+            ('phrase_search', 'text', True),
+            ('meaning_search', 'text', True),
+            ('usage_example_search', 'text', False),
+            ('category_seq', 'int', True),
+            ('random_key', 'key32', True),
+        ],
+        primary_key=('id',),
+        indexes=[('phrase', ('phrase',), True), ('random_key', ('random_key',), False)],
+        auto_increment=True,
+        comment='Фразеологизмы русского языка',
+    ),
+    Table(
+        PHRASE_CATEGORIES_TABLE,
+        [('category_id', 'int', True), ('phrase_id', 'int', True), ('ordinal', 'int', True), ('category_seq', 'int', True)],
+        primary_key=('category_id', 'phrase_id'),
+        indexes=[('phrase', ('phrase_id', 'category_id'), True), ('category_seq', ('category_id', 'category_seq'), False)],
+        foreign_keys=[('category_id', CATEGORIES_TABLE), ('phrase_id', PHRASES_TABLE)],
+        comment='Связь фразеологизмов и категорий',
+    ),
+    Table(
+        PHRASE_MEANINGS_TABLE,
+        [('phrase_id', 'int', True), ('ordinal', 'int', True), ('meaning', 'text', True)],
+        primary_key=('phrase_id', 'ordinal'),
+        foreign_keys=[('phrase_id', PHRASES_TABLE)],
+        comment='Значения фразеологизмов',
+    ),
+]
+
+
+DETAILS_TABLE = 'phrase_details'
+DETAIL_COLUMNS = ('id', 'etymology', 'usage_example', 'source_url')
+HOT_COLUMNS = tuple(column for column in COLUMNS if column not in DETAIL_COLUMNS[1:])
+FULL_VIEW = f'{TABLE_NAME}_full'
+
+SPLIT_TABLES = [
+    Table(
+        TABLE_NAME,
+        [
+            ('id', 'int', True),
+            ('phrase', 'varchar500', True),
+            ('meaning', 'text', True),
+            ('categories', 'varchar100', False),
+            ('phrase_search', 'text', True),
+            ('meaning_search', 'text', True),
+            ('usage_example_search', 'text', False),
+            ('category_seq', 'int', True),
+            ('random_key', 'key32', True),
+        ],
+        primary_key=('id',),
+        indexes=[
+            ('phrase', ('phrase',), True),
+            ('categories', ('categories', 'category_seq'), False),
+            ('random_key', ('random_key',), False),
+        ],
+        auto_increment=True,
+        comment='Словарь фразеологизмов русского языка',
+    ),
+    Table(
+        DETAILS_TABLE,
+        [('id', 'int', True), ('etymology', 'text', False), ('usage_example', 'text', False), ('source_url', 'text', False)],
+        primary_key=('id',),
+        foreign_keys=[('id', TABLE_NAME)],
+        # Cold, text-heavy rows: trade some CPU on the detail view for a
+        # smaller footprint; PostgreSQL compresses long values (TOAST) by itself
+        mysql_options='ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8',
+        comment='Происхождение, примеры и источники фразеологизмов',
+    ),
+]
+
+
+def split_categories(category: Optional[str]) -> List[str]:
+    """Split a merged "a, b" category string into unique names, keeping their order."""
+    names = (name.strip() for name in (category or '').split(','))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def normalized_rows(phrases: Sequence[Dict]) -> Dict[str, List[Tuple]]:
+    """
+    Map phrase entries to the rows of every normalized table.
+
+    Phrase ids match the flat layout; category ids follow the sorted names,
+    so they are stable for the same set of categories. A phrase's
+    `category_seq` numbers it among the phrases with the same category list,
+    i.e. the same `categories` value in the legacy view.
+    """
+    names = sorted({name for phrase_data in phrases for name in split_categories(phrase_data.get('category'))})
+    category_ids = {name: i for i, name in enumerate(names, 1)}
+    category_counts: Dict[int, int] = {}
+    category_lists: Dict[str, int] = {}
+
+    rows: Dict[str, List[Tuple]] = {
+        CATEGORIES_TABLE: [(category_ids[name], name) for name in names],
+        PHRASES_TABLE: [],
+        PHRASE_CATEGORIES_TABLE: [],
+        PHRASE_MEANINGS_TABLE: [],
+    }
+    for phrase_data, row in zip(phrases, phrase_rows(phrases)):
+        values = dict(zip(COLUMNS, row))
+        phrase_id = values['id']
+        entry_names = split_categories(phrase_data.get('category'))
+        category_list = ', '.join(entry_names)
+        category_lists[category_list] = category_lists.get(category_list, 0) + 1
+        values['category_seq'] = category_lists[category_list]
+        rows[PHRASES_TABLE].append(tuple(values[column] for column in PHRASE_COLUMNS))
+        for ordinal, name in enumerate(entry_names, 1):
+            category_id = category_ids[name]
+            category_counts[category_id] = category_counts.get(category_id, 0) + 1
+            rows[PHRASE_CATEGORIES_TABLE].append((category_id, phrase_id, ordinal, category_counts[category_id]))
+        for ordinal, meaning in enumerate(phrase_data.get('meanings', []), 1):
+            rows[PHRASE_MEANINGS_TABLE].append((phrase_id, ordinal, meaning))
+    return rows
+
+
+def _ordered_concat(dialect: Dialect, expression: str, order: str, separator: str, source: str) -> str:
+    """Scalar subquery joining `expression` over `source` in `order`."""
+    sep = dialect.literal(separator)
+    if dialect.name == 'mysql':
+        return f"(SELECT GROUP_CONCAT({expression} ORDER BY {order} SEPARATOR {sep}) FROM {source})"
+    if dialect.name == 'postgresql':
+        return f"(SELECT string_agg({expression}, {sep} ORDER BY {order}) FROM {source})"
+    # SQLite keeps the order of an ordered subquery in group_concat
+    return f"(SELECT group_concat(value, {sep}) FROM (SELECT {expression} AS value FROM {source} ORDER BY {order}))"
+
+
+def legacy_view(dialect: Dialect) -> List[str]:
+    """CREATE VIEW phraseological_dict with the flat layout's COLUMNS."""
+    q = dialect.quote
+    meaning = _ordered_concat(
+        dialect, f"m.{q('meaning')}", f"m.{q('ordinal')}", '; ',
+        f"{q(PHRASE_MEANINGS_TABLE)} m WHERE m.{q('phrase_id')} = p.{q('id')}",
+    )
+    categories = _ordered_concat(
+        dialect, f"c.{q('name')}", f"pc.{q('ordinal')}", ', ',
+        f"{q(PHRASE_CATEGORIES_TABLE)} pc JOIN {q(CATEGORIES_TABLE)} c ON c.{q('id')} = pc.{q('category_id')} "
+        f"WHERE pc.{q('phrase_id')} = p.{q('id')}",
+    )
+    return [
+        f"-- Legacy flat view of the normalized tables",
+        f"CREATE VIEW {q(TABLE_NAME)} AS SELECT",
+        f"  p.{q('id')},",
+        f"  p.{q('phrase')},",
+        f"  COALESCE({meaning}, '') AS {q('meaning')},",
+        f"  p.{q('etymology')},",
+        f"  p.{q('usage_example')},",
+        f"  COALESCE({categories}, '') AS {q('categories')},",
+        *(f"  p.{q(column)}," for column in ('source_url',) + SEARCH_COLUMNS + ('category_seq',)),
+        f"  p.{q('random_key')}",
+        f"FROM {q(PHRASES_TABLE)} p;",
+    ]
+
+
+def load_table(dialect: Dialect, table: str, columns: Sequence[str], rows: Iterable[Sequence],
+               batch_bytes: Optional[int] = None) -> Iterator[str]:
+    """INSERT statements for one table, in one transaction."""
+    yield f"-- Data for table {table}"
+    yield dialect.begin()
+    yield from insert_statements(dialect.serialize_rows(rows), batch_bytes, dialect.insert_prefix(table, columns))
+    yield "COMMIT;"
+
+
+def iter_tables_dump(
+    layout: str,
+    tables: Sequence[Table],
+    rows: Dict[str, Sequence[Tuple]],
+    views: Sequence[Tuple[str, List[str]]],
+    search_table: Optional[str],
+    comment_lines: Sequence[str] = (),
+    dialect: Union[str, Dialect] = 'mysql',
+    batch_bytes: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield a dump of several tables: drop, create, load, index, then create views.
+
+    `tables` are in dependency order; `views` are (name, CREATE VIEW lines).
+    `search_table` gets the dialect's full-text index, unless it is None.
+    """
+    dialect = get_dialect(dialect)
+    q = dialect.quote
+
+    yield f"-- {dialect.title} dump for phraseological dictionary ({layout} layout)"
+    yield from comment_lines
+    yield ""
+    yield from dialect.session_setup()
+    yield ""
+    yield "-- Drop views and tables if exist"
+    for name, _ in views:
+        yield from dialect.drop_relation(name, 'VIEW')
+    for table in reversed(tables):
+        yield from dialect.drop_relation(table.name)
+    for table in tables:
+        yield ""
+        yield from table.create(dialect)
+    for table in tables:
+        yield ""
+        yield from load_table(dialect, table.name, table.column_names, rows[table.name], batch_bytes)
+    yield ""
+    yield "-- Indexes"
+    for table in tables:
+        yield from table.create_indexes(dialect)
+    if search_table is not None:
+        yield from dialect.search_index(search_table)
+    for table in tables:
+        if table.auto_increment:
+            yield from dialect.sync_sequence(table=table.name)
+    for _, view_lines in views:
+        yield ""
+        yield from view_lines
+    yield ""
+    if dialect.name == 'postgresql':
+        for table in tables:
+            yield f"ANALYZE {q(table.name)};"
+    else:
+        yield from dialect.postamble()
+
+
+def iter_normalized_dump(
+    phrases: Sequence[Dict],
+    comment_lines: Sequence[str] = (),
+    dialect: Union[str, Dialect] = 'mysql',
+    batch_bytes: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield a dump of the normalized layout: tables, data, indexes, then the legacy view."""
+    dialect = get_dialect(dialect)
+    rows = normalized_rows(phrases)
+    comment_lines = list(comment_lines) + [
+        f"-- Categories: {len(rows[CATEGORIES_TABLE])}, meanings: {len(rows[PHRASE_MEANINGS_TABLE])}"
+    ]
+    return iter_tables_dump('normalized', NORMALIZED_TABLES, rows, [(TABLE_NAME, legacy_view(dialect))],
+                            PHRASES_TABLE, comment_lines, dialect, batch_bytes)
+
+
+def split_rows(phrases: Iterable[Dict]) -> Dict[str, List[Tuple]]:
+    """Map phrase entries to hot-table and details-table rows with the flat layout's ids."""
+    rows: Dict[str, List[Tuple]] = {TABLE_NAME: [], DETAILS_TABLE: []}
+    for row in phrase_rows(phrases):
+        values = dict(zip(COLUMNS, row))
+        rows[TABLE_NAME].append(tuple(values[column] for column in HOT_COLUMNS))
+        rows[DETAILS_TABLE].append(tuple(values[column] for column in DETAIL_COLUMNS))
+    return rows
+
+
+def full_view(dialect: Dialect) -> List[str]:
+    """CREATE VIEW phraseological_dict_full joining the hot table and its details."""
+    q = dialect.quote
+    columns = ',\n'.join(
+        f"  {'d' if column in DETAIL_COLUMNS[1:] else 'h'}.{q(column)}" for column in COLUMNS
+    )
+    return [
+        "-- Hot table and details joined back into the flat columns",
+        f"CREATE VIEW {q(FULL_VIEW)} AS SELECT",
+        columns,
+        f"FROM {q(TABLE_NAME)} h LEFT JOIN {q(DETAILS_TABLE)} d ON d.{q('id')} = h.{q('id')};",
+    ]
+
+
+def iter_split_dump(
+    phrases: Sequence[Dict],
+    comment_lines: Sequence[str] = (),
+    dialect: Union[str, Dialect] = 'mysql',
+    batch_bytes: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield a dump of the split layout: the narrow hot table plus phrase_details."""
+    dialect = get_dialect(dialect)
+    return iter_tables_dump('split', SPLIT_TABLES, split_rows(phrases), [(FULL_VIEW, full_view(dialect))],
+                            TABLE_NAME, comment_lines, dialect, batch_bytes)
+
+
+LAYOUT_WRITERS = {
+    'normalized': iter_normalized_dump,
+    'split': iter_split_dump,
+}
+
+
+def export_layout(
+    phrases: Sequence[Dict],
+    sql_path: Union[str, Path],
+    layout: str,
+    comment_lines: Sequence[str] = (),
+    dialect: str = 'mysql',
+    batch_bytes: Optional[int] = None,
+    compression: Optional[str] = None,
+) -> Path:
+    """Write `<dump>_<layout>.sql` for `dialect` and return the path written."""
+    try:
+        writer = LAYOUT_WRITERS[layout]
+    except KeyError:
+        raise ValueError(f"Unknown table layout: {layout}") from None
+    sql_path = Path(sql_path)
+    path = dialect_path(sql_path.with_name(f"{sql_path.stem}_{layout}{sql_path.suffix}"), dialect)
+    return write_dump(path, writer(phrases, comment_lines, dialect, batch_bytes), compression)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Out-of-core deduplication for phrase files larger than memory.
+
+`deduplicate_phrases.find_and_remove_duplicates` loads the whole file and
+keeps every entry in its groups dict; this module produces the same output
+with memory bounded by the run size instead of the input size:
+
+1. entries are parsed one by one (`iter_json_phrases`) and spilled as
+   (normalized phrase, position, entry) records to runs of about
+   `run_bytes`, each sorted by key and position;
+2. the runs are k-way merged, so all entries of a phrase arrive together
+   and in file order, and each group goes through `merge_duplicate_entries`;
+   merged entries are spilled again, keyed by their first position;
+3. those runs are merged by position and streamed to the output, which
+   keeps first-appearance order and is byte-identical to the in-memory path.
+
+Temporary runs are JSON lines in a temporary directory (`--tmp-dir`).
+
+    python3 streaming_dedup.py merged_scrape.json table_phrases_cleaned.json --run-mb 64
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import tempfile
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from deduplicate_phrases import merge_duplicate_entries
+from phrase_store import dump_json, iter_json_phrases, normalize_phrase
+
+RUN_BYTES = 64 * 1024 * 1024
+REPORT_GROUPS = 1000  # duplicate groups kept for the report (the earliest ones)
+
+
+def write_runs(records: Iterable[Tuple], directory: Path, prefix: str, run_bytes: int) -> List[Path]:
+    """
+    Spill (sort key..., line) records to sorted run files of about `run_bytes` each.
+
+    The last item of a record is its serialized JSON line; the ones before it
+    are the sort key. Python strings of Cyrillic text take about twice their
+    length in memory, so a run buffer costs roughly 2 * run_bytes.
+    """
+    paths: List[Path] = []
+    buffer: List[Tuple] = []
+    size = 0
+
+    def flush() -> None:
+        buffer.sort(key=lambda record: record[:-1])
+        path = directory / f"{prefix}-{len(paths):05d}.jsonl"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(record[-1] for record in buffer)
+        paths.append(path)
+        buffer.clear()
+
+    for record in records:
+        buffer.append(record)
+        size += len(record[-1])
+        if size >= run_bytes:
+            flush()
+            size = 0
+    if buffer or not paths:
+        flush()
+    return paths
+
+
+def read_run(path: Path) -> Iterator[list]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def merge_runs(paths: List[Path], key) -> Iterator[list]:
+    """K-way merge of sorted runs; only one record per run is in memory at a time."""
+    return heapq.merge(*(read_run(path) for path in paths), key=key)
+
+
+def _line(*fields) -> str:
+    return json.dumps(list(fields), ensure_ascii=False) + '\n'
+
+
+def stream_deduplicate(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    run_bytes: int = RUN_BYTES,
+    tmp_dir: Optional[Union[str, Path]] = None,
+    report_groups: int = REPORT_GROUPS,
+) -> Dict:
+    """
+    Deduplicate `input_path` into `output_path` out of core.
+
+    Returns the same statistics as `find_and_remove_duplicates`; the
+    duplicate details are limited to the `report_groups` groups that appear
+    first in the file (`duplicates_shown` of `duplicates_found`).
+    """
+    total_before = 0
+    duplicates_found = 0
+    duplicate_entries = 0
+    earliest: List[Tuple[int, str, List[Dict]]] = []  # max-heap by first position (negated)
+
+    with tempfile.TemporaryDirectory(prefix='dedup-', dir=tmp_dir) as directory:
+        directory = Path(directory)
+
+        def keyed() -> Iterator[Tuple]:
+            nonlocal total_before
+            for position, entry in enumerate(iter_json_phrases(input_path)):
+                total_before = position + 1
+                key = normalize_phrase(entry.get("phrase", ""))
+                yield key, position, _line(key, position, entry)
+
+        key_runs = write_runs(keyed(), directory, 'keys', run_bytes)
+        print(f"📦 {total_before} entries spilled to {len(key_runs)} sorted run(s)")
+
+        def merged_groups() -> Iterator[Tuple]:
+            nonlocal duplicates_found, duplicate_entries
+            records = merge_runs(key_runs, key=itemgetter(0, 1))
+            for key, group in itertools.groupby(records, key=itemgetter(0)):
+                group = list(group)
+                entries = [record[2] for record in group]
+                first = group[0][1]
+                if len(entries) > 1:
+                    duplicates_found += 1
+                    duplicate_entries += len(entries) - 1
+                    if report_groups:
+                        item = (-first, key, entries)
+                        if len(earliest) < report_groups:
+                            heapq.heappush(earliest, item)
+                        elif first < -earliest[0][0]:
+                            heapq.heapreplace(earliest, item)
+                yield first, _line(first, merge_duplicate_entries(entries))
+
+        order_runs = write_runs(merged_groups(), directory, 'order', run_bytes)
+        total_after = dump_json(output_path, (record[1] for record in merge_runs(order_runs, key=itemgetter(0))), {})
+
+    shown = sorted(earliest, reverse=True)
+    return {
+        "total_before": total_before,
+        "duplicates_found": duplicates_found,
+        "duplicate_entries_removed": duplicate_entries,
+        "total_after": total_after,
+        "duplicates_detail": {key: entries for _, key, entries in shown},
+        "duplicates_order": [key for _, key, _ in shown],
+        "duplicates_shown": len(shown),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate a phrase file larger than memory.")
+    parser.add_argument("input", help="JSON file with a 'phrases' list")
+    parser.add_argument("output", help="where to write the cleaned JSON")
+    parser.add_argument("--run-mb", type=int, default=RUN_BYTES // (1024 * 1024),
+                        help="size of sorted runs in MB of serialized entries (default: %(default)s)")
+    parser.add_argument("--tmp-dir", default=None, help="directory for temporary runs (default: system temp)")
+    args = parser.parse_args()
+
+    stats = stream_deduplicate(args.input, args.output, args.run_mb * 1024 * 1024, args.tmp_dir)
+    print(f"📊 Entries: {stats['total_before']} → {stats['total_after']}, "
+          f"duplicate groups: {stats['duplicates_found']}, removed: {stats['duplicate_entries_removed']}")
@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+"""
+Self-contained HTTP API for the phrase trainer.
+
+Clients used to run the SQL snippets from README.md against the shared MySQL
+instance, several random lookups per question. This server loads the whole
+dictionary into memory once and answers every trainer read itself:
+
+    GET /phrases/{id}                 phrase card (all fields)
+    GET /random[?category=]           random phrase card
+    GET /quiz/guess-meaning[?category=]   phrase, guess its meaning
+    GET /quiz/guess-phrase[?category=]    meaning, guess the phrase
+                                      (with choices when quiz_items are loaded)
+    GET /categories                   category names and sizes
+    GET /categories/{name}[?count=10] category drill: distinct random cards
+    GET /search?q=вода[&limit=20]     stemmed search, last word as a prefix
+    GET /health
+
+Every card and question is serialized (and gzip-compressed) once at startup;
+requests only pick and concatenate the ready bytes. Cacheable responses
+(cards, categories, search) carry an ETag (one per encoding, with
+`Vary: Accept-Encoding`) and answer If-None-Match with 304;
+random ones are `Cache-Control: no-store`. Only the standard library is
+used (asyncio streams, HTTP/1.1 keep-alive).
+
+Data comes from the binary snapshot, the JSON corpus or a SQLite dump;
+multiple-choice items precomputed by quiz_packs.py are read from the
+`quiz_items` table of a SQLite database (`--quiz`, or the `--sqlite` source):
+
+    python3 trainer_api.py serve --port 8080
+    python3 trainer_api.py serve --sqlite phraseological_dict_final.sqlite
+    python3 trainer_api.py bench --connections 32 --requests 20000
+"""
+
+import argparse
+import asyncio
+import bisect
+import gzip
+import hashlib
+import json
+import math
+import multiprocessing
+import random
+import socket
+import sqlite3
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from phrase_snapshot import Snapshot, snapshot_path
+from phrase_store import PhraseStore
+from russian_stemmer import stem_words
+from sql_dump import TABLE_NAME
+from sql_layouts import PHRASE_MEANINGS_TABLE, split_categories
+
+DEFAULT_JSON = Path('table_phrases_improved.json')
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_DRILL_SIZE = 10
+MAX_DRILL_SIZE = 50
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+SEARCH_CACHE_SIZE = 4096
+GZIP_MIN_BYTES = 256  # smaller bodies do not shrink enough to be worth compressing
+MAX_HEADERS = 100
+
+# Stem weight per field for search ranking
+SEARCH_WEIGHTS = (('phrase', 3), ('meaning', 2), ('usage_example', 1))
+
+CACHEABLE = 'public, max-age=3600'
+NO_STORE = 'no-store'
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class Payload:
+    """A serialized JSON response body with its ETag and gzip variant."""
+
+    __slots__ = ('body', 'gzip', 'etag')
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        self.gzip = gzip.compress(body, 6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+
+    @classmethod
+    def of(cls, data) -> 'Payload':
+        return cls(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    @classmethod
+    def array(cls, payloads: Iterable['Payload']) -> 'Payload':
+        """A JSON array of already serialized payloads, without re-serializing them."""
+        return cls(b'[' + b','.join(payload.body for payload in payloads) + b']')
+
+
+def sqlite_entries(path: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    (id, entry) pairs from the flat table (or legacy view) of a SQLite dump.
+
+    The flat `meaning` joins the meanings with '; ', which single meanings
+    contain too, so it is not split back: the meanings come from the
+    normalized layout's phrase_meanings when the database has it, otherwise
+    the whole column is one meaning.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        meanings: Dict[int, List[str]] = {}
+        if connection.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (PHRASE_MEANINGS_TABLE,)).fetchone():
+            for phrase_id, text in connection.execute(
+                    f"SELECT phrase_id, meaning FROM {PHRASE_MEANINGS_TABLE} ORDER BY phrase_id, ordinal"):
+                meanings.setdefault(phrase_id, []).append(text)
+        rows = connection.execute(
+            "SELECT id, phrase, meaning, etymology, usage_example, categories, source_url "
+            f"FROM {TABLE_NAME} ORDER BY id"
+        )
+        for row_id, phrase, meaning, etymology, usage_example, category, source_url in rows:
+            yield row_id, {
+                'phrase': phrase,
+                'meanings': meanings.get(row_id) or ([meaning] if meaning else []),
+                'etymology': etymology,
+                'category': category,
+                'source_url': source_url,
+                'usage_example': usage_example,
+            }
+    finally:
+        connection.close()
+
+
+def sqlite_quiz_items(path: str) -> Iterator[Tuple]:
+    """quiz_items rows of a SQLite database; nothing if it has no such table."""
+    connection = sqlite3.connect(path)
+    try:
+        if not connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'quiz_items'").fetchone():
+            return
+        yield from connection.execute(
+            "SELECT phrase_id, mode, item_no, prompt, choices, answer FROM quiz_items ORDER BY phrase_id, mode, item_no"
+        )
+    finally:
+        connection.close()
+
+
+def corpus_entries(json_path: Optional[str] = None, snapshot: Optional[str] = None,
+                   sqlite: Optional[str] = None) -> Iterator[Tuple[int, Dict]]:
+    """
+    (id, entry) pairs from the chosen source, ids as in the dumps.
+
+    Without arguments the snapshot next to table_phrases_improved.json is
+    used when present, else the JSON itself.
+    """
+    if sqlite:
+        yield from sqlite_entries(sqlite)
+        return
+    if not json_path and not snapshot and snapshot_path(DEFAULT_JSON).exists():
+        snapshot = str(snapshot_path(DEFAULT_JSON))
+    if snapshot:
+        with Snapshot(snapshot) as reader:
+            yield from enumerate(reader, 1)
+        return
+    yield from enumerate(PhraseStore.load(json_path or DEFAULT_JSON), 1)
+
+
+class TrainerIndex:
+    """Precomputed responses and lookup tables for every trainer mode."""
+
+    def __init__(self, entries: Iterable[Tuple[int, Dict]], rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+        self.cards: Dict[int, Payload] = {}
+        self.meaning_questions: Dict[int, Payload] = {}
+        self.phrase_questions: Dict[int, Payload] = {}
+        self.by_category: Dict[str, List[int]] = {}
+        self.categories_of: Dict[int, str] = {}
+        postings: Dict[str, Dict[int, int]] = {}
+
+        for row_id, entry in entries:
+            meanings = entry.get('meanings') or []
+            meaning = '; '.join(meanings)
+            category = entry.get('category') or ''
+            self.categories_of[row_id] = category
+            self.cards[row_id] = Payload.of({
+                'id': row_id,
+                'phrase': entry['phrase'],
+                'meanings': meanings,
+                'etymology': entry.get('etymology') or '',
+                'usage_example': entry.get('usage_example') or '',
+                'category': category,
+                'source_url': entry.get('source_url') or '',
+            })
+            self.meaning_questions[row_id] = Payload.of(
+                {'mode': 'guess-meaning', 'id': row_id, 'phrase': entry['phrase'], 'category': category})
+            self.phrase_questions[row_id] = Payload.of(
+                {'mode': 'guess-phrase', 'id': row_id, 'meaning': meaning, 'category': category})
+            for name in split_categories(category):
+                self.by_category.setdefault(name, []).append(row_id)
+            texts = {'phrase': entry['phrase'], 'meaning': meaning, 'usage_example': entry.get('usage_example')}
+            for field, weight in SEARCH_WEIGHTS:
+                for term in set(stem_words(texts[field])):
+                    scores = postings.setdefault(term, {})
+                    scores[row_id] = scores.get(row_id, 0) + weight
+
+        self.ids = list(self.cards)
+        self.postings = postings
+        self.terms = sorted(postings)  # for prefix matches of the last search word
+        self.categories = Payload.of(
+            [{'name': name, 'size': len(ids)} for name, ids in sorted(self.by_category.items())])
+        self.health = Payload.of({'status': 'ok', 'phrases': len(self.ids)})
+        self.quiz: Dict[Tuple[str, int], List[Payload]] = {}  # (mode, id) -> multiple-choice items
+        self._search_cache: 'OrderedDict[Tuple[Tuple[str, ...], int], Payload]' = OrderedDict()
+
+    def load_quiz(self, rows: Iterable[Tuple]) -> int:
+        """Add precomputed quiz_items rows (see quiz_packs.py); returns how many were loaded."""
+        count = 0
+        for row_id, mode, item_no, prompt, choices, answer in rows:
+            card = self.categories_of.get(row_id)
+            if card is None:
+                continue  # item for a phrase this corpus does not have
+            self.quiz.setdefault((mode, row_id), []).append(Payload.of({
+                'mode': mode,
+                'id': row_id,
+                'item': item_no,
+                'phrase' if mode == 'guess-meaning' else 'meaning': prompt,
+                'category': card,
+                'choices': json.loads(choices),
+                'answer': answer,
+            }))
+            count += 1
+        return count
+
+    def question(self, mode: str, row_id: int) -> Payload:
+        """A random precomputed multiple-choice item, or the plain question without choices."""
+        items = self.quiz.get((mode, row_id))
+        if items:
+            return self.rng.choice(items)
+        return (self.meaning_questions if mode == 'guess-meaning' else self.phrase_questions)[row_id]
+
+    def _pool(self, category: Optional[str]) -> Optional[List[int]]:
+        return self.ids if category is None else self.by_category.get(category)
+
+    def random_id(self, category: Optional[str] = None) -> Optional[int]:
+        pool = self._pool(category)
+        return self.rng.choice(pool) if pool else None
+
+    def drill(self, category: str, count: int) -> Optional[Payload]:
+        pool = self.by_category.get(category)
+        if pool is None:
+            return None
+        return Payload.array(self.cards[row_id] for row_id in self.rng.sample(pool, min(count, len(pool))))
+
+    def _prefix_scores(self, prefix: str) -> Dict[int, int]:
+        scores: Dict[int, int] = {}
+        for i in range(bisect.bisect_left(self.terms, prefix), len(self.terms)):
+            term = self.terms[i]
+            if not term.startswith(prefix):
+                break
+            for row_id, score in self.postings[term].items():
+                scores[row_id] = max(scores.get(row_id, 0), score)
+        return scores
+
+    def search(self, text: str, limit: int = DEFAULT_SEARCH_LIMIT) -> Payload:
+        """Phrases containing every stem of `text` (the last one as a prefix), best first."""
+        terms = tuple(dict.fromkeys(stem_words(text)))
+        key = (terms, limit)
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            self._search_cache.move_to_end(key)
+            return cached
+
+        results: List[Tuple[int, int]] = []
+        if terms:
+            *complete, last = terms
+            matches = [self.postings.get(term, {}) for term in complete] + [self._prefix_scores(last)]
+            matches.sort(key=len)
+            totals = dict(matches[0])
+            for scores in matches[1:]:
+                totals = {row_id: total + scores[row_id] for row_id, total in totals.items() if row_id in scores}
+            results = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        payload = Payload.array(self.cards[row_id] for row_id, _ in results)
+
+        self._search_cache[key] = payload
+        if len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return payload
+
+
+def error(message: str) -> Payload:
+    return Payload.of({'error': message})
+
+
+def _int_param(params: Dict[str, List[str]], name: str, default: int, maximum: int) -> int:
+    try:
+        value = int(params[name][0]) if name in params else default
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if not 1 <= value <= maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return value
+
+
+def route(index: TrainerIndex, target: str) -> Tuple[int, Payload, str]:
+    """Map a request target to (status, payload, Cache-Control)."""
+    url = urlsplit(target)
+    path = unquote(url.path).rstrip('/') or '/'
+    params = parse_qs(url.query)
+    category = params['category'][0] if 'category' in params else None
+    try:
+        if path == '/health':
+            return 200, index.health, NO_STORE
+        if path == '/categories':
+            return 200, index.categories, CACHEABLE
+        if path.startswith('/categories/'):
+            payload = index.drill(path[len('/categories/'):],
+                                  _int_param(params, 'count', DEFAULT_DRILL_SIZE, MAX_DRILL_SIZE))
+            return (200, payload, NO_STORE) if payload else (404, error('unknown category'), NO_STORE)
+        if path.startswith('/phrases/'):
+            try:
+                payload = index.cards.get(int(path[len('/phrases/'):]))
+            except ValueError:
+                payload = None
+            return (200, payload, CACHEABLE) if payload else (404, error('unknown phrase'), NO_STORE)
+        if path in ('/random', '/quiz/guess-meaning', '/quiz/guess-phrase'):
+            row_id = index.random_id(category)
+            if row_id is None:
+                return 404, error('unknown category'), NO_STORE
+            if path == '/random':
+                return 200, index.cards[row_id], NO_STORE
+            return 200, index.question(path[len('/quiz/'):], row_id), NO_STORE
+        if path == '/search':
+            if not params.get('q'):
+                return 400, error('q is required'), NO_STORE
+            limit = _int_param(params, 'limit', DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+            return 200, index.search(params['q'][0], limit), CACHEABLE
+    except ValueError as exc:
+        return 400, error(str(exc)), NO_STORE
+    return 404, error('not found'), NO_STORE
+
+
+def accepts_gzip(header: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip (q=0 refuses it)."""
+    for coding in header.lower().split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip() in ('gzip', '*'):
+            quality = params.strip()
+            if not quality.startswith('q='):
+                return True
+            try:
+                return float(quality[2:] or 0) != 0
+            except ValueError:
+                return True  # a malformed q is not a refusal
+    return False
+
+
+def render(status: int, payload: Payload, cache_control: str, headers: Dict[str, str],
+           head: bool, keep_alive: bool) -> bytes:
+    """Serialize one HTTP/1.1 response, honouring If-None-Match and Accept-Encoding."""
+    lines = []
+    body = payload.body
+    encoded = payload.gzip is not None and accepts_gzip(headers.get('accept-encoding', ''))
+    if cache_control == CACHEABLE:
+        # The gzip body is a different representation: it gets its own strong ETag
+        etag = payload.etag[:-1] + '-gzip"' if encoded else payload.etag
+        lines.append(f"ETag: {etag}")
+        if etag in (tag.strip() for tag in headers.get('if-none-match', '').split(',')):
+            status, body = 304, b''
+    lines.append("Vary: Accept-Encoding")
+    if status != 304:
+        lines.append("Content-Type: application/json; charset=utf-8")
+        if encoded:
+            body = payload.gzip
+            lines.append("Content-Encoding: gzip")
+    lines.append(f"Content-Length: {len(body)}")
+    lines.append(f"Cache-Control: {cache_control}")
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    head_bytes = f"HTTP/1.1 {status} {REASONS[status]}\r\n" + "\r\n".join(lines) + "\r\n\r\n"
+    return head_bytes.encode('latin-1') + (b'' if head else body)
+
+
+class TrainerServer:
+    """asyncio HTTP/1.1 server answering from a TrainerIndex."""
+
+    def __init__(self, index: TrainerIndex):
+        self.index = index
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[str, str] = {}
+                for _ in range(MAX_HEADERS):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                else:
+                    break  # too many headers: drop the connection
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length > 0:
+                    await reader.readexactly(length)
+
+                parts = request_line.decode('utf-8', 'replace').split()  # tolerate unencoded UTF-8 targets
+                if length < 0 or len(parts) != 3 or not parts[2].startswith('HTTP/1.'):
+                    writer.write(render(400, error('bad request'), NO_STORE, {}, False, False))
+                    break
+                method, target, version = parts
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                try:
+                    if method in ('GET', 'HEAD'):
+                        status, payload, cache_control = route(self.index, target)
+                    else:
+                        status, payload, cache_control = 405, error('only GET and HEAD are supported'), NO_STORE
+                    response = render(status, payload, cache_control, headers, method == 'HEAD', keep_alive)
+                except Exception:
+                    traceback.print_exc()
+                    keep_alive = False
+                    response = render(500, error('internal error'), NO_STORE, {}, method == 'HEAD', False)
+                writer.write(response)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        # ValueError: StreamReader.readline got a line longer than the stream limit
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, ready=None) -> None:
+        server = await asyncio.start_server(self.handle, host, port, reuse_address=True)
+        print(f"🚀 Serving {len(self.index.ids)} phrases on http://{host}:{port}", flush=True)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+
+def run_server(host: str, port: int, json_path: Optional[str] = None, snapshot: Optional[str] = None,
+               sqlite: Optional[str] = None, seed: Optional[int] = None, quiz: Optional[str] = None,
+               ready=None) -> None:
+    started = time.perf_counter()
+    index = TrainerIndex(corpus_entries(json_path, snapshot, sqlite), random.Random(seed))
+    quiz = quiz or sqlite
+    if quiz:
+        print(f"🧩 {index.load_quiz(sqlite_quiz_items(quiz))} quiz items loaded from {quiz}", flush=True)
+    print(f"📂 Index built in {(time.perf_counter() - started) * 1000:.0f} ms", flush=True)
+    try:
+        asyncio.run(TrainerServer(index).serve(host, port, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+# -- load generator ----------------------------------------------------------
+
+BENCH_PATHS = (
+    '/random',
+    '/quiz/guess-meaning',
+    '/quiz/guess-phrase',
+    '/quiz/guess-meaning?category=animals',
+    '/categories/animals?count=10',
+    '/phrases/42',
+    '/search?q=вода',
+    '/search?q=кот',
+)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending sequence."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def _client(host: str, port: int, paths: Sequence[str], counter: Iterator[int], total: int,
+                  latencies: Dict[str, List[float]]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for number in counter:
+            if number >= total:
+                break
+            path = paths[number % len(paths)]
+            request = (f"GET {quote(path, safe='/?=&')} HTTP/1.1\r\nHost: {host}\r\n"
+                       "Accept-Encoding: gzip\r\n\r\n").encode('utf-8')
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await reader.readexactly(length)
+            if not status_line.startswith(b'HTTP/1.1 200'):
+                raise RuntimeError(f"{path}: {status_line.decode('latin-1').strip()}")
+            latencies.setdefault(path, []).append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+async def load_test(host: str, port: int, connections: int, total: int,
+                    paths: Sequence[str] = BENCH_PATHS) -> Dict:
+    """Send `total` keep-alive requests over `connections` connections; return latency stats."""
+    counter = iter(range(total))
+    latencies: Dict[str, List[float]] = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, paths, counter, total, latencies) for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    every = sorted(value for values in latencies.values() for value in values)
+    return {
+        'requests': len(every),
+        'seconds': elapsed,
+        'rps': len(every) / elapsed,
+        'p50': percentile(every, 50),
+        'p99': percentile(every, 99),
+        'paths': {path: (percentile(sorted(values), 50), percentile(sorted(values), 99))
+                  for path, values in latencies.items()},
+    }
+
+
+def free_port(host: str) -> int:
+    with socket.socket() as probe:
+        probe.bind((host, 0))
+        return probe.getsockname()[1]
+
+
+def benchmark(connections: int, total: int, target: Optional[str] = None, **source) -> Dict:
+    """Run the load generator against `target` (host:port), or against a server it starts itself."""
+    process = None
+    if target:
+        host, _, port = target.rpartition(':')
+        port = int(port)
+    else:
+        host, port = DEFAULT_HOST, free_port(DEFAULT_HOST)
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(target=run_server, args=(host, port), kwargs=dict(source, ready=ready),
+                                          daemon=True)
+        process.start()
+        if not ready.wait(60):
+            process.terminate()
+            raise RuntimeError("Trainer server did not start")
+    try:
+        return asyncio.run(load_test(host, port, connections, total))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.join()
+
+
+def print_benchmark(result: Dict) -> None:
+    print("=" * 60)
+    print(f"Requests: {result['requests']} in {result['seconds']:.2f} s — {result['rps']:.0f} req/s")
+    print(f"Latency:  p50 {result['p50'] * 1000:.2f} ms, p99 {result['p99'] * 1000:.2f} ms")
+    print("-" * 60)
+    for path, (p50, p99) in result['paths'].items():
+        print(f"  {path:<40} p50 {p50 * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP API for the phrase trainer.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("serve", "run the server"), ("bench", "run the load generator")):
+        command = subparsers.add_parser(name, help=help_text)
+        source = command.add_mutually_exclusive_group()
+        source.add_argument("--snapshot", metavar="PATH", help="binary snapshot (default: next to the JSON, if present)")
+        source.add_argument("--json", metavar="PATH", help=f"JSON corpus (default: {DEFAULT_JSON})")
+        source.add_argument("--sqlite", metavar="PATH", help="SQLite dump (see --format sqlite)")
+        command.add_argument("--quiz", metavar="PATH",
+                             help="SQLite database with quiz_items (default: the --sqlite source, if any)")
+        command.add_argument("--seed", type=int, default=None, help="random seed for reproducible questions")
+    serve = subparsers.choices["serve"]
+    serve.add_argument("--host", default=DEFAULT_HOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    bench = subparsers.choices["bench"]
+    bench.add_argument("--connections", type=int, default=32, help="concurrent keep-alive connections (default: 32)")
+    bench.add_argument("--requests", type=int, default=20000, help="total requests (default: 20000)")
+    bench.add_argument("--target", metavar="HOST:PORT", help="benchmark a running server instead of starting one")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        run_server(args.host, args.port, args.json, args.snapshot, args.sqlite, args.seed, args.quiz)
+    else:
+        if args.target and (args.json or args.snapshot or args.sqlite or args.quiz):
+            parser.error("--target cannot be combined with a data source")
+        try:
+            print_benchmark(benchmark(args.connections, args.requests, args.target, json_path=args.json,
+                                      snapshot=args.snapshot, sqlite=args.sqlite, seed=args.seed, quiz=args.quiz))
+        except (OSError, RuntimeError) as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of fetched pages for example_sources.py.
+
+Pages are kept in SQLite, keyed by URL, with zlib-compressed bodies, the
+response headers (ETag, Last-Modified, ...) and fetch/access times:
+
+- a page younger than the TTL is served without any network request;
+- an older one is revalidated with If-None-Match / If-Modified-Since, and a
+  304 answer only refreshes its fetch time;
+- the total compressed size is bounded: the least recently used pages are
+  evicted first;
+- in offline mode only the cache is used, stale pages included, so reruns
+  and CI builds never touch the network.
+- a stale page whose revalidation fails (network error, 429/5xx after the
+  retries) is served as is.
+
+Only final answers (200, 404, 410) are stored. Hit/miss counters are kept
+per run in `stats`.
+
+    python3 url_cache.py example_cache.sqlite            # size and age summary
+    python3 url_cache.py example_cache.sqlite --clear
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Union
+
+DEFAULT_CACHE = Path('example_cache.sqlite')
+DEFAULT_TTL = 30 * 24 * 3600.0  # seconds
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHEABLE_STATUSES = frozenset({200, 404, 410})
+STORED_HEADERS = ('content-type', 'etag', 'last-modified')  # the body is stored decoded
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+
+
+class CachedPage(NamedTuple):
+    url: str
+    status: int
+    headers: Dict[str, str]  # lowercase names
+    body: bytes  # decompressed
+    fetched_at: float
+
+    def validators(self) -> Dict[str, str]:
+        """Request headers that revalidate this page."""
+        headers = {}
+        if 'etag' in self.headers:
+            headers['If-None-Match'] = self.headers['etag']
+        if 'last-modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['last-modified']
+        return headers
+
+
+class UrlCache:
+    """SQLite-backed page cache with TTL, revalidation data and LRU eviction by size."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_CACHE, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(self.path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'UrlCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """The cached page, fresh or not (marks it as recently used); None if absent."""
+        row = self.connection.execute(
+            "SELECT status, headers, body, fetched_at FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        return CachedPage(url, row[0], json.loads(row[1]), zlib.decompress(row[2]), row[3])
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return time.time() - page.fetched_at < self.ttl
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> bool:
+        """Store a final answer; returns False for statuses that are not cached."""
+        if status not in CACHEABLE_STATUSES:
+            return False
+        compressed = zlib.compress(body, 6)
+        headers = {name: headers[name] for name in STORED_HEADERS if name in headers}
+        now = time.time()
+        old = self.connection.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO pages (url, status, headers, body, size, fetched_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, status, json.dumps(headers, ensure_ascii=False), compressed, len(compressed), now, now),
+        )
+        self.total_bytes += len(compressed) - (old[0] if old else 0)
+        self.stats['stored'] += 1
+        self._evict()
+        return True
+
+    def refresh(self, url: str) -> None:
+        """Mark a page as just revalidated (a 304 answer)."""
+        now = time.time()
+        self.connection.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+        self.stats['revalidated'] += 1
+
+    def _evict(self) -> None:
+        while self.total_bytes > self.max_bytes:
+            rows = self.connection.execute(
+                "SELECT url, size FROM pages ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self.total_bytes = 0
+                return
+            for url, size in rows:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self.connection.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self.total_bytes -= size
+                self.stats['evicted'] += 1
+
+    def clear(self) -> None:
+        self.connection.execute("DELETE FROM pages")
+        self.connection.execute("VACUUM")
+        self.total_bytes = 0
+
+    def hit_rate(self) -> float:
+        lookups = self.stats['hits'] + self.stats['stale_hits'] + self.stats['revalidated'] + self.stats['misses']
+        return (self.stats['hits'] + self.stats['stale_hits'] + self.stats['revalidated']) / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (f"cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['stale_hits']} stale "
+                f"(offline or unreachable), {stats['misses']} misses ({self.hit_rate():.0%} served from cache), "
+                f"{stats['stored']} stored, {stats['evicted']} evicted, {self.total_bytes / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the example page cache.")
+    parser.add_argument("path", nargs='?', default=str(DEFAULT_CACHE))
+    parser.add_argument("--clear", action="store_true", help="delete every cached page")
+    args = parser.parse_args()
+
+    with UrlCache(args.path) as cache:
+        if args.clear:
+            cache.clear()
+            print(f"🗑️  {args.path} cleared")
+        else:
+            count, oldest, newest = cache.connection.execute(
+                "SELECT COUNT(*), MIN(fetched_at), MAX(fetched_at) FROM pages").fetchone()
+            print(f"Pages: {count}, compressed size: {cache.total_bytes / 1024:.0f} KiB")
+            if count:
+                now = time.time()
+                print(f"Fetched: {(now - newest) / 3600:.1f} h to {(now - oldest) / 3600:.1f} h ago")
+                for status, number in cache.connection.execute(
+                        "SELECT status, COUNT(*) FROM pages GROUP BY status ORDER BY status"):
+                    print(f"  HTTP {status}: {number}")
@@ -2,9 +2,32 @@
 # -*- coding: utf-8 -*-
 """
 Validation script for the generated SQL dump
+
+With --fuzz N the literal serializers of sql_dump.py are checked by
+round-tripping N random values through them and back through an independent
+SQL literal parser (and through SQLite itself for standard literals);
+--benchmark times them on the dictionary's own values.
 """
 
+import argparse
+import json
+import random
 import re
+import sqlite3
+import sys
+import time
+
+from sql_dump import insert_statements, mysql_literal, phrase_rows, standard_literal
+
+# Unescapes applied by the MySQL lexer inside quoted strings; any other
+# backslashed character stands for itself
+MYSQL_UNESCAPES = {'0': '\0', "'": "'", '"': '"', 'b': '\b', 'n': '\n', 'r': '\r',
+                   't': '\t', 'Z': '\x1a', '\\': '\\', '%': '\\%', '_': '\\_'}
+
+_NUMBER = re.compile(r'-?\d+(\.\d*)?([eE][-+]?\d+)?')
+
+# Characters that stress escaping, mixed into the fuzzed strings
+FUZZ_SPECIALS = "\0\n\r\x1a\\'\"\t%_\b`;"
 
 def validate_sql_dump():
     """Validate the SQL dump file"""
@@ -53,5 +76,175 @@ def validate_sql_dump():
         print("⚠️  Обнаружены проблемы в SQL дампе")
         return False
 
+def parse_literal(text, pos=0, backslash_escapes=True):
+    """Parse one SQL literal starting at `pos`; return (value, end position)."""
+    if text.startswith('NULL', pos):
+        return None, pos + 4
+    if text.startswith('TRUE', pos):
+        return True, pos + 4
+    if text.startswith('FALSE', pos):
+        return False, pos + 5
+    if text[pos] != "'":
+        match = _NUMBER.match(text, pos)
+        if not match:
+            raise ValueError(f"Unexpected literal at {pos}: {text[pos:pos + 20]!r}")
+        number = match.group()
+        value = int(number) if match.group(1) is None and match.group(2) is None else float(number)
+        return value, match.end()
+
+    chars = []
+    i = pos + 1
+    while True:
+        char = text[i]
+        if char == '\\' and backslash_escapes:
+            escaped = text[i + 1]
+            chars.append(MYSQL_UNESCAPES.get(escaped, escaped))
+            i += 2
+        elif char == "'":
+            if text.startswith("'", i + 1):
+                chars.append("'")
+                i += 2
+            else:
+                return ''.join(chars), i + 1
+        else:
+            chars.append(char)
+            i += 1
+
+
+def parse_values(statement, backslash_escapes=True):
+    """Parse the VALUES tuples of an INSERT statement into lists of values."""
+    pos = statement.index(' VALUES') + len(' VALUES')
+    rows = []
+    while True:
+        pos = statement.index('(', pos) + 1
+        row = []
+        while True:
+            while statement[pos] == ' ':
+                pos += 1
+            value, pos = parse_literal(statement, pos, backslash_escapes)
+            row.append(value)
+            if statement[pos] == ')':
+                break
+            if statement[pos] != ',':
+                raise ValueError(f"Expected ',' at {pos}: {statement[pos:pos + 20]!r}")
+            pos += 1
+        rows.append(row)
+        pos += 1
+        if statement[pos] != ',':
+            return rows
+
+
+def random_string(rng, max_length=40):
+    """Random Unicode string mixing ASCII, Cyrillic, astral characters and escape specials."""
+    chars = []
+    for _ in range(rng.randrange(max_length)):
+        kind = rng.random()
+        if kind < 0.3:
+            chars.append(rng.choice(FUZZ_SPECIALS))
+        elif kind < 0.5:
+            chars.append(chr(rng.randrange(0x20, 0x7f)))
+        elif kind < 0.8:
+            chars.append(chr(rng.randrange(0x400, 0x500)))
+        else:
+            code = rng.randrange(0x80, 0x110000)
+            # Lone surrogates cannot be encoded as UTF-8
+            chars.append(chr(code) if not 0xd800 <= code < 0xe000 else 'ё')
+    return ''.join(chars)
+
+
+def random_value(rng):
+    kind = rng.random()
+    if kind < 0.05:
+        return None
+    if kind < 0.1:
+        return rng.randrange(-2**63, 2**63)
+    if kind < 0.15:
+        return rng.uniform(-1e6, 1e6)
+    return random_string(rng)
+
+
+def fuzz_literals(iterations=10000, seed=0):
+    """Round-trip random values through the serializers; return the number of failures."""
+    rng = random.Random(seed)
+    failures = 0
+    connection = sqlite3.connect(':memory:')
+
+    for _ in range(iterations):
+        value = random_value(rng)
+        literal = mysql_literal(value)
+        parsed, end = parse_literal(literal)
+        if parsed != value or end != len(literal):
+            failures += 1
+            print(f"❌ MySQL: {value!r} -> {literal!r} -> {parsed!r}")
+        if isinstance(value, str) and any(char in literal for char in '\0\n\r\x1a'):
+            failures += 1
+            print(f"❌ MySQL: raw control character left in {literal!r}")
+
+        if isinstance(value, str) and '\0' in value:
+            continue
+        literal = standard_literal(value)
+        parsed, _ = parse_literal(literal, backslash_escapes=False)
+        stored = connection.execute(f"SELECT {literal}").fetchone()[0]
+        if parsed != value or stored != value:
+            failures += 1
+            print(f"❌ Standard: {value!r} -> {literal!r} -> {parsed!r} / SQLite {stored!r}")
+
+    # Whole rows, through the (batched) INSERT writer
+    rows = [tuple(random_value(rng) for _ in range(5)) for _ in range(max(iterations // 10, 1))]
+    batch_bytes = rng.choice([None, 256, 4096])
+    statements = insert_statements((tuple(map(mysql_literal, row)) for row in rows), batch_bytes)
+    parsed_rows = [tuple(row) for statement in statements for row in parse_values(statement)]
+    if parsed_rows != rows:
+        failures += 1
+        print(f"❌ INSERT round trip differs (batch_bytes={batch_bytes})")
+
+    connection.close()
+    return failures
+
+
+def legacy_mysql_literal(value):
+    """The chained str.replace escaping used before the one-pass escape, for comparison."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, int):
+        return str(value)
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def benchmark_literals(json_file='table_phrases_cleaned.json', repeat=20):
+    """Time the serializers over every column value of the dictionary."""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        values = [value for row in phrase_rows(json.load(f)['phrases']) for value in row]
+    size = sum(len(str(value).encode('utf-8')) for value in values)
+
+    print(f"📊 {len(values)} значений, {size / 1024:.0f} KB, повторов: {repeat}")
+    for name, serialize in (("mysql_literal", mysql_literal),
+                            ("standard_literal", standard_literal),
+                            ("legacy replace", legacy_mysql_literal)):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for value in values:
+                serialize(value)
+        elapsed = time.perf_counter() - started
+        count = len(values) * repeat
+        print(f"  {name:<17} {elapsed / count * 1e9:8.0f} ns/значение  {size * repeat / elapsed / 1e6:8.1f} MB/s")
+
+
 if __name__ == "__main__":
-    validate_sql_dump()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Validate the SQL dump and its literal serializers.")
+    parser.add_argument("--fuzz", type=int, metavar="N", default=None,
+                        help="round-trip N random values through the serializers and a literal parser")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for --fuzz (default: 0)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="time the serializers on the dictionary values")
+    args = parser.parse_args()
+
+    if args.fuzz is None and not args.benchmark:
+        validate_sql_dump()
+    if args.fuzz is not None:
+        failures = fuzz_literals(args.fuzz, args.seed)
+        print(f"{'✅' if not failures else '❌'} Fuzz: {args.fuzz} значений, ошибок: {failures}")
+        if failures:
+            sys.exit(1)
+    if args.benchmark:
+        benchmark_literals()
\ No newline at end of file